@@ -0,0 +1 @@
+"""Briques de données et de calcul du dashboard GASPI."""
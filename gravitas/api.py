@@ -0,0 +1,362 @@
+"""API HTTP JSON en lecture seule sur les données du dashboard.
+
+Les équipes qui consomment les classements n'ont plus à relancer ``main.py`` :
+chaque partition (édition, année) est lue une fois par la même couche de
+données que le dashboard (``GravitasStore``, ``Dataset``, ``IndicatorMatrix``,
+``ScoringEngine``, ``indicator_stats``), puis toutes les réponses sont
+sérialisées d'avance, avec leur version gzip et leur ETag. Une requête ne
+coûte qu'une recherche dans un dict ; ``If-None-Match`` renvoie un 304.
+Les réponses sont recalculées quand l'empreinte de la partition change ; la
+liste des partitions et leurs empreintes sont relues sur disque au plus une
+fois toutes les ``VERSION_TTL`` secondes, pas à chaque requête.
+
+Points d'entrée (``?edition=&year=`` pour une autre partition que la
+dernière, ``?region=`` pour filtrer les listes) ::
+
+    GET /v1                          liste des points d'entrée
+    GET /v1/editions                 partitions disponibles
+    GET /v1/regions                  régions et nombre de pays
+    GET /v1/countries[?region=]      tous les pays, dans l'ordre du classement
+    GET /v1/countries/<ISO3|nom>     un pays : indicateurs, piliers, classement
+    GET /v1/rankings[?region=]       classement du Composite index
+    GET /v1/indicators[?region=]     statistiques de chaque indicateur
+    GET /v1/indicators/<id>          statistiques et valeurs d'un indicateur
+
+Lancement autonome, ou dans le processus Streamlit avec
+``GRAVITAS_API_PORT`` (même connexion DuckDB que les sessions) ::
+
+    python -m gravitas.api --port 8502
+
+``running()`` démarre le serveur dans un thread pour un usage en cours de processus.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+
+from gravitas.boxstats import indicator_stats
+from gravitas.dataset import Dataset
+from gravitas.indicators import INDICATOR_INFO, INDICATORS, PILLARS
+from gravitas.matrix import IndicatorMatrix
+from gravitas.profiling import PROFILER
+from gravitas.scoring import ScoringEngine
+from gravitas.store import GravitasStore
+
+PREFIX = "/v1"
+# En deçà, la compression ne fait rien gagner
+GZIP_MIN_BYTES = 512
+CACHE_CONTROL = "public, max-age=60"
+# Partitions gardées en mémoire, comme les caches du dashboard
+MAX_PARTITIONS = 4
+# Durée de validité de la liste des partitions et de leurs empreintes (glob + stat)
+VERSION_TTL = 2.0
+
+ENDPOINTS = {
+    "/v1/editions": "available (edition, year) partitions",
+    "/v1/regions": "regions and their number of countries",
+    "/v1/countries": "all countries in ranking order (?region=)",
+    "/v1/countries/<ISO3 or name>": "one country: indicators, pillar scores, ranking",
+    "/v1/rankings": "Composite index ranking (?region=)",
+    "/v1/indicators": "descriptive statistics of each indicator (?region=)",
+    "/v1/indicators/<id>": "statistics and values of one indicator",
+}
+
+
+def _number(value):
+    value = float(value)
+    return round(value, 6) if np.isfinite(value) else None
+
+
+class Response:
+    """Corps JSON sérialisé une fois, sa version gzip et son ETag."""
+
+    __slots__ = ("status", "body", "gzipped", "etag")
+
+    def __init__(self, payload, status=200):
+        self.status = status
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        self.gzipped = gzip.compress(self.body, 6, mtime=0) if len(self.body) >= GZIP_MIN_BYTES else None
+        # ETag faible : le même pour le corps brut et le corps compressé
+        self.etag = 'W/"' + hashlib.sha1(self.body).hexdigest()[:16] + '"'
+
+
+def _error(status, message):
+    return Response({"error": message}, status)
+
+
+class Snapshot:
+    """Réponses précalculées d'une partition."""
+
+    def __init__(self, store):
+        self.version = store.version
+        self.edition, self.year = store.edition, store.year
+        dataset = Dataset.from_store(store)
+        matrix = IndicatorMatrix.from_dataset(dataset)
+        engine = ScoringEngine(matrix)
+        meta = {"edition": self.edition, "year": self.year, "version": self.version}
+
+        countries = engine.countries
+        regions = dataset.labels("Region")
+        iso3 = dataset.labels("ISO3") if "ISO3" in dataset.column_names else [None] * len(countries)
+        order = np.argsort(engine.published.ranking, kind="stable")
+        ids = [INDICATOR_INFO[i]["id"] for i in INDICATORS]
+
+        records = []
+        for i in order:
+            records.append({
+                "country": countries[i], "iso3": iso3[i], "region": regions[i],
+                "ranking": int(engine.published.ranking[i]),
+                "composite": _number(engine.published.composite[i]),
+                "pillars": dict(zip(PILLARS, map(_number, engine.pillar_scores[i]))),
+                "indicators": dict(zip(ids, map(_number, engine.values[i]))),
+            })
+
+        by_region = {None: records}
+        for record in records:
+            by_region.setdefault(record["region"], []).append(record)
+
+        self.responses = {}
+        self.aliases = {}
+        for region, rows in by_region.items():
+            key = None if region is None else region.lower()
+            self.responses[("/v1/countries", key)] = Response({**meta, "region": region, "countries": rows})
+            self.responses[("/v1/rankings", key)] = Response({**meta, "region": region, "ranking": [
+                {"ranking": r["ranking"], "country": r["country"], "iso3": r["iso3"],
+                 "region": r["region"], "composite": r["composite"]} for r in rows
+            ]})
+            values = matrix.take([r["country"] for r in rows], INDICATORS)
+            stats = indicator_stats(values, INDICATORS)
+            self.responses[("/v1/indicators", key)] = Response({**meta, "region": region, "indicators": [
+                {**INDICATOR_INFO[name], "column": name,
+                 "stats": {k: _number(v) for k, v in stats.loc[name].items()}}
+                for name in INDICATORS
+            ]})
+
+        self.responses[("/v1/regions", None)] = Response({**meta, "regions": [
+            {"region": region, "countries": len(rows)}
+            for region, rows in sorted(by_region.items(), key=lambda kv: str(kv[0])) if region
+        ]})
+
+        for record in records:
+            path = f"/v1/countries/{record['country']}"
+            self.responses[(path, None)] = Response({**meta, **record})
+            self.aliases[record["country"].lower()] = path
+            if record["iso3"]:
+                self.aliases[record["iso3"].lower()] = path
+
+        all_stats = indicator_stats(engine.values, INDICATORS)
+        for j, name in enumerate(INDICATORS):
+            path = f"/v1/indicators/{INDICATOR_INFO[name]['id']}"
+            values = engine.values[order, j]
+            self.responses[(path, None)] = Response({
+                **meta, **INDICATOR_INFO[name], "column": name,
+                "stats": {k: _number(v) for k, v in all_stats.loc[name].items()},
+                "values": [{"country": countries[i], "iso3": iso3[i], "value": _number(v)}
+                           for i, v in zip(order, values)],
+            })
+            self.aliases[f"indicator:{INDICATOR_INFO[name]['id'].lower()}"] = path
+            self.aliases[f"indicator:{name.lower()}"] = path
+
+    def lookup(self, path, region=None):
+        """Réponse précalculée pour ``path`` (et ``region``), ou réponse d'erreur."""
+        key = None if region is None else region.lower()
+        if path.startswith("/v1/countries/"):
+            path = self.aliases.get(path[len("/v1/countries/"):].lower(), path)
+        elif path.startswith("/v1/indicators/"):
+            path = self.aliases.get("indicator:" + path[len("/v1/indicators/"):].lower(), path)
+        response = self.responses.get((path, key))
+        if response is not None:
+            return response
+        if (path, None) in self.responses:
+            return _error(404, f"Unknown region: {region}")
+        return _error(404, f"Unknown resource: {path}")
+
+
+class ApiCache:
+    """Instantanés par partition, reconstruits quand l'empreinte des fichiers change."""
+
+    def __init__(self, store, max_partitions=MAX_PARTITIONS, version_ttl=VERSION_TTL):
+        self.store = store
+        self.max_partitions = max_partitions
+        self.version_ttl = version_ttl
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+        self._partitions = None
+        self._editions = None
+
+    def partitions(self):
+        """{(édition, année): empreinte}, relu sur disque au plus toutes les ``version_ttl`` secondes."""
+        now = time.monotonic()
+        with self._lock:
+            if self._partitions is None or now - self._partitions[0] >= self.version_ttl:
+                self._partitions = (now, {(e, y): self.store.scoped(e, y).version
+                                          for e, y in self.store.editions()})
+            return self._partitions[1]
+
+    def editions(self):
+        partitions = self.partitions()
+        if self._editions is None or self._editions[0] is not partitions:
+            self._editions = (partitions, Response({"editions": [
+                {"edition": e, "year": y, "version": v} for (e, y), v in partitions.items()]}))
+        return self._editions[1]
+
+    def snapshot(self, edition=None, year=None):
+        partitions = self.partitions()
+        if edition is None:
+            edition, year = max(partitions)
+        key = (int(edition), int(year))
+        if key not in partitions:
+            raise KeyError(f"No data for edition {edition}, year {year}")
+        version = partitions[key]
+        with self._lock:
+            # Chaque instantané est gardé avec l'empreinte lue avant sa construction
+            built, snapshot = self._snapshots.get(key, (None, None))
+            if built != version:
+                with PROFILER.section("api.build"):
+                    snapshot = Snapshot(self.store.scoped(*key))
+                self._snapshots[key] = (version, snapshot)
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_partitions:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def get(self, path, query=None):
+        """Réponse à ``GET path?query`` (``query`` : dict de valeurs simples)."""
+        query = query or {}
+        path = "/" + path.strip("/")
+        if path == PREFIX:
+            return Response({"endpoints": ENDPOINTS})
+        if path == "/v1/editions":
+            return self.editions()
+        try:
+            edition = int(query["edition"]) if "edition" in query else None
+            year = int(query["year"]) if "year" in query else None
+        except ValueError:
+            return _error(400, "edition and year must be integers")
+        if (edition is None) != (year is None):
+            return _error(400, "edition and year must be given together")
+        try:
+            snapshot = self.snapshot(edition, year)
+        except KeyError as exc:
+            return _error(404, exc.args[0])
+        return snapshot.lookup(path, query.get("region"))
+
+
+def _matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _accepts_gzip(header):
+    """Vrai si ``Accept-Encoding`` accepte gzip : jetons et q-values, ``*`` en repli."""
+    weights = {}
+    for token in (header or "").split(","):
+        name, *params = token.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    q = weights.get("gzip", weights.get("x-gzip", weights.get("*", 0.0)))
+    return q > 0
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    cache = None
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def _respond(self, head):
+        with PROFILER.section("api.request"):
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            response = self.cache.get(unquote(url.path), query)
+            if response.status == 200 and _matches(self.headers.get("If-None-Match"), response.etag):
+                self.send_response(304)
+                self.send_header("ETag", response.etag)
+                self.send_header("Cache-Control", CACHE_CONTROL)
+                self.end_headers()
+                return
+            body = response.body
+            self.send_response(response.status)
+            self.send_header("Content-Type", "application/json;charset=utf-8")
+            if response.gzipped and _accepts_gzip(self.headers.get("Accept-Encoding")):
+                body = response.gzipped
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Vary", "Accept-Encoding")
+            if response.status == 200:
+                self.send_header("ETag", response.etag)
+                self.send_header("Cache-Control", CACHE_CONTROL)
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=0, store=None):
+    """Serveur HTTP de l'API ; ``store`` permet de partager la connexion du dashboard."""
+    cache = ApiCache(store or GravitasStore())
+    handler = type("Handler", (ApiHandler,), {"cache": cache})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_in_background(host="127.0.0.1", port=0, store=None):
+    """Démarre le serveur dans un thread démon et le renvoie."""
+    server = make_server(host, port, store)
+    threading.Thread(target=server.serve_forever, name="gravitas-api", daemon=True).start()
+    return server
+
+
+@contextmanager
+def running(store=None):
+    """Démarre l'API sur un port libre et renvoie son URL de base (``.../v1``)."""
+    server = serve_in_background(store=store)
+    try:
+        yield f"http://{server.server_address[0]}:{server.server_address[1]}{PREFIX}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.api")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--parquet-dir", help="Parquet store (default: data/parquet)")
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, GravitasStore(args.parquet_dir))
+    print(f"GASPI API on http://{args.host}:{args.port}{PREFIX}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""Validation des données et artefact compilé des tables dérivées.
+
+``validate`` vérifie l'index et la table des partenaires : pays manquants
+d'une table à l'autre ou inconnus de ``gravitas.countries``, valeurs
+absentes et indicateurs hors de [0, 1]. Un Composite index différent de la
+somme de ses composantes (à l'arrondi près) ou un classement qui contredit
+l'ordre de ces sommes n'est qu'un avertissement (``check``), sauf avec
+``--strict`` ::
+
+    python -m gravitas.artifact validate [--strict]
+    python -m gravitas.artifact validate --index index.csv --partners partners.csv
+
+``build`` valide chaque partition du magasin Parquet puis écrit un seul
+fichier versionné, projeté en mémoire par le dashboard ::
+
+    python -m gravitas.artifact build
+
+Le fichier contient, par partition, les tables Arrow (format IPC non
+compressé, lues sans copie) de l'index et des partenaires, la hiérarchie du
+sunburst et les statistiques des indicateurs, ainsi que les listes triées
+des régions et des pays. Chaque partition porte l'empreinte du contenu de
+ses fichiers Parquet : une partition modifiée depuis la compilation est
+ignorée et recalculée à l'exécution.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from gravitas.boxstats import indicator_stats
+from gravitas.countries import ISO3
+from gravitas.indicators import COMPOSITE, INDICATORS, RANKING
+from gravitas.store import DATA_DIR, TABLES, GravitasStore
+
+ARTIFACT_PATH = DATA_DIR / "gravitas.arrow"
+MAGIC = b"GASPIART"
+FORMAT = 1
+ALIGNMENT = 64
+
+# Chaque composante est arrondie à 0,01 : la somme peut s'écarter du composite
+# publié d'au plus une demi-unité par indicateur
+COMPOSITE_TOLERANCE = 0.005 * len(INDICATORS) + 1e-9
+
+
+# Problèmes bloquants et écarts du composite ou du classement publiés (avertissements)
+Checks = namedtuple("Checks", ["errors", "warnings"])
+
+
+def _unique(values):
+    return sorted({v for v in values if isinstance(v, str)})
+
+
+def validate(index, partners, strict=False):
+    """Liste des problèmes des deux tables (vide si elles sont cohérentes).
+
+    Avec ``strict``, les écarts du composite et du classement en font partie.
+    """
+    errors, warnings = check(index, partners)
+    return errors + warnings if strict else errors
+
+
+def check(index, partners):
+    """``Checks`` des deux tables : erreurs et avertissements."""
+    errors, warnings = [], []
+    missing = [c for c in ["Country", "Region", *INDICATORS, COMPOSITE, RANKING] if c not in index]
+    if missing:
+        return Checks([f"index: missing columns {', '.join(missing)}"], [])
+    missing = [c for c in ["Country", "Region", "Continent", "Value"] if c not in partners]
+    if missing:
+        return Checks([f"partners: missing columns {', '.join(missing)}"], [])
+
+    for name, df in (("index", index), ("partners", partners)):
+        duplicated = _unique(df.loc[df["Country"].duplicated(), "Country"])
+        if duplicated:
+            errors.append(f"{name}: duplicated countries {', '.join(duplicated)}")
+        unknown = [c for c in _unique(df["Country"]) if c not in ISO3]
+        if unknown:
+            errors.append(f"{name}: no ISO3 code for {', '.join(unknown)}")
+
+    african = partners.loc[partners["Continent"] == "Africa", "Country"]
+    for message, countries in (
+            ("African partners missing from the index", set(african) - set(index["Country"])),
+            ("index countries missing from the partners", set(index["Country"]) - set(african))):
+        if countries:
+            errors.append(f"{message}: {', '.join(_unique(countries))}")
+
+    values = index[INDICATORS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    composite = pd.to_numeric(index[COMPOSITE], errors="coerce").to_numpy(dtype=float)
+    countries = index["Country"].to_numpy()
+    for j, indicator in enumerate(INDICATORS):
+        column = values[:, j]
+        if np.isnan(column).any():
+            errors.append(f"index: missing {indicator} for {', '.join(_unique(countries[np.isnan(column)]))}")
+        outside = (column < 0) | (column > 1)
+        if outside.any():
+            errors.append(f"index: {indicator} outside [0, 1] for " + ", ".join(
+                f"{c} ({v:g})" for c, v in zip(countries[outside], column[outside])))
+    if np.isnan(composite).any():
+        errors.append(f"index: missing {COMPOSITE} for {', '.join(_unique(countries[np.isnan(composite)]))}")
+    gap = np.abs(np.nansum(values, axis=1) - composite)
+    mismatch = gap > COMPOSITE_TOLERANCE
+    if mismatch.any():
+        warnings.append(f"index: {COMPOSITE} differs from the sum of its components for " + ", ".join(
+            f"{c} ({composite[i]:g} vs {np.nansum(values[i]):.2f})"
+            for i, c in zip(np.flatnonzero(mismatch), countries[mismatch])))
+    # La tolérance ci-dessus admet des écarts qui inversent le classement : celui-ci doit
+    # suivre l'ordre des sommes d'indicateurs (ex aequo dans l'un ou l'autre sens)
+    ranking = pd.to_numeric(index[RANKING], errors="coerce").to_numpy(dtype=float)
+    order = np.argsort(ranking, kind="stable")
+    sums = np.round(np.nansum(values, axis=1), 2)[order]
+    # Meilleure somme parmi les pays classés plus bas
+    below = np.maximum.accumulate(sums[::-1])[::-1]
+    inverted = [i for i in range(len(order) - 1) if sums[i] < below[i + 1] - 1e-9]
+    if inverted:
+        def label(i):
+            return f"{countries[order[i]]} (#{ranking[order[i]]:g}, {sums[i]:.2f})"
+        warnings.append(f"index: {RANKING} contradicts the order of the indicator sums: " + ", ".join(
+            f"{label(i)} ranked above {label(i + 1 + int(np.argmax(sums[i + 1:])))}" for i in inverted))
+    missing_region = index["Region"].isna() | (index["Region"].astype(str).str.strip() == "")
+    if missing_region.any():
+        errors.append(f"index: missing Region for {', '.join(_unique(countries[missing_region]))}")
+    return Checks(errors, warnings)
+
+
+def read_csv(path):
+    """CSV d'import (BOM UTF-8 des exports tableur retiré)."""
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def content_version(store):
+    """Empreinte du contenu des fichiers de la partition courante (stable après copie ou déploiement)."""
+    digest = hashlib.sha1(f"{store.edition}/{store.year}".encode())
+    for path in store._files(store.edition, store.year):
+        digest.update(path.relative_to(store.parquet_dir).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def sunburst_table(partners):
+    """Hiérarchie continents -> régions -> pays (labels, parents, values) du sunburst."""
+    continents = partners.groupby("Continent", sort=True, as_index=False)["Value"].sum()
+    regions = partners.groupby(["Continent", "Region"], sort=True, as_index=False)["Value"].sum()
+    return pd.concat([
+        pd.DataFrame({"labels": continents["Continent"], "parents": "", "values": continents["Value"]}),
+        pd.DataFrame({"labels": regions["Region"], "parents": regions["Continent"], "values": regions["Value"]}),
+        pd.DataFrame({"labels": partners["Country"], "parents": partners["Region"], "values": partners["Value"]}),
+    ], ignore_index=True)
+
+
+def _ipc(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def compile_partition(store, strict=False):
+    """(métadonnées, {nom: table Arrow}) d'une partition, ou ValueError si elle est invalide.
+
+    Les avertissements de ``check`` sont gardés dans les métadonnées (``warnings``).
+    """
+    tables = {name: store.arrow(name) for name in TABLES}
+    index, partners = tables["country_index"].to_pandas(), tables["partners"].to_pandas()
+    errors, warnings = check(index, partners)
+    if strict:
+        errors, warnings = errors + warnings, []
+    if errors:
+        raise ValueError("\n".join(f"edition {store.edition} ({store.year}): {e}" for e in errors))
+
+    stats = indicator_stats(index[INDICATORS].to_numpy(dtype=float), INDICATORS).reset_index()
+    tables["sunburst"] = pa.Table.from_pandas(sunburst_table(partners), preserve_index=False)
+    tables["indicator_stats"] = pa.Table.from_pandas(stats, preserve_index=False)
+    regions = _unique(index["Region"])
+    meta = {
+        "edition": store.edition, "year": store.year, "source": content_version(store),
+        "regions": regions,
+        "countries": _unique(index["Country"]),
+        "region_countries": {r: _unique(index.loc[index["Region"] == r, "Country"]) for r in regions},
+        "warnings": warnings,
+    }
+    return meta, tables
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def write(path, partitions):
+    """Écrit l'artefact et renvoie son en-tête.
+
+    Disposition : ``MAGIC``, taille de l'en-tête (8 octets), en-tête JSON, puis
+    les tables IPC alignées sur 64 octets ; les décalages de l'en-tête partent
+    du début de la zone des tables.
+    """
+    blobs, entries, offsets, position = [], [], [], 0
+    for meta, tables in partitions:
+        entry = dict(meta, tables={})
+        for name, table in tables.items():
+            blob = _ipc(table)
+            entry["tables"][name] = len(blobs)
+            blobs.append(blob)
+            offsets.append([position, blob.size])
+            position = _align(position + blob.size)
+        entries.append(entry)
+    digest = hashlib.sha1()
+    for entry in entries:
+        digest.update(entry["source"].encode())
+    header = {"format": FORMAT, "version": digest.hexdigest()[:16],
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "partitions": entries,
+              "blobs": offsets}
+    encoded = json.dumps(header).encode()
+
+    path = Path(path)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + len(encoded).to_bytes(8, "little") + encoded)
+        start = _align(f.tell())
+        for (offset, _), blob in zip(offsets, blobs):
+            f.write(b"\0" * (start + offset - f.tell()))
+            f.write(blob)
+    tmp.replace(path)  # remplacement atomique : un processus en cours garde l'ancien fichier
+    return header
+
+
+def build(store, path=ARTIFACT_PATH, strict=False):
+    """Valide et compile toutes les partitions du magasin."""
+    partitions, errors = [], []
+    for edition, year in store.editions():
+        try:
+            partitions.append(compile_partition(store.scoped(edition, year), strict))
+        except ValueError as exc:
+            errors.append(str(exc))
+    if errors:
+        raise ValueError("\n".join(errors))
+    return write(path, partitions)
+
+
+class CompiledPartition:
+    """Tables dérivées d'une partition, lues sans copie dans l'artefact projeté en mémoire.
+
+    ``regions`` et ``countries`` ont la même signature que ``GravitasStore``.
+    """
+
+    def __init__(self, artifact, entry):
+        self.artifact = artifact
+        self.edition, self.year = entry["edition"], entry["year"]
+        self.source = entry["source"]
+        self._entry = entry
+        self._tables = {}
+
+    def table(self, name):
+        if name not in self._tables:
+            self._tables[name] = self.artifact.read(self._entry["tables"][name])
+        return self._tables[name]
+
+    def regions(self):
+        return list(self._entry["regions"])
+
+    def countries(self, regions=None):
+        if not regions:
+            return list(self._entry["countries"])
+        by_region = self._entry["region_countries"]
+        return sorted({c for r in regions for c in by_region.get(r, [])})
+
+    def sunburst(self):
+        return self.table("sunburst").to_pandas()
+
+    def indicator_stats(self):
+        return self.table("indicator_stats").to_pandas().set_index("Indicator")
+
+
+class Artifact:
+    """Artefact compilé projeté en mémoire."""
+
+    def __init__(self, path=ARTIFACT_PATH):
+        self.path = Path(path)
+        self._buffer = pa.memory_map(str(self.path)).read_buffer()
+        if self._buffer.size < len(MAGIC) + 8 or self._buffer[:len(MAGIC)].to_pybytes() != MAGIC:
+            raise ValueError(f"{self.path}: not a GASPI artifact")
+        size = int.from_bytes(self._buffer[len(MAGIC):len(MAGIC) + 8].to_pybytes(), "little")
+        self.header = json.loads(self._buffer[len(MAGIC) + 8:len(MAGIC) + 8 + size].to_pybytes())
+        self._start = _align(len(MAGIC) + 8 + size)
+        if self.header.get("format") != FORMAT:
+            raise ValueError(f"{self.path}: format {self.header.get('format')}, expected {FORMAT}")
+        self.version = self.header["version"]
+
+    @classmethod
+    def open(cls, path=None):
+        """Artefact de ``path`` (``GRAVITAS_ARTIFACT`` ou ``data/gravitas.arrow``) ; None s'il manque ou est illisible."""
+        path = Path(path or os.environ.get("GRAVITAS_ARTIFACT") or ARTIFACT_PATH)
+        if not path.exists():
+            return None
+        try:
+            return cls(path)
+        except (ValueError, KeyError, OSError, pa.ArrowInvalid):
+            return None
+
+    def read(self, blob):
+        offset, size = self.header["blobs"][blob]
+        return pa.ipc.open_file(self._buffer.slice(self._start + offset, size)).read_all()
+
+    def partition(self, store):
+        """Partition compilée de ``store`` si son contenu n'a pas changé depuis la compilation."""
+        for entry in self.header["partitions"]:
+            if (entry["edition"], entry["year"]) == (store.edition, store.year):
+                if entry["source"] == content_version(store):
+                    return CompiledPartition(self, entry)
+                return None
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.artifact")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check_cmd = sub.add_parser("validate", help="check the country index and partners CSV files")
+    check_cmd.add_argument("--index", default=DATA_DIR / "gravitas_country_index.csv")
+    check_cmd.add_argument("--partners", default=DATA_DIR / "gravitas_country_index2.csv")
+    cmd = sub.add_parser("build", help="validate every Parquet partition and compile the derived tables")
+    cmd.add_argument("--parquet-dir", help="Parquet store (default: data/parquet)")
+    cmd.add_argument("--out", default=ARTIFACT_PATH)
+    for p in (check_cmd, cmd):
+        p.add_argument("--strict", action="store_true",
+                       help="fail on composite and ranking mismatches instead of warning")
+    args = parser.parse_args(argv)
+
+    if args.command == "validate":
+        checks = check(read_csv(args.index), read_csv(args.partners))
+        errors, warnings = checks.errors, checks.warnings
+        if args.strict:
+            errors, warnings = errors + warnings, []
+        for warning in warnings:
+            print(f"warning: {warning}", file=sys.stderr)
+        for error in errors:
+            print(error, file=sys.stderr)
+        if errors:
+            sys.exit(1)
+        print("ok")
+        return
+
+    try:
+        header = build(GravitasStore(args.parquet_dir), args.out, args.strict)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        sys.exit(1)
+    for entry in header["partitions"]:
+        for warning in entry["warnings"]:
+            print(f"warning: edition {entry['edition']} ({entry['year']}): {warning}", file=sys.stderr)
+    size = Path(args.out).stat().st_size
+    print(f"{args.out}: version {header['version']}, {len(header['partitions'])} partition(s), "
+          f"{size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Banc d'essai headless du dashboard sur des jeux de données synthétiques.
+
+``main.py`` est exécuté par le harnais ``AppTest`` de Streamlit sur des
+panels générés (de la trentaine de pays actuelle à 10 000 entités, 13
+indicateurs, N éditions). Pour chaque cas et chaque scénario (premier
+affichage, sélection de pays, repondération des piliers), la durée, le pic
+mémoire et les octets envoyés de chaque section (voir ``gravitas.profiling``)
+sont écrits dans un fichier JSON ::
+
+    python -m gravitas.bench
+    python -m gravitas.bench --sizes 30 1000 10000 --years 1 5 --select 6 --out bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from gravitas.countries import ISO3
+from gravitas.indicators import COMPOSITE, INDICATORS, RANKING
+from gravitas.profiling import PROFILER
+from gravitas.scoring import rank_desc
+from gravitas.store import DEFAULT_YEAR, partition_dir
+
+ROOT = Path(__file__).resolve().parent.parent
+REGIONS = ["Central Africa", "East Africa", "North Africa", "Southern Africa", "West Africa"]
+GCC = ["Bahrain", "Kuwait", "Oman", "Qatar", "Saudi Arabia", "United Arab Emirates"]
+SIZES = (30, 300, 1000, 10_000)
+YEARS = (1, 5)
+SCENARIOS = ("initial", "select", "reweight")
+
+
+def entity_names(n):
+    """Vrais noms de pays d'abord (cartes lisibles), puis entités numérotées."""
+    real = [c for c in ISO3 if c not in GCC]
+    return real[:n] + [f"Entity {i:05d}" for i in range(len(real), n)]
+
+
+def make_dataset(out_dir, n_entities, n_years=1, seed=0):
+    """Écrit un panel synthétique (une partition par édition) au format de ``GravitasStore``."""
+    rng = np.random.default_rng(seed)
+    names = entity_names(n_entities)
+    regions = [REGIONS[i % len(REGIONS)] for i in range(n_entities)]
+    for k in range(n_years):
+        edition, year = k + 1, DEFAULT_YEAR - n_years + 1 + k
+        values = rng.random((n_entities, len(INDICATORS))).round(2)
+        composite = values.sum(axis=1).round(2)
+        index = pd.DataFrame(values, columns=INDICATORS)
+        index.insert(0, "Region", regions)
+        index.insert(0, "Country", names)
+        index[COMPOSITE] = composite
+        index["ISO3"] = [ISO3.get(name) for name in names]
+        index.insert(0, RANKING, rank_desc(composite))
+        partners = pd.DataFrame({
+            "Country": names + GCC,
+            "Region": regions + ["Gulf Cooperation Council"] * len(GCC),
+            "Continent": ["Africa"] * n_entities + ["Gulf Arab States - Middle East"] * len(GCC),
+            "Value": 100 / (n_entities + len(GCC)),
+        })
+        partners["ISO3"] = partners["Country"].map(ISO3)
+        for table, df in (("country_index", index.sort_values(RANKING, kind="stable")),
+                          ("partners", partners)):
+            out = partition_dir(out_dir, table, edition, year)
+            out.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(out / "data.parquet", index=False)
+    return Path(out_dir)
+
+
+def _collect(samples):
+    """Agrège les mesures d'un passage par section (plusieurs appels possibles)."""
+    sections = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "payload_bytes": 0,
+                                    "peak_bytes": None})
+    for s in samples:
+        agg = sections[s["section"]]
+        agg["calls"] += 1
+        agg["seconds"] += s["seconds"]
+        agg["payload_bytes"] += s["payload_bytes"]
+        if s["peak_bytes"] is not None:
+            agg["peak_bytes"] = max(agg["peak_bytes"] or 0, s["peak_bytes"])
+    return dict(sections)
+
+
+def _run(at, step, memory):
+    PROFILER.drain()
+    if memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    step(at)
+    seconds = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    result = {"seconds": seconds, "sections": _collect(PROFILER.drain())}
+    if memory:
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    return result
+
+
+def run_case(parquet_dir, n_select=6, scenarios=SCENARIOS, memory=True, timeout=600):
+    """Exécute ``main.py`` sur un jeu de données et renvoie les mesures de chaque scénario."""
+    os.environ["GRAVITAS_PARQUET_DIR"] = str(parquet_dir)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    at = AppTest.from_file(str(ROOT / "main.py"), default_timeout=timeout)
+
+    steps = {
+        "initial": lambda at: at.run(),
+        "select": lambda at: at.sidebar.multiselect[1].set_value(
+            at.sidebar.multiselect[1].options[:n_select]).run(),
+        "reweight": lambda at: at.sidebar.toggle[0].set_value(True).run(),
+    }
+    if memory:
+        tracemalloc.start()
+    try:
+        return {name: _run(at, steps[name], memory) for name in scenarios}
+    finally:
+        if memory:
+            tracemalloc.stop()
+        os.environ.pop("GRAVITAS_PARQUET_DIR", None)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, years=YEARS, n_select=6, memory=True, seed=0):
+    """Balaye les tailles et nombres d'éditions ; renvoie le rapport complet."""
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # chemins relatifs de main.py (logo)
+    sys.path.insert(0, str(ROOT))
+    cases = []
+    try:
+        for n_years in years:
+            for n in sizes:
+                with tempfile.TemporaryDirectory() as tmp:
+                    make_dataset(tmp, n, n_years, seed)
+                    started = time.perf_counter()
+                    scenarios = run_case(tmp, n_select, memory=memory)
+                cases.append({
+                    "entities": n, "indicators": len(INDICATORS), "years": n_years,
+                    "selected": min(n_select, n), "scenarios": scenarios,
+                })
+                total = time.perf_counter() - started
+                print(f"{n:>6} entities x {n_years} years: {total:.2f}s", file=sys.stderr)
+    finally:
+        os.chdir(cwd)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "streamlit": st.__version__,
+            "platform": platform.platform(),
+            "memory_tracing": memory,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "cases": cases,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.bench")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--years", type=int, nargs="+", default=list(YEARS))
+    parser.add_argument("--select", type=int, default=6, help="countries selected in the 'select' scenario")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip tracemalloc (faster, no peak memory figures)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.years, args.select, not args.no_memory, args.seed)
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    for case in report["cases"]:
+        for name, scenario in case["scenarios"].items():
+            sections = ", ".join(f"{s} {v['seconds'] * 1000:.0f}ms/{v['payload_bytes'] / 1024:.0f}KB"
+                                 for s, v in scenario["sections"].items())
+            print(f"{case['entities']:>6}x{case['years']} {name:<8} {scenario['seconds']:.2f}s  {sections}")
+    print(f"results: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
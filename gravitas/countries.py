@@ -0,0 +1,41 @@
+"""Codes ISO 3166-1 alpha-3 des pays du GASPI, indexés par nom tel qu'écrit dans les CSV."""
+
+ISO3 = {
+    # Afrique
+    "Algeria": "DZA",
+    "Angola": "AGO",
+    "Benin": "BEN",
+    "Botswana": "BWA",
+    "Cabo Verde": "CPV",
+    "Congo, Dem. Rep.": "COD",
+    "Congo, Rep.": "COG",
+    "Cote d'Ivoire": "CIV",
+    "Egypt": "EGY",
+    "Ethiopia": "ETH",
+    "Ghana": "GHA",
+    "Kenya": "KEN",
+    "Malawi": "MWI",
+    "Mauritania": "MRT",
+    "Mauritius": "MUS",
+    "Morocco": "MAR",
+    "Mozambique": "MOZ",
+    "Namibia": "NAM",
+    "Nigeria": "NGA",
+    "Rwanda": "RWA",
+    "Senegal": "SEN",
+    "Seychelles": "SYC",
+    "South Africa": "ZAF",
+    "Tanzania": "TZA",
+    "Tunisia": "TUN",
+    "Uganda": "UGA",
+    "Zambia": "ZMB",
+    # Conseil de coopération du Golfe
+    "Bahrain": "BHR",
+    "Kuwait": "KWT",
+    "Oman": "OMN",
+    "Qatar": "QAT",
+    "Saudi Arabia": "SAU",
+    "United Arab Emirates": "ARE",
+}
+
+COUNTRY_BY_ISO3 = {code: name for name, code in ISO3.items()}
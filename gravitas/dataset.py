@@ -0,0 +1,130 @@
+"""Jeu de données partagé, immuable et adossé à Arrow.
+
+Une partition de ``country_index`` est lue une fois par processus (fichiers
+Parquet projetés en mémoire) et partagée par toutes les sessions. Les
+colonnes sont exposées en tableaux NumPy en lecture seule ; une sélection de
+pays est un tableau d'indices de lignes, et ``frame`` ne matérialise que les
+colonnes demandées, pour les seules lignes choisies.
+
+``key`` donne l'empreinte du contenu de quelques colonnes sur quelques lignes :
+les caches dérivés l'utilisent comme clé, si bien qu'un rechargement des
+données (``gravitas.reload``) n'invalide que les entrées dont les cellules
+ont réellement changé.
+"""
+import hashlib
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from gravitas.indicators import RANKING
+
+# Jeux de données vivants (encore en cache) : mémoire partagée du processus
+_LIVE = weakref.WeakSet()
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+def row_hashes(table, columns):
+    """Empreinte (uint64) de chaque ligne de ``table`` sur Country et ``columns``."""
+    columns = ["Country", *(c for c in columns if c != "Country")]
+    return pd.util.hash_pandas_object(table.select(columns).to_pandas(), index=False).to_numpy()
+
+
+def _digest(hashes, columns):
+    digest = hashlib.sha1("\x1f".join(columns).encode())
+    digest.update(np.ascontiguousarray(hashes).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def table_key(table, columns):
+    """Empreinte du contenu de ``columns`` dans toute la table Arrow ``table``."""
+    return _digest(row_hashes(table, columns), columns)
+
+
+class Dataset:
+    """Table Arrow d'une partition, index des pays et colonnes NumPy en lecture seule."""
+
+    def __init__(self, table, version=None):
+        self.table = table
+        self.version = version
+        self.countries = table.column("Country").to_pylist()
+        self._row = {country: i for i, country in enumerate(self.countries)}
+        self._columns = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+        _LIVE.add(self)
+
+    @classmethod
+    def from_store(cls, store, name="country_index"):
+        return cls(store.arrow(name), store.version)
+
+    def __contains__(self, country):
+        return country in self._row
+
+    def __len__(self):
+        return len(self.countries)
+
+    @property
+    def column_names(self):
+        return self.table.column_names
+
+    def rows(self, countries=None):
+        """Indices des pays connus de ``countries`` (dans leur ordre) ; toutes les lignes si vide."""
+        if not countries:
+            return np.arange(len(self.countries))
+        return np.array([self._row[c] for c in countries if c in self._row], dtype=np.intp)
+
+    def column(self, name):
+        """Colonne numérique en tableau NumPy partagé (sans copie si Arrow le permet)."""
+        array = self._columns.get(name)
+        if array is None:
+            with self._lock:
+                array = self._columns.get(name)
+                if array is None:
+                    array = np.asarray(self.table.column(name).to_numpy(), dtype=float)
+                    self._columns[name] = array = _readonly(array)
+        return array
+
+    def labels(self, name):
+        """Colonne texte en liste Python (Region, ISO3...)."""
+        return self.table.column(name).to_pylist()
+
+    def frame(self, rows=None, columns=None, order_by=RANKING):
+        """DataFrame des seules ``rows`` et ``columns``, trié par ``order_by``."""
+        table = self.table if columns is None else self.table.select(list(columns))
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.intp)
+            if order_by:
+                rows = rows[np.argsort(self.column(order_by)[rows], kind="stable")]
+            table = table.take(rows)
+        elif order_by:
+            table = table.take(np.argsort(self.column(order_by), kind="stable"))
+        return table.to_pandas()
+
+    def key(self, columns, rows=None):
+        """Empreinte de ``columns`` sur ``rows`` (toutes les lignes par défaut), clé des caches dérivés."""
+        columns = tuple(columns)
+        hashes = self._hashes.get(columns)
+        if hashes is None:
+            with self._lock:
+                hashes = self._hashes.get(columns)
+                if hashes is None:
+                    self._hashes[columns] = hashes = _readonly(row_hashes(self.table, columns))
+        return _digest(hashes if rows is None else hashes[np.asarray(rows, dtype=np.intp)], columns)
+
+    @property
+    def nbytes(self):
+        """Octets de la table Arrow et des colonnes NumPy qui ne la partagent pas."""
+        return self.table.nbytes + sum(
+            a.nbytes for a in self._columns.values() if a.base is None) + sum(
+            h.nbytes for h in self._hashes.values())
+
+
+def live_bytes():
+    """Octets des jeux de données encore référencés (caches du processus)."""
+    return sum(d.nbytes for d in list(_LIVE))
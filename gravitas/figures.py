@@ -0,0 +1,402 @@
+"""Fabrique de figures Plotly avec un cache LRU partagé entre les sessions.
+
+Les entrées sont indexées par (figure, empreinte des données lues, sélection,
+theme_mode, poids des piliers). Chaque entrée garde la figure construite ;
+les figures en cache ne doivent jamais être modifiées.
+
+La sérialisation n'est volontairement pas mise en cache : ``st.plotly_chart``
+n'accepte qu'une figure (ou un dict, qu'il revalide) et la valide puis la
+convertit en JSON à chaque affichage, environ 4 ms par figure. Lui passer un
+JSON précalculé obligerait à construire le message nous-mêmes avec l'API
+privée de Streamlit (``PlotlyChartProto``, ``DeltaGenerator._enqueue``). Un
+succès du cache évite donc la lecture des données, les géométries et la
+construction des traces, pas la sérialisation.
+
+Plotly n'est importé qu'à la construction d'une figure : les constantes du
+module (colonnes lues, seuil du boxplot) ne le chargent pas.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from gravitas.geo import geometry_for
+from gravitas.indicators import INDICATORS
+
+# Au-delà de ce nombre de points, le boxplot n'affiche que les valeurs
+# aberrantes et un échantillon des autres
+BOX_POINT_LIMIT = 2000
+
+# Seules colonnes lues par le globe
+CHOROPLETH_COLUMNS = ["Country", "ISO3", "Composite index", "Ranking"]
+
+# Colonnes de ``partners`` lues par le sunburst
+SUNBURST_COLUMNS = ["Country", "Region", "Continent", "Value"]
+
+
+class FigureCache:
+    """Cache LRU thread-safe de figures Plotly."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Construction hors verrou : deux sessions peuvent construire la même
+        # figure en parallèle, la dernière écriture l'emporte.
+        figure = build()
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return figure
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def sunburst_data(store):
+    # Hiérarchie continents -> régions -> pays en une seule concaténation
+    continents = store.partner_totals(['Continent'])
+    regions = store.partner_totals(['Continent', 'Region'])
+    countries = store.table('partners')
+    return pd.concat([
+        pd.DataFrame({
+            'labels': continents['Continent'],
+            'parents': '',  # racine
+            'values': continents['Value']
+        }),
+        pd.DataFrame({
+            'labels': regions['Region'],
+            'parents': regions['Continent'],
+            'values': regions['Value']
+        }),
+        pd.DataFrame({
+            'labels': countries['Country'],
+            'parents': countries['Region'],
+            'values': countries['Value']
+        }),
+    ], ignore_index=True)
+
+
+def build_sunburst(sunburst_data):
+    """Sunburst de la hiérarchie (labels, parents, values) des partenaires."""
+    import plotly.graph_objects as go
+    fig_sunburst = go.Figure(go.Sunburst(
+        labels=sunburst_data['labels'],
+        parents=sunburst_data['parents'],
+        values=sunburst_data['values'],
+        branchvalues="total",
+        hoverinfo='skip',
+        maxdepth=2  # facultatif, ne montre que les continents au début
+    ))
+
+    fig_sunburst.update_layout(
+        margin=dict(t=60, l=0, r=0, b=0),
+        font_color='white', font_size=16,
+        height=600
+    )
+    return fig_sunburst
+
+
+def _locations(geometry):
+    """Arguments de localisation : géométrie livrée si disponible, sinon codes ISO3 de Plotly."""
+    if geometry is None:
+        return dict(locationmode='ISO-3')
+    return dict(geojson=geometry, featureidkey='id')
+
+
+def build_choropleth(filtered_df, theme_mode, geometry=None):
+    import plotly.graph_objects as go
+    tick_color2 = "white" if theme_mode == "dark" else "black"
+
+    # Construction du choropleth avec GO + projection globe
+    fig = go.Figure(data=go.Choropleth(
+        locations=filtered_df['ISO3'],                  # codes résolus à l'import
+        **_locations(geometry),
+        z=filtered_df['Composite index'],               # variable à colorier
+        colorscale='Blues',
+        colorbar_title='Composite Index',
+
+        customdata=filtered_df[['Country', 'Composite index', 'Ranking']],
+        hovertemplate=(
+            "<b>%{customdata[0]}</b><br>" +
+            "Composite Index: %{customdata[1]:.2f}<br>" +
+            "Ranking: %{customdata[2]}<br><extra></extra>"
+        )
+    ))
+
+    # Paramètres de projection et style globe
+    fig.update_geos(
+        projection_type="orthographic",
+        showland=True, landcolor='gray',
+        showocean=True, oceancolor='black',
+        showlakes=True, lakecolor='black', coastlinecolor='white',
+        bgcolor="rgba(0,0,0,0)",  # fond noir pour le globe
+        fitbounds="locations",   # ajuste à l'ensemble des pays affichés
+        lataxis_showgrid=False,
+        lonaxis_showgrid=False,
+    )
+
+    # Mise en page
+    fig.update_layout(
+        hoverlabel=dict(
+            bgcolor="black",   # fond
+            font_size=16,
+            font_family="Arial",
+            font_color="white",
+            bordercolor="white"
+        ),
+        coloraxis_colorbar=dict(
+            tickfont=dict(color=tick_color2),
+        ),
+        height=600,
+        margin={"l": 0, "r": 0, "t": 0, "b": 0},
+    )
+    return fig
+
+
+def build_ranking_evolution(panel, theme_mode, geometry=None):
+    """Globe animé du Composite index, une image par (édition, année)."""
+    import plotly.express as px
+    tick_color2 = "white" if theme_mode == "dark" else "black"
+    panel = panel.assign(Period="Edition " + panel['edition'].astype(str) +
+                         " (" + panel['year'].astype(str) + ")")
+    fig = px.choropleth(
+        panel,
+        locations='ISO3',
+        **_locations(geometry),
+        color='Composite index',
+        animation_frame='Period',
+        hover_name='Country',
+        hover_data={'Composite index': ':.2f', 'Ranking': True, 'Country': False, 'Period': False},
+        color_continuous_scale='Blues',
+        range_color=(panel['Composite index'].min(), panel['Composite index'].max()),
+    )
+    fig.update_geos(
+        projection_type="orthographic",
+        showland=True, landcolor='gray',
+        showocean=True, oceancolor='black',
+        showlakes=True, lakecolor='black', coastlinecolor='white',
+        bgcolor="rgba(0,0,0,0)",
+        fitbounds="locations",
+        lataxis_showgrid=False,
+        lonaxis_showgrid=False,
+    )
+    fig.update_layout(
+        coloraxis_colorbar=dict(title='Composite Index', tickfont=dict(color=tick_color2)),
+        height=600,
+        margin={"l": 0, "r": 0, "t": 0, "b": 0},
+    )
+    return fig
+
+
+class FigureFactory:
+    """Point d'entrée unique des figures indépendantes de la session.
+
+    Le cache peut être partagé entre plusieurs fabriques (une par édition) :
+    la version de la partition fait partie des clés. Avec ``dataset``
+    (``gravitas.dataset.Dataset`` partagé), les lignes d'une sélection sont
+    lues dans la table Arrow en mémoire plutôt que par une requête, et la clé
+    du globe est l'empreinte de ces seules lignes. Avec ``compiled`` (partition
+    de ``gravitas.artifact``), la hiérarchie du sunburst est lue dans l'artefact ;
+    ``partners_key`` (empreinte de ``SUNBURST_COLUMNS``) remplace alors la
+    version dans sa clé.
+    """
+
+    def __init__(self, store, cache=None, maxsize=128, dataset=None, compiled=None, partners_key=None):
+        self.store = store
+        self.cache = cache if cache is not None else FigureCache(maxsize)
+        self.dataset = dataset
+        self.compiled = compiled
+        self.partners_key = partners_key
+
+    def sunburst(self, theme_mode):
+        key = ("sunburst", self.partners_key or self.store.version, (), theme_mode)
+        return self.cache.get(key, lambda: build_sunburst(
+            self.compiled.sunburst() if self.compiled is not None else sunburst_data(self.store)))
+
+    def choropleth(self, selection, theme_mode, scores=None):
+        """Globe des pays choisis ; ``scores`` remplace l'index publié s'il est repondéré."""
+        # La sélection est canonique : l'ordre de saisie ne change pas la carte
+        selection = tuple(sorted(selection))
+        weights = scores.weights if scores is not None else None
+        if self.dataset is not None:
+            rows = self.dataset.rows(selection)
+            version = self.dataset.key(CHOROPLETH_COLUMNS, rows)
+            if weights is not None:
+                # Repondéré, le classement dépend des indicateurs de tous les pays
+                version = (version, self.dataset.key(INDICATORS))
+        else:
+            version = self.store.version
+        key = ("choropleth", version, selection, theme_mode, weights)
+
+        def build():
+            if self.dataset is not None:
+                filtered_df = self.dataset.frame(rows, CHOROPLETH_COLUMNS)
+            else:
+                filtered_df = self.store.filter_countries(list(selection), CHOROPLETH_COLUMNS)
+            if weights is not None:
+                filtered_df = scores.apply(filtered_df)
+            return build_choropleth(filtered_df, theme_mode, self._geometry(filtered_df))
+
+        return self.cache.get(key, build)
+
+    def ranking_evolution(self, selection, theme_mode):
+        selection = tuple(sorted(selection))
+        key = ("ranking_evolution", self.store.panel_version, selection, theme_mode)
+        def build():
+            panel = self.store.panel(['ISO3', 'Composite index', 'Ranking'], list(selection))
+            return build_ranking_evolution(panel, theme_mode, self._geometry(panel))
+
+        return self.cache.get(key, build)
+
+    @staticmethod
+    def _geometry(df):
+        """Frontières simplifiées des seuls pays affichés (cache par ensemble de codes)."""
+        return geometry_for(tuple(sorted(df['ISO3'].dropna().unique())))
+
+
+def build_sensitivity_figure(summary):
+    """Rang médian et intervalle p5-p95 de chaque pays, classés par rang publié."""
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Scatter(
+        x=summary['Country'],
+        y=summary['p50'],
+        mode='markers',
+        marker=dict(size=10, color='#00CED1'),
+        error_y=dict(
+            type='data', symmetric=False,
+            array=summary['p95'] - summary['p50'],
+            arrayminus=summary['p50'] - summary['p5'],
+            color='#2A629A', thickness=3,
+        ),
+        customdata=summary[['Ranking', 'p5', 'p95', 'P(published rank)']],
+        hovertemplate=(
+            "<b>%{x}</b><br>" +
+            "Published rank: %{customdata[0]}<br>" +
+            "Median rank: %{y}<br>" +
+            "p5-p95: %{customdata[1]} - %{customdata[2]}<br>" +
+            "P(published rank): %{customdata[3]:.1%}<extra></extra>"
+        )
+    ))
+    fig.add_trace(go.Scatter(
+        x=summary['Country'], y=summary['Ranking'], mode='markers',
+        marker=dict(symbol='line-ew-open', size=18, color='#FF7F3E'),
+        name='Published', hoverinfo='skip'
+    ))
+    fig.update_layout(
+        showlegend=False,
+        xaxis_tickangle=-45,
+        yaxis=dict(title='Rank', autorange='reversed'),
+        height=550,
+        margin=dict(l=40, r=40, t=40, b=120)
+    )
+    return fig
+
+
+def select_box_points(values, stats, indicators, max_points, seed=0):
+    """Indices (ligne, indicateur) des points à afficher sur le boxplot.
+
+    Sous ``max_points`` tous les points sont gardés ; au-delà, les valeurs
+    hors moustaches sont toujours affichées et le reste du budget est un
+    échantillon aléatoire reproductible des autres points.
+    """
+    values = np.asarray(values, dtype=float)
+    rows, cols = np.nonzero(~np.isnan(values))
+    if len(rows) <= max_points:
+        return rows, cols
+    v = values[rows, cols]
+    lower = stats.loc[indicators, "lower_fence"].to_numpy()[cols]
+    upper = stats.loc[indicators, "upper_fence"].to_numpy()[cols]
+    outlier = (v < lower) | (v > upper)
+    keep = np.flatnonzero(outlier)
+    budget = max_points - len(keep)
+    if budget > 0:
+        rest = np.flatnonzero(~outlier)
+        rng = np.random.default_rng(seed)
+        keep = np.sort(np.r_[keep, rng.choice(rest, size=min(budget, len(rest)), replace=False)])
+    return rows[keep], cols[keep]
+
+
+def build_boxplot(countries, values, indicators, stats, max_points=BOX_POINT_LIMIT):
+    """Boxplot des indicateurs ; ``values`` est la matrice (pays x indicateurs).
+
+    Les boîtes sont des traces résumées (quartiles, moustaches et moyenne
+    calculés côté serveur) : leur taille ne dépend pas du nombre de pays. Les
+    points individuels passent par une surcouche WebGL, limitée à
+    ``max_points`` (voir ``select_box_points``).
+    """
+    import plotly.graph_objects as go
+    positions = np.arange(len(indicators))
+    color = '#636efa'
+
+    fig = go.Figure(go.Box(
+        x=positions,
+        q1=stats.loc[indicators, "q1"],
+        median=stats.loc[indicators, "median"],
+        q3=stats.loc[indicators, "q3"],
+        lowerfence=stats.loc[indicators, "lower_fence"],
+        upperfence=stats.loc[indicators, "upper_fence"],
+        mean=stats.loc[indicators, "mean"],
+        boxmean=True,
+        boxpoints=False,
+        marker_color=color,
+        name="",
+    ))
+
+    rows, cols = select_box_points(values, stats, indicators, max_points)
+    values = np.asarray(values, dtype=float)
+    # Décalage aléatoire pour que les points ne se superposent pas
+    jitter = np.random.default_rng(0).uniform(-0.3, 0.3, size=len(rows))
+    fig.add_trace(go.Scattergl(
+        x=cols + jitter,
+        y=values[rows, cols],
+        mode='markers',
+        customdata=np.column_stack([
+            np.asarray(countries, dtype=object)[rows],
+            stats.loc[indicators, "mean"].to_numpy()[cols],
+        ]),
+        hovertemplate=(
+            "<br><b>Country:</b> %{customdata[0]}" +
+            "<br><b>Value:</b> %{y:.2f}" +
+            "<br><b>Mean:</b> %{customdata[1]:.2f}<extra></extra>"
+        ),
+        marker=dict(size=6, opacity=0.6, color=color),
+    ))
+
+    fig.update_layout(
+        template="plotly_white",
+        showlegend=False,
+        xaxis=dict(tickmode='array', tickvals=positions, ticktext=list(indicators),
+                   tickangle=-45, title="Indicator"),
+        yaxis_title="Value",
+        hoverlabel=dict(
+            bgcolor="black",
+            font_size=13,
+            font_family="Arial",
+            bordercolor="white",
+            font_color="white"
+        ),
+        height=750,
+        margin=dict(l=40, r=40, t=60, b=120)
+    )
+    return fig
@@ -0,0 +1,174 @@
+"""Géométries simplifiées Afrique / Golfe pour le globe, à plusieurs niveaux de détail.
+
+Le globe n'a besoin que des pays du GASPI : ``build`` extrait leurs
+frontières d'un GeoJSON mondial (Natural Earth admin 0, par exemple) et les
+écrit à plusieurs niveaux de détail ::
+
+    python -m gravitas.geo build ne_50m_admin_0_countries.geojson
+
+La simplification aligne les sommets sur une grille (quantification, comme
+TopoJSON) puis retire les doublons et les points alignés : deux pays voisins
+arrondissent leur frontière commune de la même façon, sans trou ni
+chevauchement. Les îles qui disparaîtraient gardent leur contour à la
+précision la plus fine.
+
+Sans fichiers dans ``data/geo``, le globe utilise les géométries de Plotly
+via les codes ISO3 (``locationmode='ISO-3'``).
+"""
+import argparse
+import functools
+import json
+from pathlib import Path
+
+import numpy as np
+
+from gravitas.countries import COUNTRY_BY_ISO3
+from gravitas.store import DATA_DIR
+
+GEO_DIR = DATA_DIR / "geo"
+
+# Niveau -> pas de la grille en degrés, du plus fin au plus grossier
+LEVELS = {"high": 0.02, "medium": 0.1, "low": 0.25}
+
+# Étendue maximale (degrés) de la sélection affichée à chaque niveau :
+# fitbounds zoome sur les pays choisis, une petite sélection est vue de près
+ZOOM_SPANS = {"high": 12, "medium": 40}
+
+ISO3_KEYS = ("ISO_A3", "ADM0_A3", "ISO3", "iso_a3", "adm0_a3")
+
+
+def level_path(level, geo_dir=GEO_DIR):
+    return Path(geo_dir) / f"africa_gulf_{level}.geojson"
+
+
+def snap_ring(ring, step):
+    """Anneau aligné sur une grille de pas ``step`` ; None s'il devient dégénéré."""
+    pts = np.round(np.asarray(ring, dtype=float)[:, :2] / step) * step
+    pts = pts[np.r_[True, np.any(np.diff(pts, axis=0) != 0, axis=1)]]
+    if len(pts) > 3:
+        # Points alignés avec leurs voisins : inutiles au tracé
+        a, b, c = pts[:-2], pts[1:-1], pts[2:]
+        cross = (b - a)[:, 0] * (c - b)[:, 1] - (b - a)[:, 1] * (c - b)[:, 0]
+        pts = np.vstack([pts[:1], pts[1:-1][cross != 0], pts[-1:]])
+    if not np.array_equal(pts[0], pts[-1]):
+        pts = np.vstack([pts, pts[:1]])
+    if len(np.unique(pts, axis=0)) < 3:
+        return None
+    return np.round(pts, 4).tolist()
+
+
+def _polygons(geometry):
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def simplify_geometry(geometry, step, fallback_step):
+    """Simplifie chaque polygone ; un polygone effacé garde son contour au pas ``fallback_step``."""
+    polygons = []
+    for rings in _polygons(geometry):
+        exterior = snap_ring(rings[0], step) or snap_ring(rings[0], fallback_step)
+        if exterior is None:
+            continue
+        holes = [h for h in (snap_ring(r, step) for r in rings[1:]) if h is not None]
+        polygons.append([exterior, *holes])
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+def _bbox(geometry):
+    pts = np.array([p for polygon in geometry["coordinates"] for p in polygon[0]])
+    return [*pts.min(axis=0).round(4).tolist(), *pts.max(axis=0).round(4).tolist()]
+
+
+def _iso3(feature):
+    props = feature.get("properties") or {}
+    for key in ISO3_KEYS:
+        if props.get(key) in COUNTRY_BY_ISO3:
+            return props[key]
+    return feature.get("id") if feature.get("id") in COUNTRY_BY_ISO3 else None
+
+
+def build(source, geo_dir=GEO_DIR, levels=LEVELS):
+    """Écrit un FeatureCollection par niveau (``id`` = ISO3, ``bbox`` par pays)."""
+    features = json.loads(Path(source).read_text())["features"]
+    selected = {}
+    for feature in features:
+        code = _iso3(feature)
+        if code and code not in selected:
+            selected[code] = feature["geometry"]
+    missing = sorted(set(COUNTRY_BY_ISO3) - set(selected))
+
+    Path(geo_dir).mkdir(parents=True, exist_ok=True)
+    fallback = min(levels.values())
+    written = {}
+    for level, step in levels.items():
+        out = []
+        for code, geometry in sorted(selected.items()):
+            simplified = simplify_geometry(geometry, step, fallback)
+            out.append({"type": "Feature", "id": code, "bbox": _bbox(simplified),
+                        "properties": {"name": COUNTRY_BY_ISO3[code]},
+                        "geometry": simplified})
+        path = level_path(level, geo_dir)
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": out},
+                                   separators=(",", ":")))
+        written[level] = path
+    load_level.cache_clear()
+    geometry_for.cache_clear()
+    return written, missing
+
+
+@functools.lru_cache(maxsize=None)
+def load_level(level, geo_dir=GEO_DIR):
+    """{ISO3: feature} d'un niveau, lu une fois par processus ; None si absent."""
+    path = level_path(level, geo_dir)
+    if not path.exists():
+        return None
+    return {f["id"]: f for f in json.loads(path.read_text())["features"]}
+
+
+def choose_level(features):
+    """Niveau adapté à l'étendue des pays affichés (zoom de fitbounds)."""
+    boxes = np.array([f["bbox"] for f in features])
+    span = max(boxes[:, 2].max() - boxes[:, 0].min(), boxes[:, 3].max() - boxes[:, 1].min())
+    for level, max_span in ZOOM_SPANS.items():
+        if span <= max_span:
+            return level
+    return "low"
+
+
+@functools.lru_cache(maxsize=256)
+def geometry_for(codes, geo_dir=GEO_DIR):
+    """FeatureCollection des seuls pays ``codes`` au niveau adapté ; None sans géométrie livrée.
+
+    ``codes`` est un tuple trié (clé de cache).
+    """
+    coarse = load_level("low", geo_dir)
+    if not coarse:
+        return None
+    known = [coarse[c] for c in codes if c in coarse]
+    if not known:
+        return None
+    features = load_level(choose_level(known), geo_dir) or coarse
+    return {"type": "FeatureCollection",
+            "features": [features[c] for c in codes if c in features]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.geo")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("build", help="extract and simplify the GASPI countries from a world GeoJSON")
+    cmd.add_argument("source", help="world countries GeoJSON (e.g. Natural Earth admin 0)")
+    cmd.add_argument("--out", default=GEO_DIR)
+    args = parser.parse_args(argv)
+
+    written, missing = build(args.source, args.out)
+    for level, path in written.items():
+        print(f"{level}: {path} ({path.stat().st_size / 1024:.0f} KB)")
+    if missing:
+        print(f"not found in source: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
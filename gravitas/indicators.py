@@ -0,0 +1,104 @@
+"""Référentiel des indicateurs du Composite index GASPI."""
+
+# Les 13 indicateurs normalisés [0, 1], dans l'ordre des colonnes du CSV
+INDICATORS = [
+    "GDP", "Per Capita Income (PCI)", "Import", "Export",
+    "Foreign Direct Investments (FDI)", "Renewables", "Logistic Performance Index (LPI)",
+    "Diplomatic Level Of Representation(LOR)", "Government Efficacity", "Political stability",
+    "Population", "Urban Population", "Arable Land",
+]
+
+COMPOSITE = "Composite index"
+RANKING = "Ranking"
+
+# Piliers du Composite index et pondérations documentées (cf. carte de liens)
+PILLARS = {
+    "Economic": [
+        "GDP", "Per Capita Income (PCI)", "Import", "Export",
+        "Foreign Direct Investments (FDI)", "Renewables", "Logistic Performance Index (LPI)",
+    ],
+    "Political": [
+        "Diplomatic Level Of Representation(LOR)", "Government Efficacity", "Political stability",
+    ],
+    "Social": ["Population", "Urban Population", "Arable Land"],
+}
+PILLAR_WEIGHTS = {"Economic": 0.40, "Political": 0.35, "Social": 0.25}
+
+
+# Référentiel de la carte de liens : identifiant du nœud, libellé et description
+COMPOSITE_INFO = {
+    "id": "Composite", "name": "Composite Index",
+    "description": "The overall macroeconomic composite index used to rank investment attractiveness. It combines 13 key indicators across three main pillars: economic importance (i), political and diplomatic relations (ii), and social and strategic significance (iii) ",
+}
+
+# Le libellé affiché ajoute la pondération (PILLAR_WEIGHTS)
+PILLAR_INFO = {
+    "Economic": {
+        "name": "Economic Importance",
+        "description": "The first pillar, economic importance, consists of five indicators that reflect the strength of economic engagement between Africa and the Gulf. These include the volume of bilateral trade with GCC countries, the stock of Gulf foreign direct investment, partnerships in energy and infrastructure, Gulf investments in African agriculture, African countries renewables energy capacity and Logistic Performance Index. These indicators highlight the economic interdependence between the regions and the role of African countries in supplying key commodities and investment opportunities to Gulf states.",
+    },
+    "Political": {
+        "name": "Political & Diplomatic Relations",
+        "description": "The second pillar, political and diplomatic relations, evaluates the strength of diplomatic engagement and governance quality. It includes three indicators: the level of diplomatic ties between GCC and African countries, the political stability score of each African country, and government effectiveness as measured by governance indices. These indicators provide insight into the reliability of African partners for long-term cooperation, as well as their institutional capacity to facilitate trade and investment.",
+    },
+    "Social": {
+        "name": "Social & Strategic Significance",
+        "description": "The third pillar, social and strategic significance, captures demographic and agricultural potential. It comprises three indicators: total population size, the urbanization rate as a proxy for market potential, and the food security and agricultural capacity of each African country. These factors are crucial for understanding Africa's role in meeting Gulf countries' long-term food security needs and their potential as key consumer markets.",
+    },
+}
+
+# Indicateur (colonne du CSV) -> nœud de la carte
+INDICATOR_INFO = {
+    "GDP": {
+        "id": "GDP", "name": "African Countries' GDP (PPP, Const $)",
+        "description": "This indicator measures the economic size or market potential of African countries, using GDP data converted to Purchasing Power Parity (PPP) and constant dollars. The data, sourced from the World Development Indicators (WDI), helps assess the relative economic strength and potential of African markets for GCC countries.",
+    },
+    "Per Capita Income (PCI)": {
+        "id": "PCI", "name": "African Countries' GDP Per Capita",
+        "description": "This metric, also sourced from the World Development Indicators (WDI), measures the GDP per capita of African countries. It provides insight into the purchasing power of citizens in each country, indicating the economic well-being and market potential at the individual level.",
+    },
+    "Import": {
+        "id": "Imports", "name": "GCC Imports of Goods and Services from African Countries",
+        "description": "This measure captures the average imports of goods and services from African countries to the GCC region over the period 2020-2024.",
+    },
+    "Export": {
+        "id": "Exports", "name": "GCC Exports of Goods and Services from African Countries",
+        "description": "This indicator reports the average exports of goods and services from the GCC region to African countries between 2020-2024.",
+    },
+    "Foreign Direct Investments (FDI)": {
+        "id": "FDI", "name": "GCC Greenfield Foreign Direct Investment (FDI) to African Countries",
+        "description": "This metric assesses the total stock of Greenfield FDI from GCC countries to African nations between 2020-2024, based on data from the fDi Markets database. Greenfield FDI represents new investments that involve the establishment of new operations, such as factories or subsidiaries.",
+    },
+    "Renewables": {
+        "id": "Renewables", "name": "Renewable Energy Share",
+        "description": "Renewable power capacity growth refers to the expansion of energy generation from renewable sources over time. This includes hydropower (excluding pumped storage), solar energy, wind energy, bioenergy, geothermal energy, and marine energy. Data on the growth of renewable power capacity is sourced from the International Renewable Energy Agency (IRENA)",
+    },
+    "Logistic Performance Index (LPI)": {
+        "id": "LPI", "name": "Logistic Performance Index",
+        "description": "The World Bank's Logistics Performance Index (LPI) is a tool that measures the relative ease and efficiency with which products can be moved into and within a country. The LPI is developed based on a worldwide survey of global freight forwarders and express carriers, combining their feedback with quantitative data on the performance of key logistics components. It evaluates countries across six key dimensions: the efficiency of customs clearance, the quality of trade and transport-related infrastructure, the ease of arranging competitively priced international shipments, the quality of logistics services, the ability to track and trace consignments, and the timeliness of shipments. LPI scores range from 1 to 5, with higher scores indicating better performance.",
+    },
+    "Diplomatic Level Of Representation(LOR)": {
+        "id": "Diplomacy", "name": "Diplomatic Ties with GCC",
+        "description": "For this we use a diplomatic representation database. The latest database is available until 2022. The Level of Representation Index (LoRI) is a scale ranging from 0 to 1, designed to measure the formal level of diplomatic accreditation along with the degree of focus on the bilateral relationship. A country receives the highest score of 1.00 if it is represented by an Ambassador, Nuncio, or Secretary of the People's Bureau with a singular focus on the relationship. A slightly lower score of 0.75 is assigned if the representation is through a Charge d'affaires, minister, or an unknown status, but still with a singular focus. When an Ambassador, Nuncio, or Secretary of the People's Bureau is accredited with multiple areas of focus, the score is 0.50, while the presence of a Charge d'affaires, minister, or an unknown status with multiple focuses results in a score of 0.375. Countries with only an interest desk receive a score of 0.125, whereas those whose interests are merely served by another entity are assigned 0.10. Finally, the lowest score of 0.00 is given when diplomatic relations have been expelled, recalled, or withdrawn. As there are six GCC countries, we need to sum up, and in this case the maximum any African country gets is 6. For example, if all of the GCC sates have ambassador to Nigeria, it means the level of representation index is 6. If three countries from the GCC have ambassadors to Gambia and two GCC countries have Charge d'affaires and one GCC country has only an interest desk, the score for the Gambia would be 1+1+1+0.75+0.75+0.125=4.625",
+    },
+    "Government Efficacity": {
+        "id": "Governance", "name": "Government Effectiveness",
+        "description": "The Government Effectiveness indicator, sourced from the World Bank's Worldwide Governance Indicators (WGI), measures perceptions of the quality of public services, the competence and independence of the civil service from political influence, the effectiveness of policy formulation and implementation, and the government's commitment to its policies. This index is composed of various factors, including bureaucratic quality, road infrastructure, primary education quality, public satisfaction with transportation, and overall governance efficiency. Countries are ranked on a percentile scale from 0 to 100, with higher scores indicating more effective governance. The most recent data is from 2023",
+    },
+    "Political stability": {
+        "id": "Stability", "name": "Political Stability",
+        "description": "The Political Stability and Absence of Violence/Terrorism indicator, provided by the World Bank's Worldwide Governance Indicators (WGI), assesses government performance in maintaining stability and preventing politically motivated violence, including terrorism. It reflects perceptions of the likelihood of political instability and unrest, drawing from multiple measures such as orderly transfers of power, violent demonstrations, social unrest, political terror scale, external and internal conflicts, and ethnic tensions. Countries are ranked on a percentile scale from 0 to 100, with higher values indicating greater political stability. The most recent data is from 2023.",
+    },
+    "Population": {
+        "id": "Population", "name": "Population Size",
+        "description": "Population size is a key demographic indicator, reflecting the overall market potential of a country. A larger population often signifies a bigger consumer base, greater labour force availability, and increased economic activity. Countries with sizable populations tend to attract more trade and investment opportunities, making this an essential factor in economic and diplomatic considerations.",
+    },
+    "Urban Population": {
+        "id": "Urban", "name": "Urbanization Rate/population",
+        "description": "The urbanization rate, measured as the percentage of a country's population living in urban areas, serves as a crucial proxy for economic development, infrastructure needs, and technological readiness. Higher urbanization levels often correlate with improved infrastructure, greater digital connectivity, and stronger prospects for collaboration in sectors such as the digital economy, smart cities, and advanced transportation systems. This indicator provides insights into a country's modernization efforts and its capacity for future economic growth.",
+    },
+    "Arable Land": {
+        "id": "Food", "name": "Food Security & Agriculture",
+        "description": "Food security and agricultural potential are strategic priorities, particularly for regions reliant on food imports, such as the Gulf Cooperation Council (GCC) countries. To assess this, we consider key indicators like arable land availability and irrigation potential estimates, which determine a country's ability to sustain agricultural production. Given the importance of agriculture for food security, trade, and investment, this metric helps identify nations with strong potential for collaboration in agri-business, food supply chains, and sustainable farming practices.",
+    },
+}
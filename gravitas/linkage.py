@@ -0,0 +1,183 @@
+"""Carte de liens du Composite index, générée depuis le référentiel des indicateurs.
+
+Le graphe (index -> piliers -> indicateurs) est construit à partir de
+``gravitas.indicators`` ; en mode étendu, chaque pays est relié aux
+indicateurs où il obtient ses meilleurs scores.
+
+Les positions sont calculées côté serveur par une mise en page radiale
+vectorisée et transmises à Cytoscape avec la mise en page ``preset`` : le
+navigateur ne relance plus de simulation de forces, même avec des milliers
+de nœuds ::
+
+    python -m gravitas.linkage export lib/network.json
+"""
+import argparse
+import json
+
+import numpy as np
+
+from gravitas.indicators import (COMPOSITE_INFO, INDICATOR_INFO, INDICATORS, PILLAR_INFO,
+                                 PILLAR_WEIGHTS, PILLARS)
+
+# Mise en page à passer à st_link_analysis : positions fournies par les nœuds
+PRESET_LAYOUT = {"name": "preset", "fit": True, "padding": 20, "animate": False}
+
+# Rayons (px) des anneaux : piliers, indicateurs, premier anneau de pays
+PILLAR_RADIUS = 140
+INDICATOR_RADIUS = 300
+COUNTRY_RADIUS = 480
+# Écart minimal entre deux pays voisins, sur un anneau et entre anneaux
+COUNTRY_SPACING = 36
+
+
+def base_graph():
+    """Nœuds et arêtes index -> piliers -> indicateurs (données Cytoscape, sans positions)."""
+    nodes = [{"data": {"label": "INDEX", **COMPOSITE_INFO}}]
+    edges = []
+    for pillar, indicators in PILLARS.items():
+        info = PILLAR_INFO[pillar]
+        nodes.append({"data": {
+            "id": pillar, "label": "PILLAR",
+            "name": f"{info['name']} ({PILLAR_WEIGHTS[pillar]:.0%})",
+            "description": info["description"],
+        }})
+        edges.append({"data": {"id": f"e{len(edges) + 1}", "label": "INCLUDES",
+                               "source": COMPOSITE_INFO["id"], "target": pillar}})
+    for pillar, indicators in PILLARS.items():
+        for indicator in indicators:
+            info = INDICATOR_INFO[indicator]
+            nodes.append({"data": {"id": info["id"], "label": "INDICATOR", "name": info["name"],
+                                   "description": info["description"]}})
+            edges.append({"data": {"id": f"e{len(edges) + 1}", "label": "MEASURED_BY",
+                                   "source": pillar, "target": info["id"]}})
+    return {"nodes": nodes, "edges": edges}
+
+
+def top_indicators(values, k):
+    """Indices des ``k`` meilleurs indicateurs de chaque ligne, du plus fort au plus faible."""
+    k = min(k, values.shape[1])
+    top = np.argpartition(-values, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(values, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _indicator_angles():
+    """Angle de chaque indicateur (dans l'ordre d'INDICATORS), regroupés par pilier."""
+    ordered = [i for indicators in PILLARS.values() for i in indicators]
+    angles = 2 * np.pi * np.arange(len(ordered)) / len(ordered) - np.pi / 2
+    by_name = dict(zip(ordered, angles))
+    return np.array([by_name[i] for i in INDICATORS])
+
+
+def _circular_mean(angles, weights=None, axis=-1):
+    return np.arctan2(np.average(np.sin(angles), weights=weights, axis=axis),
+                      np.average(np.cos(angles), weights=weights, axis=axis))
+
+
+def _ring_slots(preferred):
+    """Rayons et angles sans chevauchement pour des pays d'angles préférés ``preferred``.
+
+    Le nombre d'anneaux suit la place nécessaire ; chaque anneau reçoit une part
+    proportionnelle à sa circonférence. Les places de tous les anneaux sont
+    fusionnées par angle et attribuées aux pays triés par angle préféré : des
+    pays voisins alternent entre anneaux. Chaque anneau est enfin tourné pour
+    rester au plus près des angles préférés.
+    """
+    n = len(preferred)
+    radius, theta = np.empty(n), np.empty(n)
+    if not n:
+        return radius, theta
+    capacities = []
+    while sum(capacities) < n:
+        r = COUNTRY_RADIUS + len(capacities) * COUNTRY_SPACING
+        capacities.append(int(2 * np.pi * r / COUNTRY_SPACING))
+    counts = np.floor(np.array(capacities) / sum(capacities) * n).astype(int)
+    counts[-1] += n - counts.sum()
+
+    ring = np.repeat(np.arange(len(counts)), counts)
+    fraction = np.concatenate([(np.arange(c) + 0.5) / c for c in counts])
+    slots = np.argsort(fraction, kind="stable")
+    order = np.argsort(preferred, kind="stable")
+    ring_of = np.empty(n, dtype=int)
+    frac_of = np.empty(n)
+    ring_of[order] = ring[slots]
+    frac_of[order] = fraction[slots]
+
+    slot_angle = 2 * np.pi * frac_of
+    for j in range(len(counts)):
+        members = ring_of == j
+        if members.any():
+            offset = _circular_mean(preferred[members] - slot_angle[members])
+            theta[members] = slot_angle[members] + offset
+            radius[members] = COUNTRY_RADIUS + j * COUNTRY_SPACING
+    return radius, theta
+
+
+def radial_layout(countries=(), values=None, top=None):
+    """Positions {id: (x, y)} : index au centre, puis piliers, indicateurs et pays."""
+    angles = _indicator_angles()
+    positions = {COMPOSITE_INFO["id"]: (0.0, 0.0)}
+    for indicator, angle in zip(INDICATORS, angles):
+        positions[INDICATOR_INFO[indicator]["id"]] = (INDICATOR_RADIUS * np.cos(angle),
+                                                      INDICATOR_RADIUS * np.sin(angle))
+    for pillar, indicators in PILLARS.items():
+        angle = _circular_mean(angles[[INDICATORS.index(i) for i in indicators]])
+        positions[pillar] = (PILLAR_RADIUS * np.cos(angle), PILLAR_RADIUS * np.sin(angle))
+
+    if len(countries):
+        # Angle préféré : moyenne des angles des meilleurs indicateurs, pondérée par le score
+        weights = np.take_along_axis(values, top, axis=1) + 1e-9
+        preferred = _circular_mean(angles[top], weights=weights, axis=1)
+        radius, theta = _ring_slots(preferred)
+        xs, ys = radius * np.cos(theta), radius * np.sin(theta)
+        for country, x, y in zip(countries, xs, ys):
+            positions[f"country:{country}"] = (x, y)
+    return positions
+
+
+def build_graph(countries=(), values=None, top_k=3):
+    """Éléments Cytoscape positionnés ; ``countries``/``values`` activent le mode étendu.
+
+    ``values`` est la matrice (pays x INDICATORS) ; chaque pays est relié à ses
+    ``top_k`` meilleurs indicateurs.
+    """
+    graph = base_graph()
+    top = None
+    if len(countries):
+        values = np.asarray(values, dtype=float)
+        top = top_indicators(values, top_k)
+        nodes, edges = graph["nodes"], graph["edges"]
+        for i, country in enumerate(countries):
+            best = [INDICATORS[j] for j in top[i]]
+            nodes.append({"data": {
+                "id": f"country:{country}", "label": "COUNTRY", "name": country,
+                "description": "Strongest indicators: " + ", ".join(
+                    f"{b} ({values[i, j]:.2f})" for b, j in zip(best, top[i])),
+            }})
+            for rank, indicator in enumerate(best, start=1):
+                edges.append({"data": {
+                    "id": f"e{len(edges) + 1}", "label": "SCORES_HIGH", "rank": rank,
+                    "source": f"country:{country}", "target": INDICATOR_INFO[indicator]["id"],
+                }})
+
+    positions = radial_layout(countries, values, top)
+    for node in graph["nodes"]:
+        x, y = positions[node["data"]["id"]]
+        node["position"] = {"x": round(float(x), 1), "y": round(float(y), 1)}
+    return graph
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.linkage")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="write the positioned base graph as JSON")
+    export.add_argument("out", nargs="?", default="lib/network.json")
+    args = parser.parse_args(argv)
+
+    with open(args.out, "w") as f:
+        json.dump(build_graph(), f, indent=1, ensure_ascii=False)
+    print(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Matrice NumPy des indicateurs indexée par pays.
+
+Les cartes, le radar et les camemberts lisent tous cette matrice : une
+sélection de pays devient un seul découpage vectorisé au lieu d'un filtre
+``df[df["Country"] == country]`` par pays et par indicateur.
+"""
+import numpy as np
+
+from gravitas.indicators import COMPOSITE, INDICATORS, RANKING
+
+
+class IndicatorMatrix:
+    """Valeurs (pays x colonnes) avec index de lignes et de colonnes."""
+
+    def __init__(self, df, columns=None):
+        self.columns = list(columns or INDICATORS + [COMPOSITE, RANKING])
+        self.countries = df["Country"].tolist()
+        self.values = df[self.columns].to_numpy(dtype=float)
+        self._row = {country: i for i, country in enumerate(self.countries)}
+        self._col = {column: j for j, column in enumerate(self.columns)}
+
+    @classmethod
+    def from_dataset(cls, dataset, columns=None):
+        """Matrice construite sur un ``Dataset`` partagé, en lecture seule."""
+        matrix = cls.__new__(cls)
+        matrix.columns = list(columns or INDICATORS + [COMPOSITE, RANKING])
+        matrix.countries = dataset.countries
+        matrix.values = np.column_stack([dataset.column(c) for c in matrix.columns]) \
+            if matrix.columns else np.empty((len(dataset), 0))
+        matrix.values.setflags(write=False)
+        matrix._row = dataset._row
+        matrix._col = {column: j for j, column in enumerate(matrix.columns)}
+        return matrix
+
+    def __contains__(self, country):
+        return country in self._row
+
+    def take(self, countries, columns=None, fill=0.0):
+        """Bloc (len(countries) x len(columns)) ; les pays inconnus valent ``fill``."""
+        cols = [self._col[c] for c in (columns or self.columns)]
+        rows = np.array([self._row.get(c, -1) for c in countries], dtype=np.intp)
+        if not len(self.values):
+            return np.full((len(rows), len(cols)), fill)
+        block = self.values[np.ix_(np.maximum(rows, 0), cols)]
+        block[rows < 0] = fill
+        return block
+
+    def view(self, columns):
+        """Toutes les lignes pour ``columns`` : une vue sans copie si les colonnes se suivent."""
+        cols = [self._col[c] for c in columns]
+        if cols and cols == list(range(cols[0], cols[0] + len(cols))):
+            return self.values[:, cols[0]:cols[0] + len(cols)]
+        return self.values[:, cols]
+
+    def cards(self, countries):
+        """(pays, Composite index, Ranking) pour les pays connus."""
+        known = [c for c in countries if c in self._row]
+        block = self.take(known, [COMPOSITE, RANKING])
+        return [(c, float(value), int(rank)) for c, (value, rank) in zip(known, block)]
+
+    def radar_data(self, countries, indicators=INDICATORS):
+        """Une ligne par indicateur, une clé par pays (format nivo.Radar)."""
+        block = np.round(self.take(countries, indicators), 2).T
+        return [
+            {"indicator": var, **dict(zip(countries, row.tolist()))}
+            for var, row in zip(indicators, block)
+        ]
+
+    def pie_data(self, countries, indicators=INDICATORS):
+        """Données nivo.Pie par pays, pour les pays connus."""
+        known = [c for c in countries if c in self._row]
+        block = np.round(self.take(known, indicators), 3)
+        return {
+            country: [
+                {"id": var, "label": var, "value": value}
+                for var, value in zip(indicators, row.tolist())
+            ]
+            for country, row in zip(known, block)
+        }
@@ -0,0 +1,329 @@
+"""Pipeline brut -> normalisé des 13 indicateurs.
+
+Les colonnes du CSV arrivent déjà ramenées sur [0, 1] par un tableur. Ce
+module garde les valeurs brutes (table ``indicator_raw`` de chaque partition)
+et les normalise lui-même, en une opération NumPy sur toute la matrice
+(pays x indicateurs) :
+
+- ``minmax`` : (x - min) / (max - min), sur [0, 1] (méthode du tableur)
+- ``zscore`` : (x - moyenne) / écart-type, non borné (valeurs négatives)
+- ``rank`` : rang centile (ex aequo au rang moyen), sur [0, 1]
+- ``log`` : log(1 + x - min) / log(1 + max - min), pour les séries très asymétriques
+
+Chaque méthode se décompose en ``fit`` (statistiques par colonne), ``merge``
+(statistiques complétées par de nouvelles lignes, sans relire les
+anciennes) et ``apply``. ``Pipeline`` garde les statistiques et la matrice
+de chaque méthode déjà demandée ; ``updated`` reprend ce travail quand des
+pays s'ajoutent : seules les colonnes dont les statistiques changent sont
+recalculées, les autres ne calculent que les nouvelles lignes. ``register``
+ajoute une méthode ; ``bounded`` indique si elle reste sur [0, 1], ce
+qu'exigent les camemberts (parts) et le radar (rayon à partir de 0).
+
+Sans table brute, les valeurs publiées tiennent lieu de valeurs brutes.
+Les séries World Bank (``gravitas.worldbank ingest``) fournissent les vraies
+valeurs de 7 indicateurs, un CSV large (Country + indicateurs) les autres ::
+
+    python -m gravitas.normalize build [--raw raw.csv]
+    python -m gravitas.normalize show --method zscore
+"""
+import argparse
+import threading
+import warnings
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from gravitas.artifact import read_csv
+from gravitas.indicators import COMPOSITE, INDICATORS, RANKING
+from gravitas.scoring import rank_desc
+from gravitas.store import DEFAULT_EDITION, DEFAULT_YEAR, GravitasStore, partition_dir
+
+RAW_TABLE = "indicator_raw"
+PUBLISHED = "published"
+
+# Méthode -> statistiques par colonne (lignes x indicateurs), fusion, application,
+# valeurs sur [0, 1]
+Method = namedtuple("Method", ["fit", "merge", "apply", "bounded"])
+METHODS = {}
+
+LABELS = {
+    PUBLISHED: "Published (spreadsheet)",
+    "minmax": "Min-max",
+    "zscore": "Z-score",
+    "rank": "Percentile rank",
+    "log": "Log + min-max",
+}
+
+
+def register(name, fit, merge, apply, label=None, bounded=True):
+    """Ajoute une méthode de normalisation (fonctions vectorisées sur des matrices)."""
+    METHODS[name] = Method(fit, merge, apply, bounded)
+    LABELS.setdefault(name, label or name)
+
+
+def bounded(method):
+    """Vrai si ``method`` donne des valeurs sur [0, 1] (valeurs publiées comprises)."""
+    return method == PUBLISHED or METHODS[method].bounded
+
+
+def _ratio(num, den):
+    """num / den, 0 là où la colonne est constante."""
+    den = np.broadcast_to(den, num.shape)
+    return np.divide(num, den, out=np.where(np.isnan(num), np.nan, 0.0), where=den > 0)
+
+
+# --- Min-max et log : minimum et maximum de chaque colonne ---
+
+def _bounds(raw):
+    # Colonne entièrement vide : NaN, sans avertissement
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.vstack([np.nanmin(raw, axis=0), np.nanmax(raw, axis=0)])
+
+
+def _merge_bounds(stats, rows):
+    new = _bounds(rows)
+    return np.vstack([np.fmin(stats[0], new[0]), np.fmax(stats[1], new[1])])
+
+
+def _minmax(raw, stats):
+    return _ratio(raw - stats[0], stats[1] - stats[0])
+
+
+def _log(raw, stats):
+    with np.errstate(invalid="ignore"):
+        return _ratio(np.log1p(raw - stats[0]), np.log1p(stats[1] - stats[0]))
+
+
+# --- Z-score : effectif, moyenne et somme des carrés des écarts (fusion de Chan) ---
+
+def _moments(raw):
+    n = np.sum(~np.isnan(raw), axis=0).astype(float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nan_to_num(np.nanmean(raw, axis=0))
+    m2 = np.nansum((raw - mean) ** 2, axis=0)
+    return np.vstack([n, mean, m2])
+
+
+def _merge_moments(stats, rows):
+    (na, ma, m2a), (nb, mb, m2b) = stats, _moments(rows)
+    n = na + nb
+    delta = mb - ma
+    weight = np.divide(nb, n, out=np.zeros_like(n), where=n > 0)
+    return np.vstack([n, ma + delta * weight, m2a + m2b + delta ** 2 * na * weight])
+
+
+def _zscore(raw, stats):
+    n, mean, m2 = stats
+    std = np.sqrt(np.divide(m2, n, out=np.zeros_like(m2), where=n > 0))
+    return _ratio(raw - mean, std)
+
+
+# --- Rang centile : colonnes triées (NaN en fin) ---
+
+def _sorted(raw):
+    return np.sort(raw, axis=0)
+
+
+def _merge_sorted(stats, rows):
+    # Deux suites déjà triées : le tri stable (timsort) les fusionne en temps linéaire
+    return np.sort(np.concatenate([stats, rows]), axis=0, kind="stable")
+
+
+def _rank(raw, stats):
+    out = np.full(raw.shape, np.nan)
+    for j in range(raw.shape[1]):
+        column = stats[:, j]
+        column = column[:np.count_nonzero(~np.isnan(column))]
+        x = raw[:, j]
+        valid = ~np.isnan(x)
+        lo = np.searchsorted(column, x[valid], "left")
+        hi = np.searchsorted(column, x[valid], "right")
+        out[valid, j] = (lo + hi - 1) / 2 / max(len(column) - 1, 1)
+    return out
+
+
+register("minmax", _bounds, _merge_bounds, _minmax)
+register("zscore", _moments, _merge_moments, _zscore, bounded=False)
+register("rank", _sorted, _merge_sorted, _rank)
+register("log", _bounds, _merge_bounds, _log)
+
+
+def _readonly(array):
+    array.setflags(write=False)
+    return array
+
+
+def _same_columns(a, b):
+    """Colonnes dont les statistiques n'ont pas changé."""
+    if a.shape != b.shape:
+        return np.zeros(a.shape[1], dtype=bool)
+    return np.all((a == b) | (np.isnan(a) & np.isnan(b)), axis=0)
+
+
+class Pipeline:
+    """Valeurs brutes (pays x indicateurs) et leurs versions normalisées, par méthode.
+
+    Immuable une fois construit (partagé entre les sessions) ; les méthodes
+    sont calculées à la première demande puis gardées.
+    """
+
+    def __init__(self, countries, raw, indicators=INDICATORS):
+        self.countries = list(countries)
+        self.raw = _readonly(np.array(raw, dtype=float))
+        self.indicators = list(indicators)
+        self._row = {c: i for i, c in enumerate(self.countries)}
+        self._stats = {}
+        self._normalized = {}
+        self._lock = threading.Lock()
+        # Lignes calculées au dernier updated (toutes pour un pipeline neuf)
+        self.computed = len(self.countries)
+
+    def normalized(self, method):
+        """Matrice normalisée (lecture seule) de ``method``, calculée une fois."""
+        values = self._normalized.get(method)
+        if values is None:
+            with self._lock:
+                values = self._normalized.get(method)
+                if values is None:
+                    m = METHODS[method]
+                    self._stats[method] = stats = m.fit(self.raw)
+                    self._normalized[method] = values = _readonly(m.apply(self.raw, stats))
+        return values
+
+    def updated(self, countries, raw):
+        """Pipeline des nouvelles valeurs ; incrémental si des pays ont seulement été ajoutés."""
+        pipeline = Pipeline(countries, raw, self.indicators)
+        old_rows = np.array([self._row.get(c, -1) for c in pipeline.countries], dtype=np.intp)
+        known = old_rows >= 0
+        # Pays modifiés ou retirés : les statistiques ne se fusionnent plus
+        if known.sum() != len(self.countries) or not np.array_equal(
+                pipeline.raw[known], self.raw[old_rows[known]], equal_nan=True):
+            return pipeline
+
+        added = pipeline.raw[~known]
+        with self._lock:
+            done = list(self._normalized.items())
+        for method, old in done:
+            m = METHODS[method]
+            stats = m.merge(self._stats[method], added) if len(added) else self._stats[method]
+            same = _same_columns(stats, self._stats[method])
+            values = np.empty_like(pipeline.raw)
+            values[np.ix_(known, same)] = old[np.ix_(old_rows[known], same)]
+            values[np.ix_(~known, same)] = m.apply(added[:, same], stats[:, same])
+            values[:, ~same] = m.apply(pipeline.raw[:, ~same], stats[:, ~same])
+            pipeline._stats[method] = stats
+            pipeline._normalized[method] = _readonly(values)
+        pipeline.computed = len(added)
+        return pipeline
+
+    def frame(self, countries=None):
+        """Valeurs brutes des ``countries`` (toutes par défaut) en DataFrame."""
+        rows = range(len(self.countries)) if countries is None else \
+            [self._row[c] for c in countries if c in self._row]
+        out = pd.DataFrame(self.raw[list(rows)], columns=self.indicators)
+        out.insert(0, "Country", [self.countries[i] for i in rows])
+        return out
+
+
+def normalized_table(table, pipeline, method):
+    """Table ``country_index`` dont les indicateurs, le composite et le classement viennent de ``method``.
+
+    Une valeur manquante vaut 0 : le minimum en min-max et en rang, la moyenne en z-score.
+    """
+    rows = np.array([pipeline._row.get(c, -1) for c in table.column("Country").to_pylist()], dtype=np.intp)
+    values = pipeline.normalized(method)[np.maximum(rows, 0)]
+    values = np.nan_to_num(np.where((rows >= 0)[:, None], values, np.nan))
+    composite = values.sum(axis=1)
+    columns = {**dict(zip(pipeline.indicators, values.T)), COMPOSITE: composite, RANKING: rank_desc(composite)}
+    for name, column in columns.items():
+        if name in table.column_names:
+            table = table.set_column(table.column_names.index(name), name, pa.array(column))
+    return table
+
+
+def raw_path(store):
+    return partition_dir(store.parquet_dir, RAW_TABLE, store.edition, store.year) / "data.parquet"
+
+
+def raw_version(store):
+    """Empreinte de la table brute de la partition (None si elle n'existe pas)."""
+    path = raw_path(store)
+    return GravitasStore._fingerprint([path]) if path.exists() else None
+
+
+def read_raw(store):
+    """Valeurs brutes (Country + indicateurs) de la partition ; valeurs publiées à défaut."""
+    path = raw_path(store)
+    if path.exists():
+        return pq.read_table(path).to_pandas()
+    return store.table("country_index")[["Country", *INDICATORS]]
+
+
+def build_raw(index, worldbank=None, raw=None):
+    """Table brute : ``raw`` (CSV large), puis moyennes World Bank, puis valeurs publiées.
+
+    Une série World Bank ne remplace une colonne que si elle couvre tous les pays de l'index.
+    """
+    out = index[["Country", *INDICATORS]].set_index("Country").astype(float)
+    sources = dict.fromkeys(INDICATORS, "published")
+    if worldbank is not None and len(worldbank):
+        means = (worldbank.dropna(subset=["value"])
+                 .pivot_table(index="Country", columns="indicator", values="value", aggfunc="mean")
+                 .reindex(out.index))
+        for column in means.columns.intersection(INDICATORS):
+            if means[column].notna().all():
+                out[column] = means[column]
+                sources[column] = "worldbank"
+    if raw is not None:
+        raw = raw.set_index("Country").reindex(out.index)
+        for column in raw.columns.intersection(INDICATORS):
+            out[column] = raw[column].astype(float).fillna(out[column])
+            sources[column] = "raw"
+    return out.reset_index(), sources
+
+
+def write_raw(store, table):
+    out = raw_path(store)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    table.to_parquet(out, index=False)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.normalize")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("build", "show"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--parquet-dir", help="Parquet store (default: data/parquet)")
+        cmd.add_argument("--edition", type=int, default=DEFAULT_EDITION)
+        cmd.add_argument("--year", type=int, default=DEFAULT_YEAR)
+    sub.choices["build"].add_argument("--raw", help="wide CSV of raw values (Country + indicator columns)")
+    sub.choices["show"].add_argument("--method", choices=sorted(METHODS), default="minmax")
+    args = parser.parse_args(argv)
+    store = GravitasStore(args.parquet_dir).scoped(args.edition, args.year)
+
+    if args.command == "build":
+        from gravitas.worldbank import RAW_TABLE as WORLDBANK_TABLE
+        path = partition_dir(store.parquet_dir, WORLDBANK_TABLE, store.edition, store.year) / "data.parquet"
+        worldbank = pd.read_parquet(path) if path.exists() else None
+        table, sources = build_raw(store.table("country_index"), worldbank,
+                                   read_csv(args.raw) if args.raw else None)
+        print(f"raw values: {write_raw(store, table)}")
+        for indicator, source in sources.items():
+            print(f"  {indicator}: {source}")
+        return
+
+    raw = read_raw(store)
+    pipeline = Pipeline(raw["Country"], raw[INDICATORS].to_numpy(dtype=float))
+    out = pd.DataFrame(pipeline.normalized(args.method), columns=INDICATORS).round(3)
+    out.insert(0, "Country", pipeline.countries)
+    print(out.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""Mesures par section du dashboard : durée, pic mémoire et octets envoyés au navigateur.
+
+Chaque section et chaque étape de données de ``main.py`` est mesurée par
+``profiled("nom")`` ou ``PROFILER.section("nom")``. Les mesures sont
+accumulées dans ``PROFILER``, commun au processus :
+
+- durée : horloge murale de la section ;
+- octets : taille sérialisée des ``ForwardMsg`` émis pendant la section,
+  comptée en enveloppant ``ScriptRunContext._enqueue`` (API privée de
+  Streamlit, ``STREAMLIT_PAYLOAD_RANGE``) ; hors de cette plage, ou si
+  l'attribut a disparu, les octets ne sont pas comptés (0) ;
+- mémoire : pic d'allocation au-dessus du niveau d'entrée, seulement si
+  ``tracemalloc`` est actif (coûteux, réservé au banc d'essai).
+
+Les sections imbriquées sont incluses dans les mesures de leur parente.
+L'enregistrement se limite à un ajout dans des fenêtres glissantes bornées ;
+les centiles ne sont calculés qu'à la lecture, le profilage reste donc actif
+en production. Export (variables d'environnement) :
+
+- ``GRAVITAS_METRICS_FILE`` : fichier texte au format Prometheus
+  (collecteur textfile de node_exporter), réécrit au plus toutes les
+  ``GRAVITAS_METRICS_INTERVAL`` secondes (10 par défaut) ;
+- ``GRAVITAS_METRICS_LOG=1`` : une ligne JSON par mesure sur le logger
+  ``gravitas.profiling``.
+
+Le premier passage du script dans le processus (démarrage à froid) est
+découpé en imports, chargement des données (étapes ``data.*``) et rendu :
+voir ``mark_imported`` et ``finish_startup``. La première mesure de chaque
+section (``First (ms)``) donne le coût d'ouverture d'une section différée.
+
+Mémoire (``track_session``, à chaque passage complet du script) : RSS du
+processus, octets des jeux de données partagés, taille de l'état de chaque
+session et estimation par session (RSS au-dessus du niveau après imports,
+hors données partagées, divisé par le nombre de sessions actives) pour
+dimensionner les instances.
+"""
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit
+from packaging.version import Version
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 512
+QUANTILES = (0.5, 0.95)
+# Une session sans passage depuis SESSION_TTL secondes n'est plus comptée comme active
+SESSION_TTL = 600
+
+# Versions de Streamlit dont ScriptRunContext._enqueue a été vérifié (borne haute exclue)
+STREAMLIT_PAYLOAD_RANGE = ("1.47", "2.0")
+COUNT_PAYLOAD = Version(STREAMLIT_PAYLOAD_RANGE[0]) <= Version(streamlit.__version__) \
+    < Version(STREAMLIT_PAYLOAD_RANGE[1])
+
+
+def rss_bytes():
+    """Mémoire résidente du processus (Linux) ; None si indisponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def deep_nbytes(obj, _seen=None):
+    """Taille approchée d'un objet et de ce qu'il contient (tableaux, DataFrames, conteneurs)."""
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(deep=True).sum() if isinstance(obj, pd.DataFrame)
+                   else obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes if obj.base is None else 0  # une vue ne possède pas ses données
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_nbytes(k, _seen) + deep_nbytes(v, _seen)
+                                        for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_nbytes(v, _seen) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class _Frame:
+    __slots__ = ("name", "payload", "start_mem", "peak_mem")
+
+    def __init__(self, name, start_mem):
+        self.name = name
+        self.payload = 0
+        self.start_mem = start_mem
+        self.peak_mem = start_mem
+
+
+class _Series:
+    """Fenêtre glissante et cumuls d'une section."""
+
+    __slots__ = ("seconds", "payload", "count", "seconds_sum", "payload_sum", "last", "first")
+
+    def __init__(self, window):
+        self.seconds = deque(maxlen=window)
+        self.payload = deque(maxlen=window)
+        self.count = 0
+        self.seconds_sum = 0.0
+        self.payload_sum = 0
+        self.last = 0.0
+        self.first = None
+
+
+class SectionProfiler:
+    """Collecteur thread-safe des mesures de section.
+
+    ``samples`` garde les dernières mesures brutes (lues par le banc d'essai
+    via ``drain``) ; ``summary`` et ``prometheus`` résument les fenêtres.
+    """
+
+    def __init__(self, window=WINDOW, log=None):
+        self.window = window
+        self.samples = deque(maxlen=10_000)
+        self.log = os.environ.get("GRAVITAS_METRICS_LOG") == "1" if log is None else log
+        self._series = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._exported_at = 0.0
+        # Découpage du démarrage à froid (secondes par phase), fixé au premier passage
+        self.startup = None
+        self._startup_data = None
+        # Mémoire : {session: (dernier passage, octets de l'état)}, niveau après imports
+        self._sessions = {}
+        self.shared_bytes = 0
+        self._rss_baseline = None
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def section(self, name):
+        stack = self._stack()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak_mem = max(stack[-1].peak_mem, peak)
+            tracemalloc.reset_peak()
+        frame = _Frame(name, current if tracing else 0)
+
+        # Les messages passent par le contexte du script : on compte leur taille
+        ctx = get_script_run_ctx(suppress_warning=True)
+        enqueue = getattr(ctx, "_enqueue", None) if ctx and COUNT_PAYLOAD else None
+        if callable(enqueue):
+            def counting(msg, _frame=frame, _enqueue=enqueue):
+                _frame.payload += msg.ByteSize()
+                _enqueue(msg)
+            ctx._enqueue = counting
+
+        start = time.perf_counter()
+        stack.append(frame)
+        try:
+            yield frame
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            if callable(enqueue):
+                ctx._enqueue = enqueue
+            peak_bytes = None
+            if tracing:
+                frame.peak_mem = max(frame.peak_mem, tracemalloc.get_traced_memory()[1])
+                peak_bytes = frame.peak_mem - frame.start_mem
+                if stack:
+                    stack[-1].peak_mem = max(stack[-1].peak_mem, frame.peak_mem)
+            self.record(name, seconds, frame.payload, peak_bytes,
+                        ctx.session_id if ctx else None)
+
+    def record(self, name, seconds, payload_bytes, peak_bytes=None, session=None):
+        sample = {
+            "section": name, "seconds": seconds,
+            "payload_bytes": payload_bytes, "peak_bytes": peak_bytes,
+        }
+        with self._lock:
+            self.samples.append(sample)
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = _Series(self.window)
+            series.seconds.append(seconds)
+            series.payload.append(payload_bytes)
+            series.count += 1
+            series.seconds_sum += seconds
+            series.payload_sum += payload_bytes
+            series.last = seconds
+            if series.first is None:
+                series.first = seconds
+        if self.log:
+            logger.info(json.dumps(dict(sample, event="section", session=session, ts=time.time())))
+
+    def _data_seconds(self):
+        with self._lock:
+            return sum(s.seconds_sum for name, s in self._series.items() if name.startswith("data."))
+
+    def mark_imported(self):
+        """Fin des imports du premier passage : point de départ du temps de données."""
+        if self.startup is None and self._startup_data is None:
+            self._startup_data = self._data_seconds()
+            self._rss_baseline = rss_bytes()
+
+    def finish_startup(self, started, imported, ended=None):
+        """Fixe le découpage imports / données / rendu du premier passage (``perf_counter``)."""
+        if self.startup is not None or self._startup_data is None:
+            return
+        ended = time.perf_counter() if ended is None else ended
+        data = self._data_seconds() - self._startup_data
+        self.startup = {"import": imported - started, "data": data,
+                        "render": max(ended - imported - data, 0.0), "total": ended - started}
+        logger.info(json.dumps({"event": "startup", **self.startup, "ts": time.time()}))
+
+    def startup_report(self):
+        """Démarrage à froid par phase (millisecondes) ; vide avant la fin du premier passage."""
+        phases = self.startup or {}
+        return pd.DataFrame({"Phase": list(phases), "ms": [v * 1000 for v in phases.values()]})
+
+    def track_session(self, state_bytes, shared_bytes=None):
+        """Note le passage de la session courante et la taille de son état."""
+        ctx = get_script_run_ctx(suppress_warning=True)
+        now = time.monotonic()
+        with self._lock:
+            if shared_bytes is not None:
+                self.shared_bytes = shared_bytes
+            if ctx:
+                self._sessions[ctx.session_id] = (now, state_bytes)
+            for session, (seen, _) in list(self._sessions.items()):
+                if now - seen > SESSION_TTL:
+                    del self._sessions[session]
+
+    def memory(self):
+        """Mesures mémoire courantes (octets) ; ``per_session`` est une estimation."""
+        rss = rss_bytes()
+        with self._lock:
+            states = np.array([b for _, b in self._sessions.values()], dtype=float)
+            shared = self.shared_bytes
+        sessions = len(states)
+        per_session = None
+        if rss is not None and self._rss_baseline is not None and sessions:
+            per_session = max(rss - self._rss_baseline - shared, 0) / sessions
+        return {
+            "rss": rss, "baseline": self._rss_baseline, "shared": shared,
+            "sessions": sessions, "per_session": per_session,
+            "state_p50": float(np.median(states)) if sessions else None,
+            "state_max": float(states.max()) if sessions else None,
+        }
+
+    def memory_report(self):
+        """Mesures mémoire en Mo pour le panneau de performance."""
+        m = self.memory()
+        rows = [
+            ("Process RSS", m["rss"]), ("RSS after imports", m["baseline"]),
+            ("Shared datasets", m["shared"]), ("Per session (estimate)", m["per_session"]),
+            ("Session state p50", m["state_p50"]), ("Session state max", m["state_max"]),
+        ]
+        return pd.DataFrame({"Metric": [name for name, _ in rows],
+                             "MB": [None if v is None else v / 2**20 for _, v in rows]})
+
+    def drain(self):
+        """Renvoie les mesures brutes accumulées et vide la liste."""
+        with self._lock:
+            samples = list(self.samples)
+            self.samples.clear()
+        return samples
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                name: (np.array(s.seconds), np.array(s.payload), s.count,
+                       s.seconds_sum, s.payload_sum, s.last, s.first)
+                for name, s in self._series.items()
+            }
+
+    def summary(self):
+        """Centiles glissants par section (durées en millisecondes)."""
+        rows = []
+        for name, (seconds, payload, count, _, _, last, first) in sorted(self._snapshot().items()):
+            p50, p95 = np.quantile(seconds, QUANTILES) * 1000
+            rows.append({
+                "Section": name, "Calls": count, "First (ms)": first * 1000, "Last (ms)": last * 1000,
+                "p50 (ms)": p50, "p95 (ms)": p95,
+                "p50 payload (KB)": np.quantile(payload, 0.5) / 1024,
+            })
+        return pd.DataFrame(rows, columns=["Section", "Calls", "First (ms)", "Last (ms)", "p50 (ms)",
+                                           "p95 (ms)", "p50 payload (KB)"])
+
+    def prometheus(self, prefix="gravitas_section"):
+        """Résumés au format texte Prometheus (centiles sur la fenêtre, cumuls depuis le démarrage)."""
+        snapshot = sorted(self._snapshot().items())
+        lines = []
+        for metric, index, total, help_text in (
+                ("seconds", 0, 3, "Wall time of dashboard sections."),
+                ("payload_bytes", 1, 4, "Serialized bytes sent to the browser by dashboard sections.")):
+            name = f"{prefix}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for section, values in snapshot:
+                label = f'section="{section}"'
+                for q, v in zip(QUANTILES, np.quantile(values[index], QUANTILES)):
+                    lines.append(f'{name}{{{label},quantile="{q}"}} {v:.6g}')
+                lines.append(f"{name}_sum{{{label}}} {values[total]:.6g}")
+                lines.append(f"{name}_count{{{label}}} {values[2]}")
+        if self.startup:
+            name = "gravitas_startup_seconds"
+            lines += [f"# HELP {name} Cold start of the first script run, by phase.",
+                      f"# TYPE {name} gauge"]
+            lines += [f'{name}{{phase="{phase}"}} {v:.6g}' for phase, v in self.startup.items()]
+        memory = self.memory()
+        name = "gravitas_memory_bytes"
+        lines += [f"# HELP {name} Process, shared dataset and estimated per-session memory.",
+                  f"# TYPE {name} gauge"]
+        for kind in ("rss", "baseline", "shared", "per_session", "state_p50", "state_max"):
+            if memory[kind] is not None:
+                lines.append(f'{name}{{kind="{kind}"}} {memory[kind]:.6g}')
+        lines += ["# HELP gravitas_sessions_active Sessions seen in the last "
+                  f"{SESSION_TTL} seconds.", "# TYPE gravitas_sessions_active gauge",
+                  f"gravitas_sessions_active {memory['sessions']}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None, interval=None):
+        """Réécrit le fichier Prometheus si configuré et si le dernier export date de ``interval`` s."""
+        path = path or os.environ.get("GRAVITAS_METRICS_FILE")
+        if not path:
+            return False
+        interval = float(interval if interval is not None
+                         else os.environ.get("GRAVITAS_METRICS_INTERVAL", 10))
+        now = time.monotonic()
+        with self._lock:
+            if now - self._exported_at < interval:
+                return False
+            self._exported_at = now
+        path = Path(path)
+        tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(self.prometheus())
+        tmp.replace(path)  # écriture atomique, lisible à tout moment par le collecteur
+        return True
+
+
+PROFILER = SectionProfiler()
+
+
+def profiled(name, profiler=PROFILER):
+    """Décorateur : mesure chaque appel de la fonction sous le nom de section ``name``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profiler.section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,215 @@
+"""Rechargement à chaud des CSV d'import, avec invalidation ciblée.
+
+``DataWatcher`` scrute les CSV de ``data/`` (taille et date de modification,
+sans dépendance supplémentaire). Quand l'un d'eux change, les deux tables
+sont validées (``gravitas.artifact.validate``), seule la table modifiée est
+réimportée dans la partition par défaut, puis comparée à sa version
+précédente ligne par ligne et colonne par colonne. Seules les erreurs de
+``gravitas.artifact.check`` refusent un CSV ; un composite ou un classement
+publié incohérent n'est qu'un avertissement, journalisé.
+
+Les caches dérivés ont pour clé l'empreinte des seules cellules qu'ils lisent
+(``gravitas.dataset.Dataset.key``) : ``DEPENDENCIES`` décrit ces colonnes et
+``affected`` en déduit ce qu'un rechargement invalide. Une valeur de
+``partners`` ne reconstruit que le sunburst ; un indicateur de l'Égypte, les
+statistiques de tous les pays et les seules sélections qui contiennent
+l'Égypte. Les sessions ouvertes reprennent la nouvelle partition à leur
+prochain passage, sans démarrage à froid.
+
+Usage hors de l'application (un processus qui écrit, les autres lisent) :
+
+    python -m gravitas.reload [--interval 2] [--once]
+"""
+import argparse
+import sys
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from gravitas.artifact import check, read_csv
+from gravitas.figures import CHOROPLETH_COLUMNS, SUNBURST_COLUMNS
+from gravitas.indicators import INDICATORS, RANKING
+from gravitas.profiling import PROFILER, logger
+from gravitas.store import DATA_DIR, DEFAULT_EDITION, DEFAULT_YEAR, TABLES, GravitasStore, import_csv
+
+POLL_INTERVAL = 2.0
+
+# Table dérivée -> (table source, colonnes lues)
+DEPENDENCIES = {
+    "sunburst": ("partners", SUNBURST_COLUMNS),
+    "globe": ("country_index", CHOROPLETH_COLUMNS),
+    "indicator stats": ("country_index", INDICATORS),
+    "radar and pie rows": ("country_index", INDICATORS),
+    "linkage map": ("country_index", INDICATORS),
+    "similarity index": ("country_index", INDICATORS),
+    "sensitivity": ("country_index", [*INDICATORS, RANKING]),
+}
+
+# Pays ajoutés, pays supprimés et {colonne: pays modifiés} d'une table
+TableChanges = namedtuple("TableChanges", ["added", "removed", "cells"])
+
+
+def diff_tables(old, new, key="Country"):
+    """Différences entre deux versions d'une table (DataFrames), par ``key``."""
+    old, new = old.set_index(key), new.set_index(key)
+    added = [c for c in new.index if c not in old.index]
+    removed = [c for c in old.index if c not in new.index]
+    rows = old.index.intersection(new.index, sort=False)
+    columns = old.columns.intersection(new.columns, sort=False)
+    a, b = old.loc[rows, columns], new.loc[rows, columns]
+    differs = (a != b) & ~(a.isna() & b.isna())
+    cells = {column: list(rows[differs[column].to_numpy()]) for column in columns[differs.any().to_numpy()]}
+    # Colonne ajoutée ou retirée : toutes ses lignes ont changé
+    for column in old.columns.symmetric_difference(new.columns):
+        cells[column] = list(rows)
+    return TableChanges(added, removed, cells)
+
+
+def affected(changes):
+    """Tables dérivées touchées par ``changes`` ({table: TableChanges}) -> pays concernés."""
+    out = {}
+    for artifact, (table, columns) in DEPENDENCIES.items():
+        diff = changes.get(table)
+        if diff is None:
+            continue
+        countries = set(diff.added) | set(diff.removed)
+        for column in columns:
+            countries.update(diff.cells.get(column, ()))
+        if countries:
+            out[artifact] = sorted(countries)
+    return out
+
+
+def describe(changes):
+    """Résumé d'un rechargement (toast des sessions, sortie de la CLI)."""
+    parts = []
+    for table, diff in changes.items():
+        rows = set(diff.added) | set(diff.removed) | {c for cs in diff.cells.values() for c in cs}
+        parts.append(f"{table}: {len(rows)} row(s), {len(diff.cells)} column(s) changed")
+    refreshed = ", ".join(
+        f"{name} ({', '.join(countries[:3])}{', ...' if len(countries) > 3 else ''})"
+        for name, countries in affected(changes).items())
+    return "Data updated. " + "; ".join(parts) + (f". Refreshed: {refreshed}." if refreshed else ".")
+
+
+def _stamp(path):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class DataWatcher:
+    """Réimporte les CSV modifiés dans la partition (``edition``, ``year``).
+
+    ``poll`` fait un passage ; ``start`` lance un fil démon qui scrute toutes
+    les ``interval`` secondes. ``generation`` est incrémenté à chaque
+    rechargement qui change des données ; ``changes`` décrit le dernier,
+    ``error`` le dernier CSV refusé (les données en place sont alors gardées).
+    """
+
+    def __init__(self, store, data_dir=DATA_DIR, edition=DEFAULT_EDITION, year=DEFAULT_YEAR,
+                 interval=POLL_INTERVAL):
+        self.store = store
+        self.edition, self.year = edition, year
+        self.interval = interval
+        self.sources = {table: Path(data_dir) / f"{stem}.csv" for table, stem in TABLES.items()}
+        self._stamps = {table: _stamp(path) for table, path in self.sources.items()}
+        self.generation = 0
+        self.changes = {}
+        self.error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Réimporte les tables dont le CSV a changé ; renvoie leurs différences (vide sinon)."""
+        with self._lock:
+            stamps = {table: _stamp(path) for table, path in self.sources.items()}
+            modified = [t for t in TABLES if stamps[t] != self._stamps[t]]
+            if not modified:
+                return {}
+            # Un CSV refusé n'est relu qu'à sa prochaine modification
+            self._stamps = stamps
+            missing = [str(self.sources[t]) for t in TABLES if stamps[t] is None]
+            if missing:
+                self.error = f"missing {', '.join(missing)}"
+                return {}
+
+            with PROFILER.section("data.reload"):
+                frames = {table: read_csv(path) for table, path in self.sources.items()}
+                errors, warnings = check(frames["country_index"], frames["partners"])
+                for warning in warnings:
+                    logger.warning("gravitas.reload: %s", warning)
+                if errors:
+                    self.error = "\n".join(errors)
+                    logger.warning("gravitas.reload: CSV rejected\n%s", self.error)
+                    return {}
+
+                store = self.store.scoped(self.edition, self.year)
+                old = {table: store.arrow(table).to_pandas() for table in modified}
+                import_csv(parquet_dir=store.parquet_dir, edition=self.edition, year=self.year,
+                           sources=self.sources, tables=modified)
+                changes = {}
+                for table in modified:
+                    diff = diff_tables(old[table], store.arrow(table).to_pandas())
+                    if diff.added or diff.removed or diff.cells:
+                        changes[table] = diff
+
+            self.error = None
+            if changes:
+                self.generation += 1
+                self.changes = changes
+            return changes
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gravitas-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as exc:  # le fil de fond ne doit pas mourir sur un CSV illisible
+                self.error = str(exc)
+                logger.warning("gravitas.reload: %s", exc)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.reload")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="folder of the import CSV files")
+    parser.add_argument("--parquet-dir", help="Parquet store (default: data/parquet)")
+    parser.add_argument("--edition", type=int, default=DEFAULT_EDITION)
+    parser.add_argument("--year", type=int, default=DEFAULT_YEAR)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="reimport the CSV files once and exit")
+    args = parser.parse_args(argv)
+
+    watcher = DataWatcher(GravitasStore(args.parquet_dir), args.data_dir, args.edition, args.year, args.interval)
+    if args.once:
+        # Passage unique : toutes les tables sont considérées comme modifiées
+        watcher._stamps = dict.fromkeys(TABLES)
+    print(f"Watching {', '.join(str(p) for p in watcher.sources.values())}", file=sys.stderr)
+    try:
+        while True:
+            changes = watcher.poll()
+            if changes:
+                print(describe(changes))
+            elif watcher.error:
+                print(watcher.error, file=sys.stderr)
+                watcher.error = None
+            if args.once:
+                return
+            watcher._stop.wait(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Moteur de calcul vectorisé du Composite index.
+
+Le Composite index publié est la somme non pondérée des 13 indicateurs.
+Le moteur répartit chaque poids de pilier à parts égales entre ses
+indicateurs et garde la même échelle (0 à 13). Des poids de piliers
+proportionnels au nombre d'indicateurs redonnent la somme des indicateurs,
+qui ne suit pas toujours le classement publié (1re édition : Botswana 9e
+avec 3,51, Seychelles 10e avec 3,53) ; pour ces poids, ``score`` renvoie
+donc le composite et le classement publiés.
+"""
+import numpy as np
+import pandas as pd
+
+from gravitas.indicators import COMPOSITE, INDICATORS, PILLARS, RANKING
+
+
+def rank_desc(scores, axis=-1):
+    """Rang décroissant (1 = meilleur score), ex aequo au rang minimal.
+
+    ``scores`` peut être un vecteur ou une matrice (un classement par ligne).
+    """
+    scores = np.asarray(scores, dtype=float)
+    order = np.argsort(-scores, axis=axis, kind="stable")
+    ordered = np.take_along_axis(scores, order, axis=axis)
+    n = scores.shape[axis]
+    position = np.arange(1, n + 1).reshape([-1 if a == axis % scores.ndim else 1
+                                            for a in range(scores.ndim)])
+    first = np.ones_like(ordered, dtype=bool)
+    tail = [slice(None)] * scores.ndim
+    head = [slice(None)] * scores.ndim
+    tail[axis], head[axis] = slice(1, None), slice(None, -1)
+    first[tuple(tail)] = ordered[tuple(tail)] != ordered[tuple(head)]
+    group_rank = np.maximum.accumulate(np.where(first, position, 0), axis=axis)
+    ranks = np.empty_like(group_rank)
+    np.put_along_axis(ranks, order, group_rank, axis=axis)
+    return ranks
+
+
+class Scores:
+    """Résultat d'un calcul : piliers, composite et classement par pays."""
+
+    def __init__(self, countries, composite, ranking, pillars, weights=None):
+        self.countries = countries
+        self.composite = composite
+        self.ranking = ranking
+        self.pillars = pillars
+        # None pour l'index publié, sinon tuple des poids de piliers normalisés
+        self.weights = weights
+        self._row = {country: i for i, country in enumerate(countries)}
+
+    def cards(self, countries):
+        """(pays, Composite index, Ranking) pour les pays connus."""
+        return [
+            (c, float(self.composite[self._row[c]]), int(self.ranking[self._row[c]]))
+            for c in countries if c in self._row
+        ]
+
+    def apply(self, df):
+        """Copie de ``df`` avec les colonnes Composite index et Ranking recalculées."""
+        rows = df["Country"].map(self._row)
+        out = df.copy()
+        out[COMPOSITE] = self.composite[rows.to_numpy()]
+        out[RANKING] = self.ranking[rows.to_numpy()]
+        return out
+
+    def frame(self):
+        out = pd.DataFrame(self.pillars, columns=list(PILLARS))
+        out.insert(0, "Country", self.countries)
+        out[COMPOSITE] = self.composite
+        out[RANKING] = self.ranking
+        return out
+
+
+class ScoringEngine:
+    """Calcule piliers, composite et classement depuis la matrice des indicateurs.
+
+    La matrice (pays x indicateurs) et les scores de piliers sont calculés une
+    fois ; un changement de poids ne coûte qu'un produit matrice-vecteur.
+    """
+
+    def __init__(self, matrix, pillars=PILLARS, indicators=INDICATORS):
+        self.indicators = list(indicators)
+        self.pillar_names = list(pillars)
+        self.countries = list(matrix.countries)
+        # Vue sur la matrice partagée quand les indicateurs se suivent (pas de copie)
+        self.values = matrix.view(self.indicators)
+        # Appartenance indicateur -> pilier (13 x 3)
+        self.membership = np.array(
+            [[var in pillars[p] for p in self.pillar_names] for var in self.indicators],
+            dtype=float,
+        )
+        self.counts = self.membership.sum(axis=0)
+        self.pillar_scores = self.values @ self.membership / self.counts
+        self.published = Scores(
+            self.countries,
+            matrix.take(self.countries, [COMPOSITE])[:, 0],
+            matrix.take(self.countries, [RANKING])[:, 0].astype(int),
+            self.pillar_scores,
+        )
+
+    def normalize(self, pillar_weights):
+        """Poids de piliers (dict ou séquence) ramenés à une somme de 1."""
+        if isinstance(pillar_weights, dict):
+            pillar_weights = [pillar_weights[p] for p in self.pillar_names]
+        w = np.asarray(pillar_weights, dtype=float)
+        total = w.sum(axis=-1, keepdims=True)
+        if np.any(total <= 0):
+            raise ValueError("Pillar weights must have a positive sum")
+        return w / total
+
+    def indicator_weights(self, pillar_weights):
+        """Poids par indicateur ; accepte aussi un lot de vecteurs (k x 3)."""
+        w = self.normalize(pillar_weights)
+        return (w / self.counts) @ self.membership.T * len(self.indicators)
+
+    def score(self, pillar_weights):
+        w = self.normalize(pillar_weights)
+        if np.allclose(w, self.counts / self.counts.sum()):
+            # Poids de la publication : composite et classement publiés, pas la somme recalculée
+            return Scores(self.countries, self.published.composite, self.published.ranking,
+                          self.pillar_scores, tuple(np.round(w, 6).tolist()))
+        composite = self.values @ self.indicator_weights(w)
+        return Scores(self.countries, composite, rank_desc(composite),
+                      self.pillar_scores, tuple(np.round(w, 6).tolist()))
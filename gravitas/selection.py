@@ -0,0 +1,86 @@
+"""Tables dérivées d'une sélection de pays, partagées entre les sessions.
+
+Une sélection est canonique (tuple trié, sans doublon) : « Egypt, Morocco »
+et « Morocco, Egypt » partagent la même entrée, quel que soit l'ordre de
+saisie ou le lien suivi. ``SelectionCache`` est un LRU borné en octets
+(taille estimée par ``deep_nbytes``) ; ses compteurs de succès et d'échecs
+sont affichés dans le panneau de performance.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+from gravitas.boxstats import indicator_stats
+from gravitas.profiling import deep_nbytes
+
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+# Pays (ordre canonique), bloc d'indicateurs, statistiques du boxplot,
+# données nivo du radar et des camemberts
+SelectionTables = namedtuple("SelectionTables", ["countries", "values", "stats", "radar", "pies"])
+
+
+def canonical(countries):
+    return tuple(sorted(set(countries)))
+
+
+def selection_tables(matrix, countries, indicators, stats=None):
+    """Toutes les tables d'une sélection ; sélection vide : tous les pays, sans radar ni camemberts.
+
+    ``stats`` évite de recalculer des statistiques déjà connues (artefact compilé).
+    """
+    countries = list(countries)
+    values = matrix.take(countries, indicators) if countries else matrix.view(indicators)
+    return SelectionTables(
+        countries, values,
+        stats if stats is not None else indicator_stats(values, indicators),
+        matrix.radar_data(countries, indicators) if countries else [],
+        matrix.pie_data(countries, indicators) if countries else {},
+    )
+
+
+class SelectionCache:
+    """Cache LRU thread-safe borné en mémoire (octets estimés des valeurs)."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Construction hors verrou, comme FigureCache : la dernière écriture l'emporte
+        value = build()
+        size = deep_nbytes(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            # L'entrée la plus récente est gardée même si elle dépasse seule la limite
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
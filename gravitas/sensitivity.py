@@ -0,0 +1,210 @@
+"""Analyse de sensibilité du classement aux pondérations (Monte Carlo).
+
+Des vecteurs de poids par indicateur sont tirés selon une loi de Dirichlet
+centrée sur les pondérations de référence. Chaque lot est reclassé en NumPy
+dans un processus du pool ; les lots renvoient un ``RankHistogram`` que l'on
+cumule au fil de l'eau pour publier les centiles. Sa taille est bornée
+(pays x ``RANK_BINS``) : au-delà de ``RANK_BINS`` pays, les rangs sont
+regroupés en classes de même largeur et les centiles sont donnés au centre
+de leur classe ; le rang moyen et la probabilité du rang publié restent exacts.
+
+Le pool est partagé par le processus (``shared_pool``), borné à
+``MAX_WORKERS`` processus et démarré en ``spawn`` : un ``fork`` depuis le
+serveur Streamlit, multithread, peut copier un verrou tenu et bloquer.
+
+Usage hors ligne ::
+
+    python -m gravitas.sensitivity --samples 200000 --workers 4 --out sensitivity.csv
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from gravitas.indicators import PILLAR_WEIGHTS, RANKING
+from gravitas.scoring import rank_desc
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Pondérations de référence autour desquelles on échantillonne
+BASES = ("documented", "equal")
+
+# Processus du pool partagé (GRAVITAS_SENSITIVITY_WORKERS)
+MAX_WORKERS = int(os.environ.get("GRAVITAS_SENSITIVITY_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Classes de rangs de l'histogramme : au plus pays x RANK_BINS entiers (20 Mo à
+# 10 000 pays), exact jusqu'à RANK_BINS pays
+RANK_BINS = 256
+# Cellules (pays x tirages) reclassées à la fois dans un lot
+RANK_CELLS = 2_000_000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _spawn_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def shared_pool():
+    """Pool de processus unique du processus courant, créé au premier appel."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _spawn_pool(MAX_WORKERS)
+        return _pool
+
+
+def base_weights(engine, base="documented"):
+    """Poids par indicateur de référence, de somme 1."""
+    if base == "documented":
+        w = engine.indicator_weights(PILLAR_WEIGHTS)
+    elif base == "equal":
+        w = np.ones(len(engine.indicators))
+    else:
+        raise ValueError(f"Unknown base weights: {base!r} (expected one of {BASES})")
+    return w / w.sum()
+
+
+class RankHistogram:
+    """Rangs tirés de chaque pays : histogramme par classes de ``width`` rangs,
+    somme des rangs et nombre de tirages au rang publié."""
+
+    def __init__(self, published, bins=RANK_BINS):
+        self.published = np.asarray(published)
+        n = len(self.published)
+        self.width = max(-(-n // bins), 1)
+        self.counts = np.zeros((n, -(-n // self.width)), dtype=np.int64)
+        self.rank_sum = np.zeros(n, dtype=np.int64)
+        self.at_published = np.zeros(n, dtype=np.int64)
+
+    def add(self, ranks):
+        """Ajoute des rangs (pays x tirages)."""
+        n, bins = self.counts.shape
+        cells = np.arange(n)[:, None] * bins + (ranks - 1) // self.width
+        self.counts += np.bincount(cells.ravel(), minlength=n * bins).reshape(n, bins)
+        self.rank_sum += ranks.sum(axis=1)
+        self.at_published += (ranks == self.published[:, None]).sum(axis=1)
+
+    def __iadd__(self, other):
+        self.counts += other.counts
+        self.rank_sum += other.rank_sum
+        self.at_published += other.at_published
+        return self
+
+
+def rank_histogram_chunk(values, base, published, concentration, size, seed):
+    """Tire ``size`` vecteurs de poids et renvoie le ``RankHistogram`` de leurs rangs.
+
+    Les tirages sont reclassés par paquets de ``RANK_CELLS`` cellules : la
+    mémoire du lot ne dépend pas de ``size``.
+    """
+    rng = np.random.default_rng(seed)
+    hist = RankHistogram(published)
+    step = max(RANK_CELLS // max(values.shape[0], 1), 1)
+    for start in range(0, size, step):
+        weights = rng.dirichlet(base * concentration, size=min(step, size - start))  # (tirages x indicateurs)
+        hist.add(rank_desc(values @ weights.T, axis=0))                                # (pays x tirages)
+    return hist
+
+
+def iter_rank_histograms(values, base, published, n_samples=100_000, chunk_size=10_000,
+                         concentration=100.0, workers=None, seed=0):
+    """Génère (échantillons traités, ``RankHistogram`` cumulé) au fil des lots terminés.
+
+    ``workers=1`` calcule dans le processus courant, sans pool ; ``workers=None``
+    utilise le pool partagé ; sinon un pool dédié de ``workers`` processus est
+    créé puis fermé. Les lots encore en attente sont annulés si l'itération
+    est abandonnée (session relancée).
+    """
+    values = np.asarray(values, dtype=float)
+    base = np.asarray(base, dtype=float)
+    published = np.asarray(published)
+    sizes = [chunk_size] * (n_samples // chunk_size)
+    if n_samples % chunk_size:
+        sizes.append(n_samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    hist = RankHistogram(published)
+    done = 0
+
+    if workers == 1:
+        for size, s in zip(sizes, seeds):
+            hist += rank_histogram_chunk(values, base, published, concentration, size, s)
+            done += size
+            yield done, hist
+        return
+
+    pool = shared_pool() if workers is None else _spawn_pool(workers)
+    futures = {
+        pool.submit(rank_histogram_chunk, values, base, published, concentration, size, s): size
+        for size, s in zip(sizes, seeds)
+    }
+    try:
+        for future in as_completed(futures):
+            hist += future.result()
+            done += futures[future]
+            yield done, hist
+    finally:
+        for future in futures:
+            future.cancel()
+        if workers is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def rank_percentiles(hist, percentiles=PERCENTILES):
+    """Rang au centile demandé pour chaque pays (centre de sa classe de rangs)."""
+    cdf = np.cumsum(hist.counts, axis=1) / hist.counts.sum(axis=1, keepdims=True)
+    n = len(hist.published)
+    return np.stack([np.minimum((cdf >= q / 100).argmax(axis=1) * hist.width + (hist.width + 1) // 2, n)
+                     for q in percentiles], axis=1)
+
+
+def summarize(countries, published, hist, percentiles=PERCENTILES):
+    """Tableau par pays : rang publié, centiles et probabilité de garder son rang."""
+    total = hist.counts.sum(axis=1)
+    out = pd.DataFrame({"Country": countries, RANKING: published})
+    for q, column in zip(percentiles, rank_percentiles(hist, percentiles).T):
+        out[f"p{q}"] = column
+    out["Mean rank"] = hist.rank_sum / total
+    out["P(published rank)"] = hist.at_published / total
+    return out.sort_values(RANKING, ignore_index=True)
+
+
+def main(argv=None):
+    from gravitas.matrix import IndicatorMatrix
+    from gravitas.scoring import ScoringEngine
+    from gravitas.store import GravitasStore
+
+    parser = argparse.ArgumentParser(prog="python -m gravitas.sensitivity")
+    parser.add_argument("--samples", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--concentration", type=float, default=100.0,
+                        help="Dirichlet concentration (higher = closer to the base weights)")
+    parser.add_argument("--base", choices=BASES, default="documented")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="CSV output path (stdout if omitted)")
+    args = parser.parse_args(argv)
+
+    store = GravitasStore()
+    engine = ScoringEngine(IndicatorMatrix(store.table("country_index")))
+    hist = None
+    for done, hist in iter_rank_histograms(
+            engine.values, base_weights(engine, args.base), engine.published.ranking, args.samples,
+            args.chunk_size, args.concentration, args.workers, args.seed):
+        print(f"{done}/{args.samples} samples", file=sys.stderr)
+
+    result = summarize(engine.countries, engine.published.ranking, hist)
+    if args.out:
+        result.to_csv(args.out, index=False)
+    else:
+        print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Recherche des pays les plus proches dans l'espace des indicateurs normalisés.
+
+``SimilarityIndex`` indexe la matrice (pays x indicateurs) dans un arbre KD
+(``scipy.spatial.cKDTree``). Les colonnes sont multipliées par la racine de
+leur poids : la distance euclidienne de l'arbre est alors la distance
+pondérée par pilier.
+
+L'index est immuable (partagé entre les sessions). ``updated`` renvoie un
+nouvel index qui réutilise l'arbre existant : les lignes modifiées ou
+supprimées y sont masquées, les lignes nouvelles ou modifiées sont cherchées
+par force brute dans un petit tampon, et l'arbre n'est reconstruit que
+lorsque ce tampon dépasse ``REBUILD_FRACTION`` des lignes.
+"""
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+REBUILD_FRACTION = 0.1
+REBUILD_MIN = 64
+
+
+class SimilarityIndex:
+    """k plus proches voisins des pays sur les colonnes de ``values``."""
+
+    def __init__(self, countries, values, weights=None):
+        self.countries = list(countries)
+        self.values = np.asarray(values, dtype=float)
+        self.weights = None if weights is None else np.asarray(weights, dtype=float)
+        self._scale = np.ones(self.values.shape[1]) if weights is None else np.sqrt(self.weights)
+        self._row = {c: i for i, c in enumerate(self.countries)}
+        points = self.values * self._scale
+        # Arbre sur toutes les lignes ; aucune n'est masquée, pas de tampon
+        self._tree = cKDTree(points)
+        self._tree_rows = np.arange(len(self.countries))
+        self._masked = np.zeros(len(self.countries), dtype=bool)
+        self._delta_rows = np.empty(0, dtype=np.intp)
+        self._delta_points = np.empty((0, self.values.shape[1]))
+        self.rebuilt = True
+
+    def __contains__(self, country):
+        return country in self._row
+
+    @property
+    def pending(self):
+        """Nombre de lignes hors de l'arbre (tampon de force brute)."""
+        return len(self._delta_rows)
+
+    def updated(self, countries, values):
+        """Index des nouvelles données ; reprend l'arbre si peu de lignes ont changé."""
+        countries = list(countries)
+        values = np.asarray(values, dtype=float)
+        old_rows = np.array([self._row.get(c, -1) for c in countries], dtype=np.intp)
+        known = old_rows >= 0
+        unchanged = np.zeros(len(countries), dtype=bool)
+        unchanged[known] = np.all(self.values[old_rows[known]] == values[known], axis=1)
+        # Lignes déjà dans le tampon : elles y restent même inchangées
+        in_tree = np.zeros(len(self.countries), dtype=bool)
+        in_tree[self._tree_rows[self._tree_rows >= 0]] = True
+        unchanged &= known & in_tree[np.maximum(old_rows, 0)]
+        changed = np.flatnonzero(~unchanged)
+
+        if len(changed) > max(REBUILD_MIN, REBUILD_FRACTION * len(countries)):
+            return SimilarityIndex(countries, values, self.weights)
+
+        index = object.__new__(SimilarityIndex)
+        index.countries, index.values = countries, values
+        index.weights, index._scale = self.weights, self._scale
+        index._row = {c: i for i, c in enumerate(countries)}
+        index._tree = self._tree
+        # Les lignes de l'arbre pointent désormais vers les nouvelles lignes (ou -1 si masquées)
+        new_of_old = np.full(len(self.countries), -1, dtype=np.intp)
+        new_of_old[old_rows[unchanged]] = np.flatnonzero(unchanged)
+        index._tree_rows = new_of_old[self._tree_rows]
+        index._masked = index._tree_rows < 0
+        index._delta_rows = changed
+        index._delta_points = values[changed] * self._scale
+        index.rebuilt = False
+        return index
+
+    def nearest(self, countries, k=5):
+        """Les ``k`` pays les plus proches de chacun de ``countries`` (eux-mêmes exclus).
+
+        Renvoie un DataFrame (Country, Similar country, Distance, Rank).
+        """
+        countries = [c for c in countries if c in self._row]
+        k = min(k, len(self.countries) - 1)
+        if not countries or k <= 0:
+            return pd.DataFrame(columns=["Country", "Similar country", "Distance", "Rank"])
+        rows = np.array([self._row[c] for c in countries])
+        points = self.values[rows] * self._scale
+
+        # Arbre : assez de voisins pour compenser les lignes masquées et le pays lui-même
+        n_tree = len(self._tree_rows)
+        kq = min(k + 1 + int(self._masked.sum()), n_tree)
+        dist, idx = self._tree.query(points, k=kq)
+        dist, idx = dist.reshape(len(rows), -1), idx.reshape(len(rows), -1)
+        cand_rows = np.where(idx < n_tree, self._tree_rows[np.minimum(idx, n_tree - 1)], -1)
+
+        # Tampon : distances exactes par force brute
+        if self.pending:
+            delta = np.sqrt(((points[:, None, :] - self._delta_points[None]) ** 2).sum(axis=2))
+            dist = np.hstack([dist, delta])
+            cand_rows = np.hstack([cand_rows, np.broadcast_to(self._delta_rows, delta.shape)])
+
+        invalid = (cand_rows < 0) | (cand_rows == rows[:, None]) | ~np.isfinite(dist)
+        dist = np.where(invalid, np.inf, dist)
+        order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        best = np.take_along_axis(cand_rows, order, axis=1)
+        best_dist = np.take_along_axis(dist, order, axis=1)
+
+        keep = np.isfinite(best_dist)
+        return pd.DataFrame({
+            "Country": np.repeat(countries, k)[keep.ravel()],
+            "Similar country": np.array(self.countries, dtype=object)[best[keep]],
+            "Distance": best_dist[keep],
+            "Rank": np.tile(np.arange(1, k + 1), len(countries))[keep.ravel()],
+        })
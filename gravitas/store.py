@@ -0,0 +1,280 @@
+"""Couche de stockage columnar du GASPI : Parquet sur disque, requêtes DuckDB.
+
+Chaque table est un panel partitionné par édition et année de référence ::
+
+    data/parquet/<table>/edition=<e>/year=<y>/data.parquet
+
+Un magasin est toujours restreint à une partition (la plus récente par
+défaut, voir ``GravitasStore.scoped``) : DuckDB élague les autres fichiers,
+seules les éditions consultées sont lues.
+
+Les CSV de ``data/`` ne servent plus que de format d'import ::
+
+    python -m gravitas.store import
+    python -m gravitas.store import --edition 2 --year 2025 --index index.csv --partners partners.csv
+
+La variable d'environnement ``GRAVITAS_PARQUET_DIR`` remplace le répertoire
+par défaut (jeux de données synthétiques du banc d'essai, par exemple).
+"""
+import argparse
+import copy
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import duckdb
+import pyarrow.parquet as pq
+
+from gravitas.countries import ISO3
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+PARQUET_DIR = DATA_DIR / "parquet"
+
+# Nom logique de la table -> fichier CSV source
+TABLES = {
+    "country_index": "gravitas_country_index",
+    "partners": "gravitas_country_index2",
+}
+
+# Les CSV livrés correspondent à la 1re édition (moyennes 2020-2024)
+DEFAULT_EDITION = 1
+DEFAULT_YEAR = 2024
+
+
+def partition_dir(parquet_dir, table, edition, year):
+    return Path(parquet_dir) / table / f"edition={int(edition)}" / f"year={int(year)}"
+
+
+def _iso3_expr():
+    """Expression SQL qui résout le code ISO3 de la colonne Country (sans jointure : l'ordre est conservé)."""
+    cases = " ".join(f"WHEN {_literal(name)} THEN {_literal(code)}" for name, code in ISO3.items())
+    return f"CASE Country {cases} END AS ISO3"
+
+
+def import_csv(data_dir=DATA_DIR, parquet_dir=PARQUET_DIR,
+               edition=DEFAULT_EDITION, year=DEFAULT_YEAR, sources=None, tables=None):
+    """Convertit les CSV d'une édition en partitions Parquet et renvoie les chemins écrits.
+
+    ``sources`` permet d'indiquer un CSV par table ; par défaut ceux de ``data_dir``.
+    ``tables`` restreint l'import à certaines tables (rechargement à chaud). Chaque
+    fichier est remplacé atomiquement : un lecteur voit l'ancien ou le nouveau.
+    La colonne ISO3 est résolue ici, une fois pour toutes ; un pays inconnu de
+    ``gravitas.countries`` interrompt l'import plutôt que de disparaître de la carte.
+    """
+    data_dir = Path(data_dir)
+    sources = sources or {}
+    written = {}
+    con = duckdb.connect()
+    try:
+        for table, stem in TABLES.items():
+            if tables is not None and table not in tables:
+                continue
+            src = Path(sources.get(table) or data_dir / f"{stem}.csv")
+            out = partition_dir(parquet_dir, table, edition, year)
+            out.mkdir(parents=True, exist_ok=True)
+            dst = out / "data.parquet"
+            # read_csv gère le BOM UTF-8 des exports tableur
+            select = f"SELECT *, {_iso3_expr()} FROM read_csv('{src.as_posix()}', header=true)"
+            unknown = con.execute(
+                f"SELECT DISTINCT Country FROM ({select}) WHERE ISO3 IS NULL"
+            ).fetchall()
+            if unknown:
+                raise ValueError(
+                    f"{src.name}: no ISO3 code for {', '.join(c for c, in unknown)}; "
+                    "add them to gravitas/countries.py"
+                )
+            tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+            con.execute(f"COPY ({select}) TO '{tmp.as_posix()}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+            tmp.replace(dst)
+            written[table] = dst
+    finally:
+        con.close()
+    return written
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _placeholders(values):
+    return ", ".join("?" for _ in values)
+
+
+class GravitasStore:
+    """Accès en lecture aux tables Parquet via une connexion DuckDB partagée.
+
+    La connexion est partagée entre les sessions Streamlit ; chaque requête
+    passe par son propre curseur pour rester thread-safe. ``scoped`` renvoie
+    une vue sur une autre partition qui partage la même connexion.
+    """
+
+    def __init__(self, parquet_dir=None):
+        self.parquet_dir = Path(parquet_dir or os.environ.get("GRAVITAS_PARQUET_DIR") or PARQUET_DIR)
+        if not all((self.parquet_dir / t).is_dir() for t in TABLES):
+            import_csv(parquet_dir=self.parquet_dir)
+        self._con = duckdb.connect()
+        self._lock = threading.Lock()
+        for table in TABLES:
+            pattern = (self.parquet_dir / table / "*" / "*" / "*.parquet").as_posix()
+            self._con.execute(
+                f"CREATE VIEW {table} AS SELECT * "
+                f"FROM read_parquet('{pattern}', hive_partitioning=true, union_by_name=true)"
+            )
+        self.edition, self.year = self.editions()[-1]
+
+    def editions(self):
+        """Couples (édition, année) disponibles, lus dans l'arborescence sans ouvrir les fichiers."""
+        found = set()
+        for path in (self.parquet_dir / "country_index").glob("edition=*/year=*"):
+            found.add((int(path.parent.name.split("=")[1]), int(path.name.split("=")[1])))
+        return sorted(found)
+
+    def scoped(self, edition, year):
+        """Même magasin restreint à la partition (édition, année)."""
+        if (edition, year) not in self.editions():
+            raise KeyError(f"No data for edition {edition}, year {year}")
+        view = copy.copy(self)
+        view.edition, view.year = int(edition), int(year)
+        return view
+
+    def _files(self, edition=None, year=None):
+        if edition is None:
+            return sorted(self.parquet_dir.glob("*/edition=*/year=*/*.parquet"))
+        return sorted(
+            path for table in TABLES
+            for path in partition_dir(self.parquet_dir, table, edition, year).glob("*.parquet")
+        )
+
+    @staticmethod
+    def _fingerprint(files, salt=""):
+        digest = hashlib.sha1(salt.encode())
+        for path in files:
+            stat = path.stat()
+            digest.update(f"{path.as_posix()}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()[:12]
+
+    @property
+    def version(self):
+        """Empreinte de la partition courante, utilisée comme clé des caches dérivés."""
+        return self._fingerprint(self._files(self.edition, self.year),
+                                 f"{self.edition}/{self.year}")
+
+    @property
+    def panel_version(self):
+        """Empreinte de toutes les partitions (séries multi-éditions)."""
+        return self._fingerprint(self._files())
+
+    def query(self, sql, params=None):
+        """Exécute une requête et renvoie un DataFrame pandas."""
+        with self._lock:
+            cur = self._con.cursor()
+        try:
+            return cur.execute(sql, params or []).df()
+        finally:
+            cur.close()
+
+    def _scope(self):
+        return "edition = ? AND year = ?", [self.edition, self.year]
+
+    def table(self, name):
+        """Table complète de la partition courante, dans l'ordre du fichier source."""
+        if name not in TABLES:
+            raise KeyError(f"Unknown table: {name!r}")
+        where, params = self._scope()
+        return self.query(
+            f"SELECT * EXCLUDE (edition, year) FROM {name} WHERE {where}", params
+        )
+
+    def arrow(self, name):
+        """Table de la partition courante en Arrow, fichiers projetés en mémoire (mmap)."""
+        if name not in TABLES:
+            raise KeyError(f"Unknown table: {name!r}")
+        files = sorted(
+            p.as_posix() for p in
+            partition_dir(self.parquet_dir, name, self.edition, self.year).glob("*.parquet")
+        )
+        return pq.ParquetDataset(files, memory_map=True).read()
+
+    def columns(self, name):
+        return list(self.query(
+            f"SELECT * EXCLUDE (edition, year) FROM {name} LIMIT 0"
+        ).columns)
+
+    def regions(self):
+        where, params = self._scope()
+        return self.query(
+            "SELECT DISTINCT Region FROM country_index "
+            f"WHERE Region IS NOT NULL AND {where} ORDER BY Region", params
+        )["Region"].tolist()
+
+    def countries(self, regions=None):
+        """Pays triés, éventuellement restreints à une liste de régions."""
+        where, params = self._scope()
+        sql = f"SELECT DISTINCT Country FROM country_index WHERE Country IS NOT NULL AND {where}"
+        if regions:
+            sql += f" AND Region IN ({_placeholders(regions)})"
+            params += list(regions)
+        return self.query(sql + " ORDER BY Country", params)["Country"].tolist()
+
+    def filter_countries(self, countries=None, columns=None):
+        """Lignes de l'index pour les pays choisis (tous si la liste est vide).
+
+        Le filtre et la projection sont poussés jusqu'au scan Parquet.
+        """
+        select = ", ".join(_quote(c) for c in columns) if columns else "* EXCLUDE (edition, year)"
+        where, params = self._scope()
+        sql = f"SELECT {select} FROM country_index WHERE {where}"
+        if countries:
+            sql += f" AND Country IN ({_placeholders(countries)})"
+            params += list(countries)
+        return self.query(sql + " ORDER BY Ranking", params)
+
+    def panel(self, columns, countries=None):
+        """Série de toutes les éditions pour les colonnes demandées, triée par période."""
+        select = ", ".join(_quote(c) for c in ["Country", *columns])
+        sql = f"SELECT edition, year, {select} FROM country_index"
+        params = []
+        if countries:
+            sql += f" WHERE Country IN ({_placeholders(countries)})"
+            params = list(countries)
+        return self.query(sql + " ORDER BY edition, year, Ranking", params)
+
+    def partner_totals(self, by):
+        """Somme de ``Value`` de la table partenaires par niveau hiérarchique."""
+        keys = ", ".join(_quote(c) for c in by)
+        where, params = self._scope()
+        return self.query(
+            f"SELECT {keys}, SUM(Value) AS Value FROM partners WHERE {where} "
+            f"GROUP BY {keys} ORDER BY {keys}", params
+        )
+
+    def close(self):
+        self._con.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="convert an edition's CSV files to Parquet partitions")
+    imp.add_argument("--data-dir", default=DATA_DIR)
+    imp.add_argument("--out", default=PARQUET_DIR)
+    imp.add_argument("--edition", type=int, default=DEFAULT_EDITION)
+    imp.add_argument("--year", type=int, default=DEFAULT_YEAR)
+    imp.add_argument("--index", help="country index CSV (default: data/gravitas_country_index.csv)")
+    imp.add_argument("--partners", help="partners CSV (default: data/gravitas_country_index2.csv)")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        sources = {"country_index": args.index, "partners": args.partners}
+        for table, path in import_csv(args.data_dir, args.out, args.edition, args.year,
+                                      sources).items():
+            print(f"{table}: {path}")
+
+
+if __name__ == "__main__":
+    main()
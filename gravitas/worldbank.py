@@ -0,0 +1,253 @@
+"""Ingestion hors ligne des séries World Bank (WDI / WGI / LPI) du GASPI.
+
+Les séries sont téléchargées en parallèle (pool de threads, session HTTP
+partagée), mises en cache sur disque avec ETag et durée de validité, puis
+moyennées sur la période et ramenées sur [0, 1] comme les colonnes du CSV ::
+
+    python -m gravitas.worldbank ingest                  # valeurs brutes seulement
+    python -m gravitas.worldbank ingest --apply          # + mise à jour de l'index
+    python -m gravitas.worldbank ingest --base-url http://127.0.0.1:8765/v2
+
+Les fixtures de ``data/fixtures/worldbank`` reprennent le format de l'API v2
+mais leurs valeurs sont synthétiques ; ``record`` les remplace par des
+réponses réelles. ``gravitas.worldbank_server`` les sert en local.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from gravitas.countries import COUNTRY_BY_ISO3, ISO3
+from gravitas.indicators import COMPOSITE, INDICATORS, RANKING
+from gravitas.scoring import rank_desc
+from gravitas.store import (DATA_DIR, DEFAULT_EDITION, DEFAULT_YEAR, PARQUET_DIR,
+                            GravitasStore, partition_dir)
+
+BASE_URL = "https://api.worldbank.org/v2"
+CACHE_DIR = DATA_DIR / "cache" / "worldbank"
+FIXTURE_DIR = DATA_DIR / "fixtures" / "worldbank"
+RAW_TABLE = "worldbank_raw"
+
+# Code de série -> (colonne du dashboard, base World Bank : 2 = WDI, 3 = WGI)
+SERIES = {
+    "NY.GDP.MKTP.PP.KD": ("GDP", 2),
+    "NY.GDP.PCAP.PP.KD": ("Per Capita Income (PCI)", 2),
+    "LP.LPI.OVRL.XQ": ("Logistic Performance Index (LPI)", 2),
+    "GE.PER.RNK": ("Government Efficacity", 3),
+    "PV.PER.RNK": ("Political stability", 3),
+    "SP.POP.TOTL": ("Population", 2),
+    "SP.URB.TOTL.IN.ZS": ("Urban Population", 2),
+}
+
+START_YEAR, END_YEAR = 2020, 2024
+
+
+class WorldBankError(RuntimeError):
+    """Réponse d'erreur de l'API (renvoyée avec un statut 200)."""
+
+
+class HttpCache:
+    """Cache disque des réponses JSON avec validation ETag / Last-Modified.
+
+    Une entrée plus jeune que ``ttl`` secondes est servie sans requête ;
+    au-delà, elle est revalidée par une requête conditionnelle.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=24 * 3600):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.hits = self.revalidated = self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, url):
+        return self.directory / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    def load(self, url):
+        try:
+            return json.loads(self._path(url).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, url, body, etag=None, last_modified=None):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = {"url": url, "etag": etag, "last_modified": last_modified,
+                 "fetched_at": time.time(), "body": body}
+        tmp = self._path(url).with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry))
+        tmp.replace(self._path(url))
+        return entry
+
+    def fetch(self, session, url, timeout=30):
+        entry = self.load(url)
+        if entry and time.time() - entry["fetched_at"] < self.ttl:
+            with self._lock:
+                self.hits += 1
+            return entry["body"]
+
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry:
+            with self._lock:
+                self.revalidated += 1
+            self.save(url, entry["body"], entry.get("etag"), entry.get("last_modified"))
+            return entry["body"]
+
+        response.raise_for_status()
+        with self._lock:
+            self.misses += 1
+        body = response.json()
+        self.save(url, body, response.headers.get("ETag"),
+                  response.headers.get("Last-Modified") or formatdate(usegmt=True))
+        return body
+
+
+def make_session(workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def series_url(base_url, code, countries, start, end, page=1, per_page=1000):
+    source = SERIES[code][1]
+    return (f"{base_url}/country/{';'.join(countries)}/indicator/{code}"
+            f"?format=json&date={start}:{end}&per_page={per_page}&page={page}&source={source}")
+
+
+def _records(body, url):
+    if not isinstance(body, list) or len(body) < 2 or "message" in body[0]:
+        raise WorldBankError(f"{url}: {body[0].get('message') if body else body}")
+    return body[0], body[1] or []
+
+
+def fetch_series(codes=tuple(SERIES), countries=tuple(ISO3.values()), start=START_YEAR,
+                 end=END_YEAR, base_url=BASE_URL, cache=None, workers=8, per_page=1000):
+    """Télécharge les séries en parallèle et renvoie {code: [enregistrements]}."""
+    cache = cache or HttpCache()
+    session = make_session(workers)
+    countries = sorted(countries)
+
+    def get(code, page):
+        url = series_url(base_url, code, countries, start, end, page, per_page)
+        return _records(cache.fetch(session, url), url)
+
+    with session, ThreadPoolExecutor(max_workers=workers) as pool:
+        first = {code: pool.submit(get, code, 1) for code in codes}
+        results, pending = {}, []
+        for code, future in first.items():
+            meta, records = future.result()
+            results[code] = list(records)
+            pending += [(code, pool.submit(get, code, page))
+                        for page in range(2, int(meta.get("pages", 1)) + 1)]
+        for code, future in pending:
+            results[code] += future.result()[1]
+    return results
+
+
+def to_frame(results):
+    """Table longue (Country, ISO3, series, indicator, year, value) des réponses."""
+    rows = [
+        (COUNTRY_BY_ISO3.get(r["countryiso3code"]), r["countryiso3code"], code,
+         SERIES[code][0], int(r["date"]), r["value"])
+        for code, records in results.items() for r in records
+        if r.get("countryiso3code") in COUNTRY_BY_ISO3
+    ]
+    return pd.DataFrame(rows, columns=["Country", "ISO3", "series", "indicator", "year", "value"])
+
+
+def normalize(raw, countries):
+    """Moyenne sur la période puis mise à l'échelle min-max sur les pays de l'index."""
+    means = (raw.dropna(subset=["value"])
+             .pivot_table(index="Country", columns="indicator", values="value", aggfunc="mean")
+             .reindex(countries))
+    lo, hi = means.min(), means.max()
+    return ((means - lo) / (hi - lo).replace(0, np.nan)).round(2)
+
+
+def write_raw(raw, edition, year, parquet_dir=PARQUET_DIR):
+    out = partition_dir(parquet_dir, RAW_TABLE, edition, year)
+    out.mkdir(parents=True, exist_ok=True)
+    raw.to_parquet(out / "data.parquet", index=False)
+    return out / "data.parquet"
+
+
+def apply_to_index(normalized, edition, year, parquet_dir=PARQUET_DIR):
+    """Remplace les colonnes World Bank de l'index et recalcule composite et classement."""
+    store = GravitasStore(parquet_dir).scoped(edition, year)
+    df = store.table("country_index").set_index("Country")
+    columns = [c for c in normalized.columns if c in df.columns]
+    df.update(normalized[columns])
+    df[COMPOSITE] = df[INDICATORS].sum(axis=1).round(2)
+    df[RANKING] = rank_desc(df[COMPOSITE].to_numpy())
+    df = df.reset_index().sort_values(RANKING, kind="stable")[store.columns("country_index")]
+    dst = partition_dir(parquet_dir, "country_index", edition, year) / "data.parquet"
+    df.to_parquet(dst, index=False)
+    return dst, columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.worldbank")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("ingest", "record"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--base-url", default=BASE_URL)
+        cmd.add_argument("--start", type=int, default=START_YEAR)
+        cmd.add_argument("--end", type=int, default=END_YEAR)
+        cmd.add_argument("--workers", type=int, default=8)
+    ingest = sub.choices["ingest"]
+    ingest.add_argument("--edition", type=int, default=DEFAULT_EDITION)
+    ingest.add_argument("--year", type=int, default=DEFAULT_YEAR)
+    ingest.add_argument("--ttl", type=int, default=24 * 3600, help="cache lifetime in seconds")
+    ingest.add_argument("--cache-dir", default=CACHE_DIR)
+    ingest.add_argument("--apply", action="store_true",
+                        help="write the normalized series into the country index partition")
+    sub.choices["record"].add_argument("--out", default=FIXTURE_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        # Pas de cache : on enregistre les réponses telles que renvoyées par l'API
+        cache = HttpCache(Path(args.out) / ".cache", ttl=0)
+        results = fetch_series(start=args.start, end=args.end, base_url=args.base_url,
+                               cache=cache, workers=args.workers)
+        out = Path(args.out)
+        for code, records in results.items():
+            meta = {"page": 1, "pages": 1, "per_page": len(records), "total": len(records),
+                    "sourceid": str(SERIES[code][1]), "lastupdated": time.strftime("%Y-%m-%d")}
+            (out / f"{code}.json").write_text(json.dumps([meta, records], indent=1))
+            print(f"{code}: {len(records)} records")
+        return
+
+    cache = HttpCache(args.cache_dir, args.ttl)
+    started = time.perf_counter()
+    results = fetch_series(start=args.start, end=args.end, base_url=args.base_url,
+                           cache=cache, workers=args.workers)
+    raw = to_frame(results)
+    print(f"fetched {len(raw)} observations in {time.perf_counter() - started:.2f}s "
+          f"(cache: {cache.hits} fresh, {cache.revalidated} revalidated, {cache.misses} downloaded)")
+    print(f"raw values: {write_raw(raw, args.edition, args.year)}")
+
+    store = GravitasStore().scoped(args.edition, args.year)
+    normalized = normalize(raw, store.countries())
+    if args.apply:
+        dst, columns = apply_to_index(normalized, args.edition, args.year)
+        print(f"updated {', '.join(columns)} in {dst}")
+    else:
+        print(normalized.to_string())
+
+
+if __name__ == "__main__":
+    main()
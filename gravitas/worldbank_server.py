@@ -0,0 +1,115 @@
+"""Serveur local qui imite l'API World Bank v2 à partir des fixtures enregistrées.
+
+Il gère la sélection de pays, la plage de dates, la pagination et les
+requêtes conditionnelles (ETag / If-None-Match) ::
+
+    python -m gravitas.worldbank_server --port 8765
+    python -m gravitas.worldbank ingest --base-url http://127.0.0.1:8765/v2
+
+``running()`` le démarre dans un thread pour un usage en cours de processus.
+"""
+import argparse
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from gravitas.worldbank import FIXTURE_DIR
+
+INVALID = [{"message": [{"id": "120", "key": "Invalid value",
+                         "value": "The provided parameter value is not valid"}]}]
+
+
+def load_fixtures(directory=FIXTURE_DIR):
+    """{code de série: (meta, enregistrements)} depuis les fichiers JSON."""
+    fixtures = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        meta, records = json.loads(path.read_text())
+        fixtures[path.stem] = (meta, records or [])
+    return fixtures
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    fixtures = {}
+    requests_served = 0
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        # /v2/country/<iso3;iso3>/indicator/<code>
+        if len(parts) != 5 or parts[1] != "country" or parts[3] != "indicator" \
+                or parts[4] not in self.fixtures:
+            return self._send(INVALID)
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        meta, records = self.fixtures[parts[4]]
+        countries = None if parts[2].lower() == "all" else set(parts[2].upper().split(";"))
+        start, _, end = query.get("date", "0:9999").partition(":")
+        rows = [
+            r for r in records
+            if (countries is None or r["countryiso3code"] in countries)
+            and int(start) <= int(r["date"]) <= int(end or start)
+        ]
+        per_page = max(int(query.get("per_page", 50)), 1)
+        page = max(int(query.get("page", 1)), 1)
+        pages = max((len(rows) + per_page - 1) // per_page, 1)
+        page_meta = dict(meta, page=page, pages=pages, per_page=per_page, total=len(rows))
+        self._send([page_meta, rows[(page - 1) * per_page:page * per_page]])
+
+    def _send(self, payload):
+        body = json.dumps(payload).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=0, fixture_dir=FIXTURE_DIR):
+    handler = type("Handler", (FixtureHandler,), {"fixtures": load_fixtures(fixture_dir)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+@contextmanager
+def running(fixture_dir=FIXTURE_DIR):
+    """Démarre le serveur sur un port libre et renvoie son URL de base (``.../v2``)."""
+    server = make_server(fixture_dir=fixture_dir)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{server.server_address[0]}:{server.server_address[1]}/v2"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gravitas.worldbank_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.fixtures)
+    print(f"World Bank stand-in on http://{args.host}:{args.port}/v2")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
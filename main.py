@@ -1,18 +1,149 @@
-import streamlit as st
+import time
+_started = time.perf_counter()
+import os
+from collections import OrderedDict
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
-from streamlit_elements import elements, mui, nivo
-from st_link_analysis import st_link_analysis, NodeStyle, EdgeStyle
+import streamlit as st
+# Les constructeurs de figures (plotly), la carte de liens, l'analyse de sensibilité,
+# streamlit_elements, st_link_analysis, l'index de similarité (scipy) et l'API sont
+# importés par les sections qui s'en servent, à leur premier rendu. gravitas.figures
+# n'importe plotly qu'à la construction d'une figure ; gravitas.normalize fournit les
+# méthodes du sélecteur de la barre latérale, construit à chaque passage.
+from gravitas.store import GravitasStore
+from gravitas.artifact import Artifact
+from gravitas.dataset import Dataset, live_bytes, table_key
+from gravitas.figures import BOX_POINT_LIMIT, SUNBURST_COLUMNS, FigureCache
+from gravitas.indicators import INDICATORS, PILLAR_WEIGHTS, RANKING
+from gravitas.matrix import IndicatorMatrix
+from gravitas.normalize import LABELS, METHODS, PUBLISHED, bounded, raw_version
+from gravitas.profiling import PROFILER, deep_nbytes, profiled
+from gravitas.scoring import ScoringEngine
+from gravitas.selection import SelectionCache, canonical, selection_tables
 import warnings
 warnings.filterwarnings('ignore')
-
-@st.cache_data
-def load_data():
-    return pd.read_csv('data/gravitas_country_index.csv'), pd.read_csv('data/gravitas_country_index2.csv')
-
-df, df2 = load_data()
+PROFILER.mark_imported()
+_imported = time.perf_counter()
+
+# Une seule connexion DuckDB par processus, partagée par les sessions
+@st.cache_resource
+def get_store():
+    return GravitasStore()
+
+# Artefact compilé au déploiement (python -m gravitas.artifact build) ; None s'il manque
+@st.cache_resource
+def get_artifact():
+    return Artifact.open()
+
+# Tables dérivées précalculées d'une partition ; None si elle a changé depuis la compilation
+@st.cache_resource(max_entries=4)
+def get_compiled(edition, year, version):
+    artifact = get_artifact()
+    if artifact is None:
+        return None
+    with PROFILER.section("data.artifact"):
+        return artifact.partition(get_store().scoped(edition, year))
+
+# Partition chargée une fois par processus (Arrow, mmap) et partagée, sans copie, par
+# toutes les sessions ; le nombre d'éditions gardées en mémoire est borné.
+# Avec une méthode de normalisation, les indicateurs, le composite et le classement sont
+# recalculés depuis les valeurs brutes ; raw est l'empreinte de la table brute.
+@st.cache_resource(max_entries=8)
+def get_dataset(edition, year, version, method=PUBLISHED, raw=None):
+    if method != PUBLISHED:
+        from gravitas.normalize import normalized_table
+        base = get_dataset(edition, year, version, PUBLISHED, None)
+        pipeline = get_pipeline(edition, year, version, raw)
+        with PROFILER.section("data.normalize"):
+            return Dataset(normalized_table(base.table, pipeline, method), (version, method))
+    compiled = get_compiled(edition, year, version)
+    with PROFILER.section("data.load"):
+        if compiled is not None:
+            return Dataset(compiled.table("country_index"), version)
+        return Dataset.from_store(get_store().scoped(edition, year))
+
+# Dernier pipeline de normalisation par (édition, année) : base des mises à jour incrémentales
+@st.cache_resource
+def get_pipeline_bases():
+    return {}
+
+# Valeurs brutes de la partition et matrices normalisées déjà calculées (une par méthode)
+@st.cache_resource(max_entries=4)
+def get_pipeline(edition, year, version, raw):
+    from gravitas.normalize import Pipeline, read_raw
+    bases = get_pipeline_bases()
+    with PROFILER.section("data.raw"):
+        df = read_raw(get_store().scoped(edition, year))
+        countries, values = df["Country"], df[INDICATORS].to_numpy(dtype=float)
+        base = bases.get((edition, year))
+        pipeline = base.updated(countries, values) if base is not None else Pipeline(countries, values)
+    bases[(edition, year)] = pipeline
+    return pipeline
+
+# Empreinte des colonnes de partners lues par le sunburst : seule sa clé de cache
+@st.cache_resource(max_entries=4)
+def get_partners_key(edition, year, version):
+    return table_key(get_store().scoped(edition, year).arrow("partners"), SUNBURST_COLUMNS)
+
+# Cache de figures commun à toutes les sessions et à toutes les éditions
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+# Matrice pays x indicateurs partagée par les cartes, le radar et les camemberts
+@st.cache_resource(max_entries=8)
+def get_matrix(edition, year, version, method=PUBLISHED, raw=None):
+    dataset = get_dataset(edition, year, version, method, raw)
+    with PROFILER.section("data.matrix"):
+        return IndicatorMatrix.from_dataset(dataset)
+
+# Moteur de calcul du Composite index (poids de piliers ajustables)
+@st.cache_resource(max_entries=8)
+def get_engine(edition, year, version, method=PUBLISHED, raw=None):
+    matrix = get_matrix(edition, year, version, method, raw)
+    with PROFILER.section("data.engine"):
+        return ScoringEngine(matrix)
+
+# API JSON en lecture seule dans le même processus (GRAVITAS_API_PORT), sur la même connexion
+@st.cache_resource
+def get_api_server(port):
+    from gravitas.api import serve_in_background
+    return serve_in_background(os.environ.get("GRAVITAS_API_HOST", "127.0.0.1"), port, get_store())
+
+if os.environ.get("GRAVITAS_API_PORT"):
+    get_api_server(int(os.environ["GRAVITAS_API_PORT"]))
+
+# Rechargement à chaud des CSV de data/ (GRAVITAS_WATCH=1) : un fil par processus
+WATCH_INTERVAL = float(os.environ.get("GRAVITAS_WATCH_INTERVAL", 2))
+
+@st.cache_resource
+def get_watcher():
+    from gravitas.reload import DataWatcher
+    return DataWatcher(get_store(), interval=WATCH_INTERVAL).start()
+
+# Dernier index de similarité par (édition, année, normalisation, poids) : base des mises à jour incrémentales
+@st.cache_resource
+def get_similarity_bases():
+    return {}
+
+# Index des plus proches voisins, par matrice (version, normalisation), empreinte des indicateurs et pondération
+@st.cache_resource(max_entries=8)
+def get_similarity_index(edition, year, version, method, raw, content, weights):
+    engine = get_engine(edition, year, version, method, raw)
+    bases = get_similarity_bases()
+    key = (edition, year, method, raw, weights)
+    with PROFILER.section("data.similarity"):
+        from gravitas.similarity import SimilarityIndex
+        if key in bases:
+            index = bases[key].updated(engine.countries, engine.values)
+        else:
+            index = SimilarityIndex(engine.countries, engine.values,
+                                    None if weights is None else engine.indicator_weights(weights))
+    bases[key] = index
+    return index
+
+def ordinal(n):
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
 
 st.logo("data/l-gravitas-2.jpg", size="large")
 # Injection CSS complète
@@ -54,357 +185,202 @@ with st.sidebar:
   st.markdown("<br>", unsafe_allow_html=True)
   st.title('GASPI INDEX NAVIGATOR')
 
-    # Liste des régions disponibles
-  region_lst = sorted(df["Region"].dropna().unique())
-  select_region = st.multiselect("Select a Region", region_lst)
-
-    # Filtrage conditionnel des pays affichés
-  if select_region:
-    # Pays disponibles dans les régions sélectionnées
-    countries_in_region = sorted(df[df["Region"].isin(select_region)]["Country"].unique())
-    default_countries = countries_in_region
-  else:
-    countries_in_region = sorted(df["Country"].dropna().unique())
-    default_countries=[]
-
-    # Sélection finale de pays avec possibilité de choisir en dehors des régions
-  select_country = st.multiselect(
-      "Select Country",
-      options=sorted(df["Country"].dropna().unique()),  # tous les pays
-      default=default_countries                      # pré-rempli si une région est sélectionnée
-    )
-
-    # Application du filtre final
-  if select_country:
-      filtered_df = df[df["Country"].isin(select_country)]
-  else:
-      filtered_df = df.copy()
-
+    # Édition / année : change toute la page, donc hors du fragment de sélection
+  editions = get_store().editions()
+  edition, year = st.selectbox(
+      "Edition", editions, index=len(editions) - 1,
+      format_func=lambda e: f"{ordinal(e[0])} Edition ({e[1]})"
+  )
+  # Normalisation des indicateurs : chaque méthode est calculée une fois par version des données
+  normalization = st.selectbox(
+      "Normalization", [PUBLISHED, *METHODS], format_func=LABELS.get,
+      help="Rescale the raw indicator values. Published keeps the values of the source spreadsheet.")
+
+store = get_store().scoped(edition, year)
+version = store.version
+compiled = get_compiled(edition, year, version)
+# Listes de régions et de pays : précalculées dans l'artefact, sinon requêtes DuckDB
+catalog = compiled if compiled is not None else store
+# Empreinte de la table brute (python -m gravitas.normalize build) ; None si elle manque
+raw_table = raw_version(store)
+raw = raw_table if normalization != PUBLISHED else None
+
+# Données de la partition et de la normalisation choisies, préparées par les sections qui
+# s'en servent : en mode différé, une section fermée ne charge rien
+def current_dataset():
+    return get_dataset(edition, year, version, normalization, raw)
+
+def current_matrix():
+    return get_matrix(edition, year, version, normalization, raw)
+
+def current_engine():
+    return get_engine(edition, year, version, normalization, raw)
+
+def current_figures():
+    from gravitas.figures import FigureFactory
+    return FigureFactory(store, get_figure_cache(), dataset=current_dataset(), compiled=compiled,
+                         partners_key=get_partners_key(edition, year, version))
 
 theme_mode = "dark"  # ou "light"
 tick_color = "black" if theme_mode == "dark" else "white"
 tick_color2 = "white" if theme_mode == "dark" else "black"
 
+# Indicateurs du Composite index (boxplot, radar, camemberts)
+radar_variables = INDICATORS
+
+# Tables dérivées par sélection canonique (boxplot, radar, camemberts), partagées entre
+# les sessions dans un LRU borné en mémoire (GRAVITAS_SELECTION_CACHE_MB, 64 par défaut).
+# La clé est l'empreinte des indicateurs des pays choisis : un rechargement qui modifie
+# un pays n'invalide que les sélections qui le contiennent (toutes si elle est vide).
+@st.cache_resource
+def get_selection_cache():
+    return SelectionCache(int(os.environ.get("GRAVITAS_SELECTION_CACHE_MB", 64)) * 2**20)
+
+def get_selection(select_country):
+    selection = canonical(select_country)
+
+    def build():
+        with PROFILER.section("data.selection"):
+            # Sélection vide : statistiques de tous les pays précalculées dans l'artefact
+            stats = compiled.indicator_stats().loc[radar_variables] \
+                if not selection and compiled is not None and normalization == PUBLISHED else None
+            return selection_tables(current_matrix(), selection, radar_variables, stats)
+
+    dataset = current_dataset()
+    content = dataset.key(radar_variables, dataset.rows(selection))
+    return get_selection_cache().get((content, selection), build)
+
 ## Le Globe
-# --- Mise en page : deux colonnes pour les deux blocs ---
-col1, col2 = st.columns([1, 1])
+# Chaque section est un fragment ou une fonction de rendu aux dépendances explicites :
+# le sunburst et la carte de liens ne dépendent pas de la sélection et ne sont pas
+# recalculés quand la barre latérale change. @profiled mesure chaque section
+# (durée, octets envoyés) pour le banc d'essai gravitas.bench.
 
 # === BLOC 1 : SUNBURST CHART ===
-with col1:
-    st.subheader("Sunburst Chart - GASPI Partners (1st Edition)")
+@st.fragment
+@profiled("sunburst")
+def sunburst_section():
+    st.subheader(f"Sunburst Chart - GASPI Partners ({ordinal(edition)} Edition)")
     st.text("Click on the chart to deploy and discover the countries that willl be colaborating on the first edition of the GASPI intiative.")
 
-    # Préparation du DataFrame hiérarchique
-    sunburst_data = pd.DataFrame(columns=['labels', 'parents', 'values'])
-
-    # Niveau 1 : Continents (racine)
-    continents = df2.groupby('Continent')['Value'].sum().reset_index()
-    sunburst_data = pd.concat([
-        sunburst_data,
-        pd.DataFrame({
-            'labels': continents['Continent'],
-            'parents': [''] * len(continents),  # racine
-            'values': continents['Value']
-        })
-    ])
-
-    # Niveau 2 : Régions
-    regions = df2.groupby(['Continent', 'Region'])['Value'].sum().reset_index()
-    sunburst_data = pd.concat([
-        sunburst_data,
-        pd.DataFrame({
-            'labels': regions['Region'],
-            'parents': regions['Continent'],
-            'values': regions['Value']
-        })
-    ])
-
-    # Niveau 3 : Pays
-    countries = df2[['Region', 'Country', 'Value']]
-    sunburst_data = pd.concat([
-        sunburst_data,
-        pd.DataFrame({
-            'labels': countries['Country'],
-            'parents': countries['Region'],
-            'values': countries['Value']
-        })
-    ])
-
-    # Création du Sunburst
-    
-    fig_sunburst = go.Figure(go.Sunburst(
-        labels=sunburst_data['labels'],
-        parents=sunburst_data['parents'],
-        values=sunburst_data['values'],
-        branchvalues="total",
-        hoverinfo='skip',
-        maxdepth=2  # facultatif, ne montre que les continents au début
-    ))
-
-    fig_sunburst.update_layout(
-        margin=dict(t=60, l=0, r=0, b=0),
-        font_color='white', font_size=16,
-        height=600
-    )
-    st.plotly_chart(fig_sunburst, use_container_width=True)
+    # Figure partagée entre les sessions (cache LRU par version des données)
+    st.plotly_chart(current_figures().sunburst(theme_mode), use_container_width=True)
 
 # === BLOC 2 : GLOBE ORTHOGRAPHIQUE CHOROPLETH ===
-with col2:
+@profiled("globe")
+def render_globe(select_country, scores, animate=False):
     st.subheader("World Map - African countries classified by GASPI Composite Index")
     st.text("Map-based visualization of country rankings according to the GASPI Classification.")
+    figures = current_figures()
 
-    # 🗺️ Construction du choropleth avec GO + projection globe
-    fig = go.Figure(data=go.Choropleth(
-        locations=filtered_df['Country'],               # noms de pays
-        locationmode='country names',
-        z=filtered_df['Composite index'],               # variable à colorier
-        colorscale='Blues',
-        colorbar_title='Composite Index',
-        
-        customdata=filtered_df[['Country', 'Composite index', 'Ranking']],
-        hovertemplate=(
-            "<b>%{customdata[0]}</b><br>" +
-            "Composite Index: %{customdata[1]:.2f}<br>" +
-            "Ranking: %{customdata[2]}<br><extra></extra>"
-        )
-    ))
-
-    # Paramètres de projection et style globe
-    fig.update_geos(
-        projection_type="orthographic",
-        showland=True, landcolor='gray',
-        showocean=True, oceancolor='black',
-        showlakes=True, lakecolor='black', coastlinecolor='white',
-        bgcolor= "rgba(0,0,0,0)",  # fond noir pour le globe
-        # Empêche le globe de bouger au drag
-        fitbounds="locations",   # ajuste à l'ensemble des pays affichés
-        lataxis_showgrid=False,
-        lonaxis_showgrid=False,
-        )
+    if animate:
+        # Évolution du classement sur toutes les éditions publiées
+        st.plotly_chart(figures.ranking_evolution(select_country, theme_mode), use_container_width=True)
+        return
 
-    # Mise en page
-    fig.update_layout(
-        hoverlabel=dict(
-            bgcolor="black",   # fond
-            font_size=16,
-            font_family="Arial",
-            font_color="white",
-            bordercolor="white"
-            ),
-            coloraxis_colorbar=dict(
-            tickfont=dict(color=tick_color2),
-            ),
-            height=600,
-            margin={"l": 0, "r": 0, "t": 0, "b": 0},
-    )
-    # Affichage dans Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    # 🗺️ Choropleth avec projection globe, mis en cache par sélection
+    st.plotly_chart(figures.choropleth(select_country, theme_mode, scores), use_container_width=True)
 
 ##################################################
 
 # Graphe interactif
-with st.container():
-    st.set_page_config(layout="wide")
-        # Affichage
-    st.title("")
-    st.subheader("Macro Linkage Map of Composite Index")
-    st.text("Navigate inside the graph to explore the relationships between the composite index, its pillars, and indicators. Hover over nodes and edges for more information.")
-
-    # Définition des éléments
-    graph_data = {
-        "nodes": [
-            {"data": {"id": "Composite", "label": "INDEX", "name": "Composite Index",
-                      "description":"The overall macroeconomic composite index used to rank investment attractiveness. It combines 13 key indicators across three main pillars: economic importance (i), political and diplomatic relations (ii), and social and strategic significance (iii) "}},
-
-            {"data": {"id": "Economic", "label": "PILLAR", "name": "Economic Importance (40%)",
-                      "description":"The first pillar, economic importance, consists of five indicators that reflect the strength of economic engagement between Africa and the Gulf. These include the volume of bilateral trade with GCC countries, the stock of Gulf foreign direct investment, partnerships in energy and infrastructure, Gulf investments in African agriculture, African countries renewables energy capacity and Logistic Performance Index. These indicators highlight the economic interdependence between the regions and the role of African countries in supplying key commodities and investment opportunities to Gulf states."}},
-            {"data": {"id": "Political", "label": "PILLAR", "name": "Political & Diplomatic Relations (35%)",
-                      "description":"The second pillar, political and diplomatic relations, evaluates the strength of diplomatic engagement and governance quality. It includes three indicators: the level of diplomatic ties between GCC and African countries, the political stability score of each African country, and government effectiveness as measured by governance indices. These indicators provide insight into the reliability of African partners for long-term cooperation, as well as their institutional capacity to facilitate trade and investment."}},
-            {"data": {"id": "Social", "label": "PILLAR", "name": "Social & Strategic Significance (25%)",
-                      "description":"The third pillar, social and strategic significance, captures demographic and agricultural potential. It comprises three indicators: total population size, the urbanization rate as a proxy for market potential, and the food security and agricultural capacity of each African country. These factors are crucial for understanding Africa's role in meeting Gulf countries' long-term food security needs and their potential as key consumer markets."}},
-
-            # Economic Indicators
-            {"data": {"id": "Imports", "label": "INDICATOR", "name": "GCC Imports of Goods and Services from African Countries",
-                      "description":"This measure captures the average imports of goods and services from African countries to the GCC region over the period 2020-2024."}},
-            {"data": {"id": "Exports", "label": "INDICATOR", "name": "GCC Exports of Goods and Services from African Countries",
-                      "description":"This indicator reports the average exports of goods and services from the GCC region to African countries between 2020-2024."}},
-            {"data": {"id": "FDI", "label": "INDICATOR", "name": "GCC Greenfield Foreign Direct Investment (FDI) to African Countries",
-                      "description":"This metric assesses the total stock of Greenfield FDI from GCC countries to African nations between 2020-2024, based on data from the fDi Markets database. Greenfield FDI represents new investments that involve the establishment of new operations, such as factories or subsidiaries."}},
-            {"data": {"id": "GDP", "label": "INDICATOR", "name": "African Countries' GDP (PPP, Const $)",
-                      "description":"This indicator measures the economic size or market potential of African countries, using GDP data converted to Purchasing Power Parity (PPP) and constant dollars. The data, sourced from the World Development Indicators (WDI), helps assess the relative economic strength and potential of African markets for GCC countries."}},
-            {"data": {"id": "PCI", "label": "INDICATOR", "name": "African Countries' GDP Per Capita",
-                      "description":"This metric, also sourced from the World Development Indicators (WDI), measures the GDP per capita of African countries. It provides insight into the purchasing power of citizens in each country, indicating the economic well-being and market potential at the individual level."}},
-            {"data": {"id": "Renewables", "label": "INDICATOR", "name": "Renewable Energy Share",
-                      "description":"Renewable power capacity growth refers to the expansion of energy generation from renewable sources over time. This includes hydropower (excluding pumped storage), solar energy, wind energy, bioenergy, geothermal energy, and marine energy. Data on the growth of renewable power capacity is sourced from the International Renewable Energy Agency (IRENA)"}},
-            {"data": {"id": "LPI", "label": "INDICATOR", "name": "Logistic Performance Index",
-                      "description":"The World Bank's Logistics Performance Index (LPI) is a tool that measures the relative ease and efficiency with which products can be moved into and within a country. The LPI is developed based on a worldwide survey of global freight forwarders and express carriers, combining their feedback with quantitative data on the performance of key logistics components. It evaluates countries across six key dimensions: the efficiency of customs clearance, the quality of trade and transport-related infrastructure, the ease of arranging competitively priced international shipments, the quality of logistics services, the ability to track and trace consignments, and the timeliness of shipments. LPI scores range from 1 to 5, with higher scores indicating better performance."}},
-
-            # Political Indicators
-            {"data": {"id": "Diplomacy", "label": "INDICATOR", "name": "Diplomatic Ties with GCC", 
-                      "description":"For this we use a diplomatic representation database. The latest database is available until 2022. The Level of Representation Index (LoRI) is a scale ranging from 0 to 1, designed to measure the formal level of diplomatic accreditation along with the degree of focus on the bilateral relationship. A country receives the highest score of 1.00 if it is represented by an Ambassador, Nuncio, or Secretary of the People's Bureau with a singular focus on the relationship. A slightly lower score of 0.75 is assigned if the representation is through a Charge d'affaires, minister, or an unknown status, but still with a singular focus. When an Ambassador, Nuncio, or Secretary of the People's Bureau is accredited with multiple areas of focus, the score is 0.50, while the presence of a Charge d'affaires, minister, or an unknown status with multiple focuses results in a score of 0.375. Countries with only an interest desk receive a score of 0.125, whereas those whose interests are merely served by another entity are assigned 0.10. Finally, the lowest score of 0.00 is given when diplomatic relations have been expelled, recalled, or withdrawn. As there are six GCC countries, we need to sum up, and in this case the maximum any African country gets is 6. For example, if all of the GCC sates have ambassador to Nigeria, it means the level of representation index is 6. If three countries from the GCC have ambassadors to Gambia and two GCC countries have Charge d'affaires and one GCC country has only an interest desk, the score for the Gambia would be 1+1+1+0.75+0.75+0.125=4.625"}},
-            {"data": {"id": "Stability", "label": "INDICATOR", "name": "Political Stability", 
-                      "description":"The Political Stability and Absence of Violence/Terrorism indicator, provided by the World Bank's Worldwide Governance Indicators (WGI), assesses government performance in maintaining stability and preventing politically motivated violence, including terrorism. It reflects perceptions of the likelihood of political instability and unrest, drawing from multiple measures such as orderly transfers of power, violent demonstrations, social unrest, political terror scale, external and internal conflicts, and ethnic tensions. Countries are ranked on a percentile scale from 0 to 100, with higher values indicating greater political stability. The most recent data is from 2023."}},
-            {"data": {"id": "Governance", "label": "INDICATOR", "name": "Government Effectiveness",
-                      "description":"The Government Effectiveness indicator, sourced from the World Bank's Worldwide Governance Indicators (WGI), measures perceptions of the quality of public services, the competence and independence of the civil service from political influence, the effectiveness of policy formulation and implementation, and the government's commitment to its policies. This index is composed of various factors, including bureaucratic quality, road infrastructure, primary education quality, public satisfaction with transportation, and overall governance efficiency. Countries are ranked on a percentile scale from 0 to 100, with higher scores indicating more effective governance. The most recent data is from 2023"}},
-
-            # Social Indicators
-            {"data": {"id": "Population", "label": "INDICATOR", "name": "Population Size",
-                      "description":"Population size is a key demographic indicator, reflecting the overall market potential of a country. A larger population often signifies a bigger consumer base, greater labour force availability, and increased economic activity. Countries with sizable populations tend to attract more trade and investment opportunities, making this an essential factor in economic and diplomatic considerations."}},
-            {"data": {"id": "Urban", "label": "INDICATOR", "name": "Urbanization Rate/population",
-                      "description":"The urbanization rate, measured as the percentage of a country's population living in urban areas, serves as a crucial proxy for economic development, infrastructure needs, and technological readiness. Higher urbanization levels often correlate with improved infrastructure, greater digital connectivity, and stronger prospects for collaboration in sectors such as the digital economy, smart cities, and advanced transportation systems. This indicator provides insights into a country's modernization efforts and its capacity for future economic growth."}},
-            {"data": {"id": "Food", "label": "INDICATOR", "name": "Food Security & Agriculture",
-                      "description":"Food security and agricultural potential are strategic priorities, particularly for regions reliant on food imports, such as the Gulf Cooperation Council (GCC) countries. To assess this, we consider key indicators like arable land availability and irrigation potential estimates, which determine a country's ability to sustain agricultural production. Given the importance of agriculture for food security, trade, and investment, this metric helps identify nations with strong potential for collaboration in agri-business, food supply chains, and sustainable farming practices."}},
-        ],
-        "edges": [
-            # Composite to Pillars
-            {"data": {"id": "e1", "label": "INCLUDES", "source": "Composite", "target": "Economic"}},
-            {"data": {"id": "e2", "label": "INCLUDES", "source": "Composite", "target": "Political"}},
-            {"data": {"id": "e3", "label": "INCLUDES", "source": "Composite", "target": "Social"}},
-
-            # Economic Indicators
-            {"data": {"id": "e4", "label": "MEASURED_BY", "source": "Economic", "target": "Imports"}},
-            {"data": {"id": "e5", "label": "MEASURED_BY", "source": "Economic", "target": "Exports"}},
-            {"data": {"id": "e6", "label": "MEASURED_BY", "source": "Economic", "target": "FDI"}},
-            {"data": {"id": "e7", "label": "MEASURED_BY", "source": "Economic", "target": "GDP"}},
-            {"data": {"id": "e8", "label": "MEASURED_BY", "source": "Economic", "target": "PCI"}},
-            {"data": {"id": "e9", "label": "MEASURED_BY", "source": "Economic", "target": "Renewables"}},
-            {"data": {"id": "e10", "label": "MEASURED_BY", "source": "Economic", "target": "LPI"}},
-
-            # Political Indicators
-            {"data": {"id": "e11", "label": "MEASURED_BY", "source": "Political", "target": "Diplomacy"}},
-            {"data": {"id": "e12", "label": "MEASURED_BY", "source": "Political", "target": "Stability"}},
-            {"data": {"id": "e13", "label": "MEASURED_BY", "source": "Political", "target": "Governance"}},
-
-            # Social Indicators
-            {"data": {"id": "e14", "label": "MEASURED_BY", "source": "Social", "target": "Population"}},
-            {"data": {"id": "e15", "label": "MEASURED_BY", "source": "Social", "target": "Urban"}},
-            {"data": {"id": "e16", "label": "MEASURED_BY", "source": "Social", "target": "Food"}},
+# Éléments et positions partagés entre les sessions, par empreinte des indicateurs et mode
+@st.cache_resource(max_entries=8)
+def get_linkage_graph(content, expanded, top_k):
+    from gravitas.linkage import build_graph
+    with PROFILER.section("data.linkage"):
+        if not expanded:
+            return build_graph()
+        matrix = current_matrix()
+        return build_graph(matrix.countries, matrix.view(radar_variables), top_k)
+
+@st.fragment
+@profiled("linkage")
+def linkage_section():
+    from st_link_analysis import st_link_analysis, NodeStyle, EdgeStyle
+    from gravitas.linkage import PRESET_LAYOUT
+    with st.container():
+        st.set_page_config(layout="wide")
+            # Affichage
+        st.title("")
+        st.subheader("Macro Linkage Map of Composite Index")
+        st.text("Navigate inside the graph to explore the relationships between the composite index, its pillars, and indicators. Hover over nodes and edges for more information.")
+
+        # Graphe généré depuis le référentiel des indicateurs, positions calculées côté serveur
+        c1, c2 = st.columns([1, 3])
+        expanded = c1.toggle("Show countries", value=False,
+                             help="Link every country to the indicators where it scores highest.")
+        top_k = c2.slider("Indicators per country", 1, 5, 3, disabled=not expanded)
+        graph_data = get_linkage_graph(current_dataset().key(radar_variables) if expanded else None,
+                                       expanded, top_k if expanded else 0)
+
+        # Styles
+        node_styles = [
+            NodeStyle("INDEX", "#00CED1", "name", "world"),
+            NodeStyle("PILLAR", "#FF7F3E", "name", "pillar"),
+            NodeStyle("INDICATOR", "#2A629A", "name", "indi"),
+            NodeStyle("COUNTRY", "#7FB77E", "name", "flag"),
         ]
-    }
 
-    # Styles
-    node_styles = [
-        NodeStyle("INDEX", "#00CED1", "name", "world"),
-        NodeStyle("PILLAR", "#FF7F3E", "name", "pillar"),
-        NodeStyle("INDICATOR", "#2A629A", "name", "indi"),
-    ]
-
-    edge_styles = [
-        EdgeStyle("INCLUDES", caption="label", directed=True),
-        EdgeStyle("MEASURED_BY", caption="label", directed=True),
-    ]
-
-    legend = {
-        "INDEX": "#00CED1",
-        "PILLAR": "#FF7F3E",        
-        "INDICATOR": "#2A629A"
-    }
+        edge_styles = [
+            EdgeStyle("INCLUDES", caption="label", directed=True),
+            EdgeStyle("MEASURED_BY", caption="label", directed=True),
+            EdgeStyle("SCORES_HIGH", directed=True),
+        ]
 
-    for label, color in legend.items():
-        st.markdown(
-            f"""
-            <div style='display: flex; align-items: center; margin-bottom: 5px;'>
-                <div style='width: 15px; height: 15px; background-color: {color}; border-radius: 3px; margin-right: 10px;'></div>
-                <span style='font-weight: bold;'>{label}</span>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+        legend = {
+            "INDEX": "#00CED1",
+            "PILLAR": "#FF7F3E",        
+            "INDICATOR": "#2A629A"
+        }
+        if expanded:
+            legend["COUNTRY"] = "#7FB77E"
+
+        for label, color in legend.items():
+            st.markdown(
+                f"""
+                <div style='display: flex; align-items: center; margin-bottom: 5px;'>
+                    <div style='width: 15px; height: 15px; background-color: {color}; border-radius: 3px; margin-right: 10px;'></div>
+                    <span style='font-weight: bold;'>{label}</span>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
 
-    # 4. Graphe interactif
-    st_link_analysis(
-        graph_data, layout="cola", node_styles=node_styles,
-        edge_styles=edge_styles,height=600
-        )
+        # 4. Graphe interactif : mise en page "preset", pas de simulation dans le navigateur
+        st_link_analysis(
+            graph_data, layout=PRESET_LAYOUT, node_styles=node_styles,
+            edge_styles=edge_styles,height=600,
+            key="linkage_countries" if expanded else "linkage"
+            )
 
 #################################################
 
 #Boxplot
-radar_variables = [
-    "GDP", "Per Capita Income (PCI)", "Import", "Export",
-    "Foreign Direct Investments (FDI)", "Renewables", "Logistic Performance Index (LPI)",
-    "Diplomatic Level Of Representation(LOR)", "Government Efficacity", "Political stability",
-    "Population", "Urban Population", "Arable Land"
-        ]
-
-# Transformation au format long pour faciliter les boxplots
-df_long = filtered_df.melt(
-    id_vars=["Country"],
-    value_vars=radar_variables,
-    var_name="Indicator",
-    value_name="Value"
-)
-
-# Calcul des statistiques descriptives par indicateur
-stats_df = df_long.groupby("Indicator")["Value"].describe().reset_index()
-
-# Ajout de la moyenne (mean) à la main si besoin
-stats_df["mean"] = df_long.groupby("Indicator")["Value"].mean().values
-
-# Fusion des statistiques avec les données longues
-df_long = df_long.merge(stats_df, on="Indicator", suffixes=("", "_stat"))
-
-# Calcul de la moyenne pour chaque indicateur
-means = df_long.groupby("Indicator")["Value"].mean().round(2).reset_index().rename(columns={"Value": "Mean"})
+# Statistiques par indicateur, calculées une fois par sélection et partagées entre sessions
+@profiled("boxplot")
+def render_boxplot(select_country, max_points=BOX_POINT_LIMIT):
+    from gravitas.figures import build_boxplot
+    tables = get_selection(select_country)
+    countries = tables.countries or current_matrix().countries
 
-# Fusion avec le DataFrame long
-df_long = df_long.merge(means, on="Indicator", how="left")
+    # Création du boxplot
+    fig = build_boxplot(countries, tables.values, radar_variables, tables.stats, max_points)
 
-# Création du tooltip avec uniquement la moyenne
-df_long["Indicators"] = (
-    "<br><b>Country:</b> " + df_long["Country"] +
-    "<br><b>Value:</b> " + df_long["Value"].round(2).astype(str) +
-    "<br><b>Mean:</b> " + df_long["Mean"].astype(str)
-)
-
-# Création du boxplot
-fig = px.box(
-    df_long,
-    x="Indicator",
-    y="Value",
-    points="all",
-    hover_data={"Indicators": False, "Country": False, "Indicator": False, "Value": False},
-    custom_data="Indicators",
-    template="plotly_white"
-)
-
-# Personnalisation
-fig.update_traces(
-    hovertemplate="%{customdata[0]}<extra></extra>",
-    marker=dict(size=6, opacity=0.6),
-    selector=dict(type='box')
-)
-
-fig.update_layout(
-    xaxis_tickangle=-45,
-    yaxis_title="Value",
-    hoverlabel=dict(
-        bgcolor="black",
-        font_size=13,
-        font_family="Arial",
-        bordercolor="white",
-        font_color="white"
-    ),
-    height=750,
-    margin=dict(l=40, r=40, t=60, b=120)
-)
-
-# Affichage dans Streamlit
-st.title("")
-st.subheader("Composite Index Components Distribution")
-st.text("Hover over the boxplots to see descriptive statistics of each indicator accross GASPI selected African countries.")
-st.plotly_chart(fig, use_container_width=True)       
+    # Affichage dans Streamlit
+    st.title("")
+    st.subheader("Composite Index Components Distribution")
+    st.text("Hover over the boxplots to see descriptive statistics of each indicator accross GASPI selected African countries.")
+    st.plotly_chart(fig, use_container_width=True)       
 
-st.divider()
+    st.divider()
 
 #####################
 
 # Radar, Metric Cards and Pie Charts
 
-if not select_country:
-    st.subheader("Select from the sidebar to view country-specific charts visualizations.")
-else:
-    # Metric Cards pour chaque pays sélectionné
+@profiled("cards")
+def render_cards(select_country, scores):
     st.subheader("Country Metric Cards")
     # Affichage des cartes côte à côte
     columns = st.columns(len(select_country))  # Crée une colonne par pays
@@ -441,142 +417,420 @@ else:
         </div>
         """, unsafe_allow_html=True)
     
-    # Affichage par lignes de 5 cartes maximum
-    for i in range(0, len(select_country), 6):
-        row = select_country[i:i+6]  # prend 6 pays à la fois
+    # Affichage par lignes de 6 cartes maximum
+    cards = scores.cards(select_country)
+    for i in range(0, len(cards), 6):
+        row = cards[i:i+6]  # prend 6 pays à la fois
         cols = st.columns(len(row))  # crée le bon nombre de colonnes
 
-        for j, country in enumerate(row):
-            country_data = df[df['Country'] == country].iloc[0]
+        for j, (country, index_value, ranking) in enumerate(row):
             with cols[j]:
                 create_metric_card(
                     country_name=country,
-                    index_value=country_data['Composite index'],
-                    ranking=int(country_data['Ranking'])
+                    index_value=index_value,
+                    ranking=ranking
             )
 
     st.divider()
 
-#######Radar Chart 
+# Composants nivo, à appeler dans un cadre elements()
+def nivo_radar(select_country, radar_data):
+    from streamlit_elements import mui, nivo
+    with mui.Box(sx={"height": 700}):
+        nivo.Radar(
+            data=radar_data,
+            keys=select_country,
+            indexBy="indicator",
+            valueFormat=">-.2f",
+            margin={ "top": 100, "right": 80, "bottom": 40, "left": 80 },
+            borderColor={ "from": "color" },
+            gridLabelOffset=36,
+            dotSize=10,
+            dotColor={ "theme": "background" },
+            dotBorderWidth=2,
+            motionConfig="wobbly",
+            legends=[
+                {
+                    "anchor": "top-left",
+                    "direction": "column",
+                    "translateX": -50,
+                    "translateY": -40,
+                    "itemWidth": 80,
+                    "itemHeight": 20,
+                    "itemTextColor": "#999",
+                    "symbolSize": 12,
+                    "symbolShape": "circle",
+                    "effects": [
+                        {
+                            "on": "hover",
+                            "style": {
+                                "itemTextColor": "#000"
+                            }
+                        }
+                    ]
+                }
+            ],
+            theme={
+                "textColor": "#999",
+                "fontSize": 14,
+                "tooltip": {
+                    "container": {
+                        "color": "#999"
+                    }
+                }
+            }
+        )
 
-    ### Construire les données
-    with st.container():
-        st.subheader("Country Radar Chart")
-        st.text("Evaluate country performance through comparative indicator analysis.")        
-        # Construire les données pour le radar chart
-        selected_countries = select_country
-        radar_data = []
-        for var in radar_variables:
-            row = {"indicator": var}
-            for country in selected_countries:
-                value = df[df["Country"] == country][var].values
-                row[country] = round(float(value[0]), 2) if len(value) > 0 else 0
-            radar_data.append(row)
-        ## Liste du fixe du radar
-
-        with elements("nivo_charts"):
-
-                    # Streamlit Elements includes 45 dataviz components powered by Nivo
-
-                with mui.Box(sx={"height": 700}):
-                        nivo.Radar(
-                            data=radar_data,
-                            keys=selected_countries,
-                            indexBy="indicator",
-                            valueFormat=">-.2f",
-                            margin={ "top": 100, "right": 80, "bottom": 40, "left": 80 },
-                            borderColor={ "from": "color" },
-                            gridLabelOffset=36,
-                            dotSize=10,
-                            dotColor={ "theme": "background" },
-                            dotBorderWidth=2,
-                            motionConfig="wobbly",
-                            legends=[
-                                {
-                                    "anchor": "top-left",
-                                    "direction": "column",
-                                    "translateX": -50,
-                                    "translateY": -40,
-                                    "itemWidth": 80,
-                                    "itemHeight": 20,
-                                    "itemTextColor": "#999",
-                                    "symbolSize": 12,
-                                    "symbolShape": "circle",
-                                    "effects": [
-                                        {
-                                            "on": "hover",
-                                            "style": {
-                                                "itemTextColor": "#000"
-                                            }
-                                        }
-                                    ]
-                                }
-                            ],
-                            theme={
-                                "textColor": "#999",
-                                "fontSize": 14,
+# Tous les camemberts dans une seule grille (deux par ligne) : un seul montage React
+# et un seul message, quel que soit le nombre de pays. content-visibility laisse le
+# navigateur ignorer la mise en page et le dessin des camemberts hors écran.
+def nivo_pie_grid(select_country, pies):
+    from streamlit_elements import mui, nivo
+    with mui.Grid(container=True, spacing=2):
+        for country in select_country:
+            pie_data = pies.get(country)
+            if pie_data is None:
+                continue  # sécurité
+
+            with mui.Grid(item=True, xs=12, md=6):
+                with mui.Box(sx={"contentVisibility": "auto", "containIntrinsicSize": "auto 460px"}):
+                    mui.Typography(country, variant="h5", sx={"fontWeight": 600, "mb": 1})
+                    with mui.Box(sx={"height": 400}):
+                        nivo.Pie(
+                            data=pie_data,
+                            margin={ "top": 40, "right": 80, "bottom": 80, "left": 80 },
+                            innerRadius=0.4,
+                            padAngle=0.5,
+                            cornerRadius=3,
+                            activeOuterRadiusOffset=8,
+                            borderWidth=1,
+                            borderColor={ "from": "color", "modifiers": [["darker", 0.2]] },
+                            arcLinkLabelsSkipAngle=5,
+                            arcLinkLabelsTextColor="#999",
+                            arcLinkLabelsThickness=2,
+                            arcLinkLabelsColor={ "from": "color" },
+                            arcLabelsSkipAngle=5,
+                            arcLabelsTextColor={ "from": "color", "modifiers": [["darker", 2]] },
+                            theme={ "fontSize": 13,
                                 "tooltip": {
                                     "container": {
-                                        "color": "#999"
+                                        "background": "#ffffff",
+                                        "color": "#31333F",
                                     }
                                 }
                             }
                         )
-            
-        st.divider()
 
-        ###Pie chart
-        st.subheader("Country Composite Index Insights - Pie Charts")
+@profiled("radar")
+def render_radar(select_country):
+    from streamlit_elements import elements
+    st.subheader("Country Radar Chart")
+    st.text("Evaluate country performance through comparative indicator analysis.")
+    # Données du radar chart, partagées par sélection
+    radar_data = get_selection(select_country).radar
+
+    # Streamlit Elements includes 45 dataviz components powered by Nivo
+    with elements("nivo_charts"):
+        nivo_radar(select_country, radar_data)
+
+    st.divider()
+
+@profiled("pies")
+def render_pies(select_country):
+    from streamlit_elements import elements
+    st.subheader("Country Composite Index Insights - Pie Charts")
+
+    # Données de tous les camemberts, partagées par sélection
+    pies = get_selection(select_country).pies
+    with elements("nivo_pies"):
+        nivo_pie_grid(select_country, pies)
+
+# Petits multiples : radar et camemberts dans le même cadre elements()
+@profiled("small_multiples")
+def render_small_multiples(select_country):
+    from streamlit_elements import elements, mui
+    st.subheader("Country Radar Chart & Composite Index Insights")
+    st.text("Evaluate country performance through comparative indicator analysis, then per-country indicator shares.")
+    tables = get_selection(select_country)
+    radar_data, pies = tables.radar, tables.pies
+
+    with elements("nivo_small_multiples"):
+        nivo_radar(select_country, radar_data)
+        mui.Divider(sx={"my": 3})
+        nivo_pie_grid(select_country, pies)
+
+@profiled("similarity")
+def render_similar(select_country, scores, k, weights=None):
+    st.subheader("Most Similar Countries")
+    st.text("Nearest countries in the space of the 13 normalized indicators" +
+            (", weighted by pillar." if weights else "."))
+    index = get_similarity_index(edition, year, version, normalization, raw,
+                                 current_dataset().key(radar_variables), weights)
+    similar = index.nearest(select_country, k)
+    cards = dict((c, (value, rank)) for c, value, rank in scores.cards(similar["Similar country"].unique()))
+    similar["Composite index"] = similar["Similar country"].map(lambda c: cards[c][0])
+    similar["Ranking"] = similar["Similar country"].map(lambda c: cards[c][1])
+    st.dataframe(
+        similar, hide_index=True, use_container_width=True,
+        column_config={"Distance": st.column_config.NumberColumn(format="%.3f"),
+                       "Composite index": st.column_config.NumberColumn(format="%.2f")},
+    )
+    st.divider()
 
-        # ✅ Si aucun pays sélectionné : rien ne s'affiche
-        for i in range(0, len(select_country), 2):
-                cols = st.columns(2)  # deux colonnes côte à côte
+def render_country_charts(select_country, scores, single_frame=False, similar_k=0, similar_weights=None):
+
+    if not select_country:
+        st.subheader("Select from the sidebar to view country-specific charts visualizations.")
+    else:
+        render_cards(select_country, scores)
+        if raw_table is not None:
+            # Valeurs brutes des pays choisis, avant normalisation
+            with st.expander("Raw indicator values"):
+                st.dataframe(get_pipeline(edition, year, version, raw_table).frame(select_country),
+                             hide_index=True, use_container_width=True)
+        if similar_k:
+            render_similar(select_country, scores, similar_k, similar_weights)
+
+        # Parts et rayon à partir de 0 : pas de radar ni de camemberts pour des valeurs négatives
+        if not bounded(normalization):
+            st.info(f"The radar and pie charts need values in [0, 1]; they are hidden for "
+                    f"{LABELS[normalization]} normalization.")
+            return
+        with st.container():
+            if single_frame:
+                render_small_multiples(select_country)
+            else:
+                render_radar(select_country)
+                render_pies(select_country)
 
-                for j in range(2):
-                    if i + j < len(select_country):
-                        country = select_country[i + j]
-                        row = df[df["Country"] == country]
+#####################
 
-                        if row.empty:
-                            continue  # sécurité
+# Robustesse du classement : Monte Carlo sur les pondérations
+# Résultats partagés entre les sessions, par empreinte des indicateurs et du classement publié ;
+# seuls les SENSITIVITY_RESULTS derniers sont gardés
+SENSITIVITY_RESULTS = 16
 
-                        row = row.iloc[0]
+@st.cache_resource
+def get_sensitivity_results():
+    return OrderedDict()
 
-                        # Préparer les données radar sous forme de camembert
-                        pie_data = [
-                            {
-                                "id": var,
-                                "label": var,
-                                "value": round(row[var], 3)
-                            }
-                            for var in radar_variables
-                        ]
-
-                        with cols[j]:
-                            st.markdown(f"### {country}")
-                            with elements(f"nivo_pie_chart_{country}"):
-                                with mui.Box(sx={"height": 400}):
-                                    nivo.Pie(
-                                        data=pie_data,
-                                        margin={ "top": 40, "right": 80, "bottom": 80, "left": 80 },
-                                        innerRadius=0.4,
-                                        padAngle=0.5,
-                                        cornerRadius=3,
-                                        activeOuterRadiusOffset=8,
-                                        borderWidth=1,
-                                        borderColor={ "from": "color", "modifiers": [["darker", 0.2]] },
-                                        arcLinkLabelsSkipAngle=5,
-                                        arcLinkLabelsTextColor="#999",
-                                        arcLinkLabelsThickness=2,
-                                        arcLinkLabelsColor={ "from": "color" },
-                                        arcLabelsSkipAngle=5,
-                                        arcLabelsTextColor={ "from": "color", "modifiers": [["darker", 2]] },
-                                        theme={ "fontSize": 13,
-                                            "tooltip": {
-                                                "container": {
-                                                    "background": "#ffffff",
-                                                    "color": "#31333F",
-                                                }
-                                            }
-                                        }
-                                    )
\ No newline at end of file
+@st.fragment
+@profiled("sensitivity")
+def sensitivity_section():
+    from gravitas.figures import build_sensitivity_figure
+    from gravitas.sensitivity import BASES, base_weights, iter_rank_histograms, summarize
+    st.title("")
+    st.subheader("Ranking Robustness - Weight Sensitivity")
+    st.text("Re-rank every country under weight vectors sampled around the base weights. Dots show the median rank, bars the 5th-95th percentile range, dashes the published rank.")
+
+    c1, c2, c3 = st.columns(3)
+    n_samples = c1.select_slider("Samples", options=[10_000, 50_000, 100_000, 250_000, 500_000], value=100_000)
+    concentration = c2.slider("Concentration", 10, 500, 100, help="Higher values keep the sampled weights closer to the base weights.")
+    base = c3.selectbox("Base weights", BASES)
+
+    results = get_sensitivity_results()
+    key = (current_dataset().key([*radar_variables, RANKING]), n_samples, concentration, base)
+    summary = results.get(key)
+    if summary is None:
+        if not st.button("Run sensitivity analysis"):
+            return
+        # Les centiles sont publiés au fil des lots terminés par le pool
+        engine = current_engine()
+        progress = st.progress(0.0)
+        partial = st.empty()
+        for done, hist in iter_rank_histograms(
+                engine.values, base_weights(engine, base), engine.published.ranking, n_samples,
+                concentration=concentration):
+            progress.progress(done / n_samples, text=f"{done:,} / {n_samples:,} samples")
+            partial.dataframe(summarize(engine.countries, engine.published.ranking, hist), hide_index=True)
+        progress.empty()
+        partial.empty()
+        results[key] = summary = summarize(engine.countries, engine.published.ranking, hist)
+        while len(results) > SENSITIVITY_RESULTS:
+            results.popitem(last=False)
+    elif key in results:
+        results.move_to_end(key)
+
+    st.plotly_chart(build_sensitivity_figure(summary), use_container_width=True)
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+
+#####################
+
+# Choix d'une région : la sélection de pays est remplacée par les pays des régions choisies
+def select_region_countries():
+    regions = st.session_state.select_region
+    st.session_state.select_country = catalog.countries(regions) if regions else []
+
+def set_query_list(name, values):
+    if st.query_params.get_all(name) != list(values):
+        if values:
+            st.query_params[name] = list(values)
+        else:
+            del st.query_params[name]
+
+# Fragment de sélection : les widgets de la barre latérale et les sections qui en dépendent
+# (globe, boxplot, cartes, radar, camemberts) sont relancés seuls à chaque changement.
+@st.fragment
+def selection_view(globe_slot, boxplot_slot, country_slot):
+    # Liste des régions disponibles
+    region_lst = catalog.regions()
+    country_lst = catalog.countries()  # tous les pays
+
+    # Sélection initiale lue dans l'URL (?region=...&country=...), une fois par session
+    if "select_region" not in st.session_state:
+        st.session_state.select_region = [r for r in st.query_params.get_all("region") if r in region_lst]
+    if "select_country" not in st.session_state:
+        linked = [c for c in st.query_params.get_all("country") if c in country_lst]
+        st.session_state.select_country = linked or (
+            catalog.countries(st.session_state.select_region) if st.session_state.select_region else [])
+    # Après un rechargement des données, les régions et pays disparus sont retirés
+    for key, options in (("select_region", region_lst), ("select_country", country_lst)):
+        kept = [v for v in st.session_state[key] if v in options]
+        if kept != st.session_state[key]:
+            st.session_state[key] = kept
+
+    select_region = st.multiselect("Select a Region", region_lst, key="select_region",
+                                   on_change=select_region_countries)
+
+    # Sélection finale de pays avec possibilité de choisir en dehors des régions
+    # (pré-remplie avec les pays des régions choisies)
+    select_country = st.multiselect("Select Country", options=country_lst, key="select_country")
+
+    # L'URL reflète la sélection : lien partageable vers la même vue
+    set_query_list("region", select_region)
+    set_query_list("country", select_country)
+
+    # Pondération des piliers : recalcul instantané du composite et du classement
+    with st.expander("Pillar weights"):
+        reweight = st.toggle("Reweight pillars", value=False)
+        pillar_weights = {
+            pillar: st.slider(f"{pillar} (%)", 0, 100, int(round(weight * 100)), disabled=not reweight)
+            for pillar, weight in PILLAR_WEIGHTS.items()
+        }
+    # Au-delà du seuil, le boxplot n'affiche que les valeurs aberrantes et un échantillon
+    with st.expander("Display options"):
+        box_point_limit = st.number_input(
+            "Boxplot point limit", min_value=0, max_value=100_000, value=BOX_POINT_LIMIT, step=500,
+            help="Above this many points, only outliers and a random sample of the other points are drawn.")
+        animate_globe = st.toggle("Animate ranking evolution", value=False,
+                                  help="Play the Composite index across all published editions on the globe.")
+        single_frame = st.toggle("Radar and pies in one frame", value=False,
+                                 help="Render the radar and every pie chart as small multiples in a single chart frame.")
+        similar_k = st.number_input("Similar countries", min_value=0, max_value=20, value=5,
+                                    help="Nearest countries listed for each selected country (0 hides the table).")
+        weight_similarity = st.toggle("Weight similarity by pillar", value=False,
+                                      help="Scale each indicator by its pillar weight (the custom weights when reweighting).")
+
+    # Scores : seulement si le globe ou les graphiques par pays sont affichés
+    scores = similar_weights = None
+    if globe_slot is not None or country_slot is not None:
+        engine = current_engine()
+        if reweight and sum(pillar_weights.values()) > 0:
+            with PROFILER.section("data.scores"):
+                scores = engine.score(pillar_weights)
+        else:
+            scores = engine.published
+        if weight_similarity:
+            similar_weights = scores.weights or tuple(PILLAR_WEIGHTS[p] for p in engine.pillar_names)
+
+    # En mode différé, seules les sections ouvertes ont un emplacement
+    if globe_slot is not None:
+        with globe_slot.container():
+            render_globe(select_country, scores, animate_globe)
+    if boxplot_slot is not None:
+        with boxplot_slot.container():
+            render_boxplot(select_country, box_point_limit)
+    if country_slot is not None:
+        with country_slot.container():
+            render_country_charts(select_country, scores, single_frame, similar_k, similar_weights)
+
+# Panneau de performance masqué, affiché avec ?debug=1 dans l'URL
+@st.fragment
+def performance_panel():
+    with st.expander("Performance", expanded=True):
+        st.caption("Rolling timings of this server process (all sessions). Data steps are only timed on cache misses. "
+                   "First (ms) is the cost of a section's first render, deferred imports included.")
+        st.button("Refresh")
+        st.dataframe(
+            PROFILER.summary(), hide_index=True, use_container_width=True,
+            column_config={c: st.column_config.NumberColumn(format="%.1f")
+                           for c in ["First (ms)", "Last (ms)", "p50 (ms)", "p95 (ms)", "p50 payload (KB)"]},
+        )
+        st.caption("Cold start: first script run of this process" + (" (lazy mode)." if LAZY else "."))
+        st.dataframe(PROFILER.startup_report(), hide_index=True,
+                     column_config={"ms": st.column_config.NumberColumn(format="%.1f")})
+        st.caption(f"Memory: {PROFILER.memory()['sessions']} active session(s). The per-session figure is "
+                   "RSS above the post-import level, minus shared datasets, divided by active sessions.")
+        st.dataframe(PROFILER.memory_report(), hide_index=True,
+                     column_config={"MB": st.column_config.NumberColumn(format="%.2f")})
+        st.caption("Shared caches (all sessions).")
+        selection_stats, figure_stats = get_selection_cache().stats(), get_figure_cache().stats()
+        st.dataframe(pd.DataFrame([
+            {"Cache": "Selections", "Hits": selection_stats["hits"], "Misses": selection_stats["misses"],
+             "Entries": selection_stats["size"], "MB": selection_stats["bytes"] / 2**20,
+             "Limit": f"{selection_stats['max_bytes'] / 2**20:.0f} MB"},
+            {"Cache": "Figures", "Hits": figure_stats["hits"], "Misses": figure_stats["misses"],
+             "Entries": figure_stats["size"], "MB": None, "Limit": f"{figure_stats['maxsize']} figures"},
+        ]), hide_index=True, column_config={"MB": st.column_config.NumberColumn(format="%.2f")})
+        st.download_button("Prometheus metrics", PROFILER.prometheus(), "gravitas_metrics.prom",
+                           mime="text/plain", on_click="ignore")
+
+
+# Mode différé (GRAVITAS_LAZY=1 ou ?lazy=1) : les sections sont rangées dans des onglets et
+# seule la section ouverte est construite ; ses bibliothèques et ses données ne sont
+# chargées qu'à sa première ouverture. st.tabs construirait tous les onglets à chaque passage.
+LAZY = os.environ.get("GRAVITAS_LAZY") == "1" or st.query_params.get("lazy") == "1"
+SECTIONS = ["Overview", "Linkage map", "Distribution", "Country charts", "Ranking robustness"]
+
+if LAZY:
+    open_sections = {st.radio("Section", SECTIONS, horizontal=True, key="section",
+                              label_visibility="collapsed")}
+else:
+    open_sections = set(SECTIONS)
+
+# --- Mise en page : deux colonnes pour les deux blocs ---
+globe_slot = boxplot_slot = country_slot = None
+if "Overview" in open_sections:
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        sunburst_section()
+    with col2:
+        globe_slot = st.empty()
+
+if "Linkage map" in open_sections:
+    linkage_section()
+if "Distribution" in open_sections:
+    boxplot_slot = st.empty()
+if "Country charts" in open_sections:
+    country_slot = st.empty()
+if "Ranking robustness" in open_sections:
+    sensitivity_section()
+
+# Rechargement à chaud : chaque session vérifie périodiquement si les données ont changé et
+# se relance alors entièrement ; les caches ne reconstruisent que ce qui en dépend
+@st.fragment(run_every=WATCH_INTERVAL)
+def data_reload_check():
+    watcher = get_watcher()
+    seen = st.session_state.setdefault("data_generation", watcher.generation)
+    if watcher.generation != seen:
+        from gravitas.reload import describe
+        st.session_state.data_generation = watcher.generation
+        st.session_state.data_reloaded = describe(watcher.changes)
+        st.rerun()
+
+with st.sidebar:
+  selection_view(globe_slot, boxplot_slot, country_slot)
+  if os.environ.get("GRAVITAS_WATCH") == "1":
+      data_reload_check()
+  if st.query_params.get("debug") == "1":
+      performance_panel()
+
+if "data_reloaded" in st.session_state:
+    st.toast(st.session_state.pop("data_reloaded"))
+
+PROFILER.finish_startup(_started, _imported)
+# Mémoire : état de la session et jeux de données partagés (panneau ?debug=1, export Prometheus).
+# Mesurée une fois par passage complet ; les relances du seul fragment de sélection ne la
+# mettent pas à jour (une session reste active SESSION_TTL secondes après son dernier passage).
+PROFILER.track_session(deep_nbytes(st.session_state.to_dict()), live_bytes())
+PROFILER.export()
@@ -0,0 +1,49 @@
+"""API JSON servie par ``running()`` : 200, 304 sur l'ETag, gzip négocié, 404."""
+import gzip
+import json
+import urllib.error
+import urllib.request
+
+from gravitas.api import running
+
+
+def _get(url, **headers):
+    """(statut, en-têtes, corps) ; les statuts d'erreur et le 304 ne lèvent pas."""
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.headers, exc.read()
+
+
+def test_rankings_etag_gzip_and_not_found():
+    with running() as base_url:
+        status, headers, body = _get(f"{base_url}/rankings")
+        assert status == 200
+        assert "Content-Encoding" not in headers
+        ranking = json.loads(body)["ranking"]
+        assert [r["ranking"] for r in ranking] == sorted(r["ranking"] for r in ranking)
+        etag = headers["ETag"]
+
+        # Même représentation : 304 sans corps
+        status, headers, body = _get(f"{base_url}/rankings", **{"If-None-Match": etag})
+        assert status == 304
+        assert headers["ETag"] == etag and body == b""
+
+        # Corps compressé identique au corps brut, même ETag
+        status, headers, body = _get(f"{base_url}/rankings", **{"Accept-Encoding": "br, gzip;q=0.8"})
+        assert status == 200
+        assert headers["Content-Encoding"] == "gzip" and headers["ETag"] == etag
+        assert json.loads(gzip.decompress(body))["ranking"] == ranking
+
+        # gzip refusé explicitement
+        status, headers, body = _get(f"{base_url}/rankings", **{"Accept-Encoding": "gzip;q=0, *"})
+        assert status == 200
+        assert "Content-Encoding" not in headers
+        assert json.loads(body)["ranking"] == ranking
+
+        status, _, body = _get(f"{base_url}/countries/Atlantis")
+        assert status == 404
+        assert "Unknown resource" in json.loads(body)["error"]
+        status, _, _ = _get(f"{base_url}/rankings?region=Atlantis")
+        assert status == 404
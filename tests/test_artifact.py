@@ -0,0 +1,70 @@
+"""Validation des CSV d'import : tolérance du composite, ex aequo, classement inversé."""
+import pytest
+
+from gravitas.artifact import COMPOSITE_TOLERANCE, check, read_csv, validate
+from gravitas.indicators import COMPOSITE, INDICATORS, RANKING
+from gravitas.store import DATA_DIR
+
+
+@pytest.fixture
+def tables():
+    """Trois premiers pays livrés, indicateurs à 0,2 / 0,1 / 0,05 et classement cohérent."""
+    index = read_csv(DATA_DIR / "gravitas_country_index.csv").head(3).copy()
+    partners = read_csv(DATA_DIR / "gravitas_country_index2.csv")
+    partners = partners[(partners["Continent"] != "Africa") | partners["Country"].isin(index["Country"])]
+    for i, value in enumerate([0.2, 0.1, 0.05]):
+        index.loc[i, INDICATORS] = value
+    index[COMPOSITE] = index[INDICATORS].sum(axis=1).round(2)
+    index[RANKING] = [1, 2, 3]
+    return index, partners
+
+
+def test_consistent_tables_pass(tables):
+    assert check(*tables) == ([], [])
+
+
+def test_composite_tolerance_edge(tables):
+    index, partners = tables
+    index.loc[0, COMPOSITE] += COMPOSITE_TOLERANCE - 1e-6
+    assert check(index, partners) == ([], [])
+
+    index.loc[0, COMPOSITE] += 0.01
+    errors, warnings = check(index, partners)
+    assert errors == []
+    assert len(warnings) == 1 and warnings[0].startswith(f"index: {COMPOSITE} differs")
+    assert validate(index, partners) == []
+    assert validate(index, partners, strict=True) == warnings
+
+
+def test_ties_in_either_order(tables):
+    index, partners = tables
+    # Sommes égales à l'arrondi près (3,51) : les deux ordres sont admis
+    index.loc[1, INDICATORS] = index.loc[0, INDICATORS] = 0.27
+    index.loc[0, INDICATORS[0]] = 0.2749
+    index.loc[1, INDICATORS[0]] = 0.2651
+    index[COMPOSITE] = index[INDICATORS].sum(axis=1).round(2)
+    assert check(index, partners) == ([], [])
+    index[RANKING] = [2, 1, 3]
+    assert check(index, partners) == ([], [])
+    # Ex aequo publié : même rang pour les deux pays
+    index[RANKING] = [1, 1, 3]
+    assert check(index, partners) == ([], [])
+
+
+def test_rank_inversion_is_a_warning(tables):
+    index, partners = tables
+    index[RANKING] = [1, 3, 2]
+    errors, warnings = check(index, partners)
+    assert errors == []
+    name = index["Country"]
+    assert warnings == [f"index: {RANKING} contradicts the order of the indicator sums: "
+                        f"{name[2]} (#2, 0.65) ranked above {name[1]} (#3, 1.30)"]
+    assert validate(index, partners, strict=True) == warnings
+
+
+def test_errors_stay_errors(tables):
+    index, partners = tables
+    index.loc[0, INDICATORS[0]] = 1.5
+    errors, _ = check(index, partners)
+    assert any("outside [0, 1]" in e for e in errors)
+    assert validate(index, partners) == errors
@@ -0,0 +1,37 @@
+"""Pipeline de normalisation : mise à jour incrémentale identique à un calcul complet."""
+import numpy as np
+import pytest
+
+from gravitas.normalize import METHODS, Pipeline, bounded
+
+
+@pytest.fixture
+def raw():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=(60, 13))
+    values[rng.random(values.shape) < 0.05] = np.nan   # valeurs manquantes
+    values[::7, 2] = values[0, 2]                        # ex aequo
+    values[:, 5] = 1.0                                    # colonne constante
+    return [f"C{i}" for i in range(len(values))], values
+
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+def test_updated_matches_fresh_pipeline(raw, method):
+    countries, values = raw
+    base = Pipeline(countries[:40], values[:40])
+    base.normalized(method)
+    # Nouveaux pays, dont certains au-delà des bornes actuelles
+    grown = values.copy()
+    grown[45, 0] = np.nanmax(values) * 3
+    updated = base.updated(countries, grown)
+    assert updated.computed == 20
+    np.testing.assert_allclose(updated.normalized(method), Pipeline(countries, grown).normalized(method),
+                               rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("method", sorted(METHODS))
+def test_bounded_methods_stay_in_unit_interval(raw, method):
+    countries, values = raw
+    normalized = Pipeline(countries, values).normalized(method)
+    inside = np.nanmin(normalized) >= 0 and np.nanmax(normalized) <= 1
+    assert inside or not bounded(method)
@@ -0,0 +1,48 @@
+"""Rechargement à chaud : un CSV modifié n'invalide que ce qui lit ses cellules."""
+import shutil
+
+from gravitas.artifact import read_csv
+from gravitas.reload import DataWatcher, affected
+from gravitas.store import DATA_DIR, TABLES, GravitasStore, import_csv
+
+
+def _copy_data(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for stem in TABLES.values():
+        shutil.copy(DATA_DIR / f"{stem}.csv", data_dir / f"{stem}.csv")
+    import_csv(data_dir=data_dir, parquet_dir=tmp_path / "parquet")
+    return data_dir, GravitasStore(tmp_path / "parquet")
+
+
+def test_partners_value_reloads_only_the_sunburst(tmp_path):
+    data_dir, store = _copy_data(tmp_path)
+    watcher = DataWatcher(store, data_dir)
+    assert watcher.poll() == {}
+
+    path = data_dir / f"{TABLES['partners']}.csv"
+    partners = read_csv(path)
+    partners.loc[partners["Country"] == "Egypt", "Value"] += 1
+    partners.to_csv(path, index=False)
+
+    changes = watcher.poll()
+    assert watcher.error is None
+    assert watcher.generation == 1
+    assert list(changes) == ["partners"]
+    assert changes["partners"].cells == {"Value": ["Egypt"]}
+    assert affected(changes) == {"sunburst": ["Egypt"]}
+
+
+def test_invalid_csv_keeps_the_current_data(tmp_path):
+    data_dir, store = _copy_data(tmp_path)
+    watcher = DataWatcher(store, data_dir)
+
+    path = data_dir / f"{TABLES['country_index']}.csv"
+    index = read_csv(path)
+    index.loc[0, "GDP"] = 2
+    index.to_csv(path, index=False)
+
+    assert watcher.poll() == {}
+    assert "outside [0, 1]" in watcher.error
+    assert watcher.generation == 0
+    assert store.scoped(store.edition, store.year).arrow("country_index").to_pandas()["GDP"].max() <= 1
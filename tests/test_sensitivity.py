@@ -0,0 +1,33 @@
+"""Analyse de sensibilité : histogramme des rangs borné, exact pour les petits panels."""
+import numpy as np
+
+from gravitas.scoring import rank_desc
+from gravitas.sensitivity import RANK_BINS, RankHistogram, iter_rank_histograms, summarize
+
+
+def _run(n, samples=2_000):
+    rng = np.random.default_rng(0)
+    values = rng.random((n, 13))
+    published = rank_desc(values.sum(axis=1))
+    for _, hist in iter_rank_histograms(values, np.ones(13) / 13, published, samples, 500, workers=1):
+        pass
+    return published, hist
+
+
+def test_small_panel_is_exact():
+    published, hist = _run(40)
+    assert hist.width == 1 and hist.counts.shape == (40, 40)
+    assert (hist.counts.sum(axis=1) == 2_000).all()
+    summary = summarize([f"C{i}" for i in range(40)], published, hist)
+    mean = (hist.counts @ np.arange(1, 41)) / 2_000
+    np.testing.assert_allclose(np.sort(summary["Mean rank"]), np.sort(mean))
+    assert (summary["p5"] <= summary["p50"]).all() and (summary["p50"] <= summary["p95"]).all()
+
+
+def test_large_panel_is_bounded():
+    published, hist = _run(3 * RANK_BINS + 1, samples=500)
+    assert hist.counts.shape[1] <= RANK_BINS
+    assert hist.at_published.sum() <= 500 * len(published)
+    empty = RankHistogram(published)
+    empty += hist
+    np.testing.assert_array_equal(empty.counts, hist.counts)
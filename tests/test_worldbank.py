@@ -0,0 +1,33 @@
+"""Ingestion World Bank hors ligne : serveur de fixtures et cache HTTP (ETag, TTL)."""
+import numpy as np
+
+from gravitas.countries import ISO3
+from gravitas.worldbank import SERIES, HttpCache, fetch_series, normalize, to_frame
+from gravitas.worldbank_server import running
+
+
+def test_second_ingest_revalidates_from_cache(tmp_path):
+    with running() as base_url:
+        # per_page réduit : plusieurs pages par série, comme sur l'API réelle
+        first = HttpCache(tmp_path, ttl=0)
+        results = fetch_series(base_url=base_url, cache=first, workers=2, per_page=50)
+        assert first.misses > len(SERIES)
+        assert first.hits == first.revalidated == 0
+
+        # TTL écoulé : chaque réponse est revalidée par If-None-Match (304), rien n'est retéléchargé
+        second = HttpCache(tmp_path, ttl=0)
+        assert fetch_series(base_url=base_url, cache=second, workers=2, per_page=50) == results
+        assert second.revalidated == first.misses
+        assert second.misses == second.hits == 0
+
+        # Entrées encore fraîches : servies sans requête
+        fresh = HttpCache(tmp_path, ttl=3600)
+        assert fetch_series(base_url=base_url, cache=fresh, workers=2, per_page=50) == results
+        assert fresh.hits == first.misses
+        assert fresh.misses == fresh.revalidated == 0
+
+    raw = to_frame(results)
+    assert set(raw["series"]) == set(SERIES)
+    normalized = normalize(raw, sorted(ISO3))
+    values = normalized.to_numpy(dtype=float)
+    assert np.nanmin(values) >= 0 and np.nanmax(values) <= 1